@@ -0,0 +1,304 @@
+"""Recall and latency of quantized and truncated collections on a synthetic corpus.
+
+The chunks of a synthetic Spring Boot corpus are embedded once and stored
+in one collection per layout: full precision, scalar (int8) and binary
+quantization, and Matryoshka truncation to fewer dimensions, alone or
+reranked with the full vectors. Every setting answers the same questions;
+recall@k is measured against an exact full-precision search, next to query
+latency and the RAM taken by the vectors the search scans.
+
+By default the benchmark runs offline with the hashing embedding model and
+the local vector storage backend. Hashing vectors are sparse, unlike model
+embeddings, so they are turned by a fixed random rotation, which makes them
+dense without changing any cosine similarity:
+
+    python benchmarks/quantization_benchmark.py --files 2000 --output quantization.json
+    python benchmarks/quantization_benchmark.py --backend qdrant --hnsw-m 16 --hnsw-ef 128
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+import numpy as np
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_PATH / "src"))
+sys.path.insert(0, str(ROOT_PATH))
+
+from benchmarks.run_benchmark import make_questions, summarize_latencies
+from benchmarks.synthetic_corpus import generate_corpus
+from services.code_chunker import MethodChunker
+from services.code_parser import JavaCodeParser
+from services.hashing_embeddings import HashingEmbeddings
+from services.local_vector_storage import LocalVectorStorageService
+from services.vector_storage import VectorStorageService
+from services.vector_storage_backend import VectorStorageBackend
+from type_definitions.storage_types import CollectionOptions, SearchOptions
+
+
+class Setting(NamedTuple):
+    """Collection layout and search options of one measured setting."""
+    quantization: str = "none"
+    dimensions: Optional[int] = None
+    rerank_full_vectors: bool = False
+    oversampling: Optional[float] = None
+    rescore: bool = True
+
+    @property
+    def collection_key(self) -> Tuple[str, Optional[int], bool]:
+        """Settings with the same key share one collection."""
+        return self.quantization, self.dimensions, self.rerank_full_vectors
+
+    @property
+    def name(self) -> str:
+        """Label of the setting in the results."""
+        parts = [] if self.quantization == "none" else [self.quantization]
+        if self.dimensions:
+            parts.append(f"dims={self.dimensions}" + ("+rerank" if self.rerank_full_vectors else ""))
+        if self.quantization != "none":
+            parts.append(f"oversampling={self.oversampling or 1.0:g}" if self.rescore else "no-rescore")
+        return "/".join(parts) or "none"
+
+
+SETTINGS = [
+    Setting(),
+    Setting("scalar", oversampling=1.0),
+    Setting("scalar", oversampling=2.0),
+    Setting("binary", oversampling=1.0),
+    Setting("binary", oversampling=2.0),
+    Setting("binary", oversampling=4.0),
+    Setting("binary", rescore=False),
+    Setting(dimensions=768),
+    Setting(dimensions=768, rerank_full_vectors=True),
+    Setting(dimensions=256, rerank_full_vectors=True),
+    Setting("binary", dimensions=1024, rerank_full_vectors=True, oversampling=4.0),
+]
+
+
+def recall_at_k(expected: List[Any], found: List[Any]) -> float:
+    """Get the share of the expected IDs that were found.
+
+    Args:
+        expected: IDs returned by the exact search
+        found: IDs returned by the measured search
+
+    Returns:
+        Recall between 0.0 and 1.0, 1.0 when nothing was expected
+    """
+    if not expected:
+        return 1.0
+    return len(set(expected) & set(found)) / len(expected)
+
+
+def estimated_ram_bytes(quantization: str, count: int, dimensions: int) -> int:
+    """Estimate the RAM held by the vectors a search scans.
+
+    Args:
+        quantization: ``none``, ``scalar`` or ``binary``
+        count: Number of stored vectors
+        dimensions: Dimension of the vectors
+
+    Returns:
+        Bytes of float32 vectors, int8 codes with a scale, or packed sign bits
+    """
+    if quantization == "scalar":
+        return count * (dimensions + 4)
+    if quantization == "binary":
+        return count * ((dimensions + 7) // 8)
+    return count * dimensions * 4
+
+
+def embed_corpus(corpus_path: str, embeddings: HashingEmbeddings) -> Tuple[List[Any], List[List[float]]]:
+    """Parse, chunk and embed a corpus.
+
+    Returns:
+        Chunk metadata and the vector of every chunk
+    """
+    chunker = MethodChunker()
+    chunks = [
+        chunk
+        for parsed in JavaCodeParser().parse_directory(corpus_path)
+        for chunk in chunker.chunk(parsed, "benchmark")
+    ]
+    vectors = embeddings.embed_documents([chunk.transfer_body for chunk in chunks])
+    return [chunk.metadata for chunk in chunks], vectors
+
+
+def random_rotation(dimensions: int, seed: int) -> np.ndarray:
+    """Get a random orthogonal matrix, which preserves norms and cosine similarities."""
+    q, r = np.linalg.qr(np.random.default_rng(seed).normal(size=(dimensions, dimensions)))
+    return (q * np.sign(np.diag(r))).astype(np.float32)
+
+
+def collection_name_of(setting: Setting) -> str:
+    """Get the name of the collection a setting is measured on."""
+    quantization, dimensions, rerank_full_vectors = setting.collection_key
+    return f"quantization_benchmark_{quantization}_{dimensions or 'full'}{'_rerank' if rerank_full_vectors else ''}"
+
+
+def run_quantization_benchmark(
+    storage: VectorStorageBackend,
+    metadata: List[Any],
+    vectors: List[List[float]],
+    query_vectors: List[List[float]],
+    limit: int,
+    collection_options: CollectionOptions,
+    hnsw_ef: Optional[int]
+) -> Dict[str, Dict[str, Any]]:
+    """Store the vectors once per collection layout and measure every setting.
+
+    Args:
+        storage: Backend creating one collection per layout
+        metadata: Metadata of every vector
+        vectors: Vectors to store
+        query_vectors: Embedded questions
+        limit: Number of results per question
+        collection_options: HNSW and on-disk layout shared by every collection
+        hnsw_ef: HNSW candidates explored per search, server default when None
+
+    Returns:
+        Recall, latency and memory per setting
+    """
+    dimensions = len(vectors[0])
+    collections = {}
+    for setting in SETTINGS:
+        if setting.collection_key in collections:
+            continue
+        collection_name = collection_name_of(setting)
+        options = collection_options.model_copy(update={
+            "quantization": setting.quantization,
+            "dimensions": setting.dimensions,
+            "rerank_full_vectors": setting.rerank_full_vectors,
+        })
+        if not storage.create_collection(collection_name, dimensions, options=options):
+            raise RuntimeError(f"Failed to create collection {collection_name}")
+        start = time.perf_counter()
+        if not storage.store_vectors(collection_name, vectors, metadata):
+            raise RuntimeError(f"Failed to store vectors in {collection_name}")
+        collections[setting.collection_key] = (collection_name, time.perf_counter() - start)
+
+    exact = SearchOptions(exact=True)
+    full_collection = collections[Setting().collection_key][0]
+    expected = [
+        [hit["id"] for hit in storage.search_vectors(full_collection, query_vector, limit, search_options=exact)]
+        for query_vector in query_vectors
+    ]
+
+    results = {}
+    for setting in SETTINGS:
+        collection_name, upsert_seconds = collections[setting.collection_key]
+        search_options = SearchOptions(hnsw_ef=hnsw_ef, rescore=setting.rescore, oversampling=setting.oversampling)
+        latencies_ms, recalls = [], []
+        for query_vector, expected_ids in zip(query_vectors, expected):
+            start = time.perf_counter()
+            hits = storage.search_vectors(collection_name, query_vector, limit, search_options=search_options)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            recalls.append(recall_at_k(expected_ids, [hit["id"] for hit in hits]))
+
+        if isinstance(storage, LocalVectorStorageService):
+            usage = storage.memory_usage(collection_name)
+            ram_bytes = usage["index"] or usage["vectors"]
+        else:
+            ram_bytes = estimated_ram_bytes(setting.quantization, len(vectors), setting.dimensions or dimensions)
+        results[setting.name] = {
+            "upsert_seconds": upsert_seconds,
+            "recall_at_k": sum(recalls) / len(recalls),
+            "ram_bytes": ram_bytes,
+            "memory_reduction": estimated_ram_bytes("none", len(vectors), dimensions) / max(ram_bytes, 1),
+            **summarize_latencies(latencies_ms),
+        }
+    return results
+
+
+@click.command()
+@click.option("--files", default=400, show_default=True, help="Approximate number of Java files to generate.")
+@click.option("--seed", default=0, show_default=True, help="Seed of the synthetic corpus.")
+@click.option("--queries", default=200, show_default=True, help="Number of timed questions.")
+@click.option("--limit", default=10, show_default=True, help="Results per question, the k of recall@k.")
+@click.option("--dimensions", default=3072, show_default=True, help="Dimension of the hashing embeddings.")
+@click.option("--rotate/--no-rotate", default=True, show_default=True,
+              help="Densify the sparse hashing vectors with a random rotation.")
+@click.option("--backend", default="local", show_default=True, help="Vector storage backend (local, qdrant).")
+@click.option("--hnsw-m", type=int, default=None, help="HNSW edges per node (qdrant).")
+@click.option("--hnsw-ef-construct", type=int, default=None, help="HNSW build candidates (qdrant).")
+@click.option("--hnsw-ef", type=int, default=None, help="HNSW search candidates (qdrant).")
+@click.option("--on-disk/--in-memory", default=False, show_default=True,
+              help="Keep original vectors on disk, quantized vectors stay in RAM (qdrant).")
+@click.option("--work-dir", type=click.Path(file_okay=False), default=None,
+              help="Directory for the corpus and local vectors, a temporary one by default.")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write the JSON result here.")
+def main(files, seed, queries, limit, dimensions, rotate, backend, hnsw_m, hnsw_ef_construct, hnsw_ef, on_disk,
+         work_dir, output):
+    """Measure recall and latency of quantized and truncated vector collections."""
+    work_dir = work_dir or tempfile.mkdtemp(prefix="codebase-mcp-quantization-")
+    corpus = generate_corpus(os.path.join(work_dir, "corpus"), files=files, seed=seed)
+    embeddings = HashingEmbeddings(dimensions)
+    metadata, vectors = embed_corpus(corpus.root_path, embeddings)
+    query_vectors = embeddings.embed_documents(make_questions(corpus.class_names, queries))
+    if rotate:
+        rotation = random_rotation(dimensions, seed)
+        vectors = (np.asarray(vectors, dtype=np.float32) @ rotation).tolist()
+        query_vectors = (np.asarray(query_vectors, dtype=np.float32) @ rotation).tolist()
+
+    if backend == "local":
+        storage = LocalVectorStorageService(os.path.join(work_dir, "vectors"))
+    elif backend == "qdrant":
+        from config.settings import settings
+        storage = VectorStorageService(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+    else:
+        raise click.BadParameter(f"Unknown backend: {backend}", param_hint="--backend")
+
+    collection_options = CollectionOptions(
+        on_disk_vectors=on_disk,
+        hnsw_m=hnsw_m,
+        hnsw_ef_construct=hnsw_ef_construct
+    )
+    try:
+        settings_results = run_quantization_benchmark(
+            storage, metadata, vectors, query_vectors, limit, collection_options, hnsw_ef
+        )
+    finally:
+        if isinstance(storage, VectorStorageService):
+            for collection_name in dict.fromkeys(collection_name_of(setting) for setting in SETTINGS):
+                storage.client.delete_collection(collection_name)
+        storage.close()
+
+    click.echo(f"{len(vectors)} vectors of {dimensions} dimensions, {queries} questions, recall@{limit}")
+    for name, values in settings_results.items():
+        click.echo(
+            f"  {name:<40} recall {values['recall_at_k']:.3f}  p50 {values['p50_ms']:7.2f} ms  "
+            f"p95 {values['p95_ms']:7.2f} ms  RAM {values['ram_bytes'] / 1024 ** 2:8.1f} MiB "
+            f"({values['memory_reduction']:.1f}x smaller)  upsert {values['upsert_seconds']:.2f} s"
+        )
+
+    if output:
+        result = {
+            "config": {
+                "files": files,
+                "seed": seed,
+                "queries": queries,
+                "limit": limit,
+                "dimensions": dimensions,
+                "rotate": rotate,
+                "backend": backend,
+                "hnsw_m": hnsw_m,
+                "hnsw_ef_construct": hnsw_ef_construct,
+                "hnsw_ef": hnsw_ef,
+                "on_disk": on_disk,
+            },
+            "vectors": len(vectors),
+            "settings": settings_results,
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""End-to-end ingest and query benchmark on a synthetic Spring Boot corpus.
+
+Each stage is timed on its own: parsing, chunking, embedding, upserting,
+the full streaming update and querying. Results are written as JSON so runs
+from different versions can be compared with ``--baseline``.
+
+By default the benchmark runs fully offline with the hashing embedding
+provider and the local vector storage backend:
+
+    python benchmarks/run_benchmark.py --files 2000 --output results.json
+    python benchmarks/run_benchmark.py --files 2000 --baseline results.json
+"""
+
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import click
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_PATH / "src"))
+sys.path.insert(0, str(ROOT_PATH))
+
+from benchmarks.synthetic_corpus import ACTIONS, generate_corpus
+
+# Metrics compared against a baseline, and whether higher values are better
+COMPARED_METRICS = {
+    ("parse", "files_per_second"): True,
+    ("chunk", "chunks_per_second"): True,
+    ("embed", "embeddings_per_second"): True,
+    ("upsert", "points_per_second"): True,
+    ("update_codebase", "files_per_second"): True,
+    ("query", "p50_ms"): False,
+    ("query", "p95_ms"): False,
+    ("query", "p99_ms"): False,
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Get a percentile with linear interpolation between closest ranks.
+
+    Args:
+        values: Samples
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 without samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize_latencies(latencies_ms: List[float]) -> Dict[str, float]:
+    """Summarize query latencies in milliseconds."""
+    return {
+        "count": len(latencies_ms),
+        "mean_ms": sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+    }
+
+
+def rate(count: int, seconds: float) -> float:
+    """Get a per-second rate, 0.0 for an empty duration."""
+    return count / seconds if seconds > 0 else 0.0
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Compare the key metrics of two benchmark results.
+
+    Args:
+        current: Result of this run
+        baseline: Result of an earlier run
+
+    Returns:
+        Per metric, the baseline and current values and the relative change in
+        percent, positive when the current run is better
+    """
+    comparison = {}
+    for (stage, metric), higher_is_better in COMPARED_METRICS.items():
+        before = baseline.get("stages", {}).get(stage, {}).get(metric)
+        after = current.get("stages", {}).get(stage, {}).get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        comparison[f"{stage}.{metric}"] = {
+            "baseline": before,
+            "current": after,
+            "improvement_percent": change if higher_is_better else -change,
+        }
+    return comparison
+
+
+def git_revision() -> Optional[str]:
+    """Get the current git revision of the repository, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_PATH,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_questions(class_names: List[str], count: int) -> List[str]:
+    """Build distinct natural language questions about the corpus."""
+    domains = [name[:-len("Service")] for name in class_names if name.endswith("Service")]
+    questions = []
+    for index in range(count):
+        domain = domains[index % len(domains)]
+        action = ACTIONS[(index // len(domains)) % len(ACTIONS)]
+        questions.append(f"How does the {domain.lower()} service {action} a {domain.lower()}? ({index})")
+    return questions
+
+
+async def run_benchmark(
+    corpus_path: str,
+    class_names: List[str],
+    project_name: str,
+    queries: int,
+    query_limit: int,
+    parse_workers: Optional[int]
+) -> Dict[str, Dict[str, Any]]:
+    """Time every stage of ingest and query on a corpus.
+
+    Settings must already point at the backends under test, since services are
+    created through the ServiceFactory.
+
+    Args:
+        corpus_path: Root directory of the corpus
+        class_names: Names of the generated classes, used to build questions
+        project_name: Project name the vectors are stored under
+        queries: Number of distinct questions to time
+        query_limit: Number of results per question
+        parse_workers: Number of parser processes
+
+    Returns:
+        Measurements per stage
+    """
+    from config.settings import settings
+    from services.codebase_service import CodebaseService
+    from services.embedding_scheduler import EmbeddingScheduler
+
+    service = CodebaseService()
+    collection_name = settings.QDRANT_COLLECTION_NAME
+    stages: Dict[str, Dict[str, Any]] = {}
+    try:
+        start = time.perf_counter()
+        code_metadata_list = service.java_code_parser.parse_directory(corpus_path, workers=parse_workers)
+        elapsed = time.perf_counter() - start
+        stages["parse"] = {
+            "files": len(code_metadata_list),
+            "seconds": elapsed,
+            "files_per_second": rate(len(code_metadata_list), elapsed),
+        }
+
+        start = time.perf_counter()
+        chunks = [
+            code_data
+            for code_metadata in code_metadata_list
+            for code_data in service._to_code_data_for_vector(code_metadata, project_name)
+        ]
+        elapsed = time.perf_counter() - start
+        stages["chunk"] = {
+            "chunks": len(chunks),
+            "seconds": elapsed,
+            "chunks_per_second": rate(len(chunks), elapsed),
+        }
+
+        start = time.perf_counter()
+        vectors = await EmbeddingScheduler(service.vector_embedding).embed(chunks)
+        elapsed = time.perf_counter() - start
+        stages["embed"] = {
+            "embeddings": len(vectors),
+            "seconds": elapsed,
+            "embeddings_per_second": rate(len(vectors), elapsed),
+        }
+
+        service.vector_storage.delete_project_vectors(collection_name, project_name)
+        start = time.perf_counter()
+        if not service.vector_storage.store_vectors(
+            collection_name,
+            vectors,
+            [code_data.metadata for code_data in chunks]
+        ):
+            raise RuntimeError("Failed to store vectors")
+        elapsed = time.perf_counter() - start
+        stages["upsert"] = {
+            "points": len(vectors),
+            "seconds": elapsed,
+            "points_per_second": rate(len(vectors), elapsed),
+        }
+
+        # The streaming pipeline overlaps the stages above
+        start = time.perf_counter()
+        await service.update_codebase(project_name, corpus_path)
+        elapsed = time.perf_counter() - start
+        stages["update_codebase"] = {
+            "files": len(code_metadata_list),
+            "seconds": elapsed,
+            "files_per_second": rate(len(code_metadata_list), elapsed),
+        }
+
+        questions = make_questions(class_names, queries)
+        latencies_ms = []
+        for question in questions:
+            start = time.perf_counter()
+            await service.query_codebase(project_name, question, limit=query_limit)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+        stages["query"] = summarize_latencies(latencies_ms)
+
+        # The same questions again are answered from the query result cache
+        latencies_ms = []
+        for question in questions:
+            start = time.perf_counter()
+            await service.query_codebase(project_name, question, limit=query_limit)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+        stages["query_cached"] = summarize_latencies(latencies_ms)
+    finally:
+        service.close()
+    return stages
+
+
+def print_summary(result: Dict[str, Any]) -> None:
+    """Print the headline numbers of a result."""
+    stages = result["stages"]
+    click.echo(f"Corpus: {result['corpus']['files']} files, {result['corpus']['lines']} lines")
+    click.echo(f"  parse            {stages['parse']['files_per_second']:10.1f} files/sec")
+    click.echo(f"  chunk            {stages['chunk']['chunks_per_second']:10.1f} chunks/sec")
+    click.echo(f"  embed            {stages['embed']['embeddings_per_second']:10.1f} embeddings/sec")
+    click.echo(f"  upsert           {stages['upsert']['points_per_second']:10.1f} points/sec")
+    click.echo(f"  update_codebase  {stages['update_codebase']['files_per_second']:10.1f} files/sec")
+    for name in ("query", "query_cached"):
+        query = stages[name]
+        click.echo(
+            f"  {name:<16} p50 {query['p50_ms']:.2f} ms, p95 {query['p95_ms']:.2f} ms, "
+            f"p99 {query['p99_ms']:.2f} ms"
+        )
+    for metric, values in result.get("comparison", {}).items():
+        click.echo(
+            f"  vs baseline {metric:<32} {values['baseline']:10.2f} -> {values['current']:10.2f} "
+            f"({values['improvement_percent']:+.1f}%)"
+        )
+
+
+@click.command()
+@click.option("--files", default=400, show_default=True, help="Approximate number of Java files to generate.")
+@click.option("--actions", default=4, show_default=True, help="Business methods per service and controller.")
+@click.option("--seed", default=0, show_default=True, help="Seed of the synthetic corpus.")
+@click.option("--queries", default=200, show_default=True, help="Number of timed questions.")
+@click.option("--query-limit", default=5, show_default=True, help="Results per question.")
+@click.option("--parse-workers", type=int, default=None, help="Parser processes, 0 for one per CPU core.")
+@click.option("--provider", default="hashing", show_default=True, help="Embedding provider (hashing, google).")
+@click.option("--backend", default="local", show_default=True, help="Vector storage backend (local, qdrant).")
+@click.option("--collection", default="benchmark_vectors", show_default=True, help="Collection used for the run.")
+@click.option("--embedding-cache/--no-embedding-cache", default=False, show_default=True,
+              help="Serve repeated embeddings from the persistent cache.")
+@click.option("--work-dir", type=click.Path(file_okay=False), default=None,
+              help="Directory for the corpus and local state, a temporary one by default.")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write the JSON result here.")
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Earlier JSON result to compare against.")
+def main(files, actions, seed, queries, query_limit, parse_workers, provider, backend, collection,
+         embedding_cache, work_dir, output, baseline):
+    """Benchmark ingest and query on a synthetic Spring Boot codebase."""
+    work_dir = work_dir or tempfile.mkdtemp(prefix="codebase-mcp-benchmark-")
+    state_dir = os.path.join(work_dir, "state")
+
+    # Settings are read when services are first imported
+    os.environ["EMBEDDING_PROVIDER"] = provider
+    os.environ["VECTOR_STORAGE_BACKEND"] = backend
+    os.environ["QDRANT_COLLECTION_NAME"] = collection
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "true" if embedding_cache else "false"
+    os.environ["INDEX_STATE_DIR"] = state_dir
+    os.environ["LOCAL_VECTOR_STORAGE_PATH"] = os.path.join(state_dir, "vectors")
+    os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(state_dir, "embedding_cache.sqlite3")
+
+    corpus = generate_corpus(os.path.join(work_dir, "corpus"), files=files, actions_per_service=actions, seed=seed)
+    stages = asyncio.run(run_benchmark(
+        corpus.root_path,
+        corpus.class_names,
+        project_name="benchmark",
+        queries=queries,
+        query_limit=query_limit,
+        parse_workers=parse_workers
+    ))
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "files": files,
+            "actions": actions,
+            "seed": seed,
+            "queries": queries,
+            "query_limit": query_limit,
+            "parse_workers": parse_workers,
+            "provider": provider,
+            "backend": backend,
+            "embedding_cache": embedding_cache,
+        },
+        "corpus": {
+            "domains": corpus.domains,
+            "files": corpus.files,
+            "lines": corpus.lines,
+            "bytes": corpus.bytes,
+        },
+        "stages": stages,
+    }
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            result["comparison"] = compare_results(result, json.load(f))
+
+    print_summary(result)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
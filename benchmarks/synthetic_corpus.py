@@ -0,0 +1,252 @@
+"""Generate synthetic Spring Boot codebases for benchmarking.
+
+Every domain becomes four files (entity, repository, service and
+controller) following the usual Spring Boot layering, so parsing, chunking
+and search see realistic class shapes, annotations and identifiers.
+"""
+
+import os
+import random
+from dataclasses import dataclass, field
+from typing import List
+
+DOMAIN_NOUNS = [
+    "User", "Order", "Product", "Invoice", "Payment", "Customer", "Shipment",
+    "Inventory", "Account", "Address", "Review", "Coupon", "Category", "Cart",
+    "Warehouse", "Supplier", "Refund", "Subscription", "Notification", "Report",
+]
+FIELD_TYPES = [
+    ("String", "name"), ("String", "description"), ("String", "status"),
+    ("Long", "ownerId"), ("Integer", "quantity"), ("java.math.BigDecimal", "amount"),
+    ("java.time.LocalDateTime", "createdAt"), ("java.time.LocalDateTime", "updatedAt"),
+    ("Boolean", "active"), ("String", "email"), ("String", "code"), ("Double", "rating"),
+]
+ACTIONS = ["approve", "cancel", "archive", "recalculate", "validate", "notify", "export", "merge"]
+
+
+@dataclass
+class CorpusStats:
+    """Size of a generated corpus."""
+    root_path: str
+    domains: int = 0
+    files: int = 0
+    lines: int = 0
+    bytes: int = 0
+    class_names: List[str] = field(default_factory=list)
+
+
+def _capitalize(name: str) -> str:
+    return name[0].upper() + name[1:]
+
+
+def _entity(package: str, domain: str, fields: List[tuple]) -> str:
+    lines = [
+        f"package {package}.entity;",
+        "",
+        "import jakarta.persistence.*;",
+        "",
+        "@Entity",
+        f"@Table(name = \"{domain.lower()}s\")",
+        f"public class {domain} {{",
+        "",
+        "    @Id",
+        "    @GeneratedValue(strategy = GenerationType.IDENTITY)",
+        "    private Long id;",
+    ]
+    for field_type, field_name in fields:
+        lines.append(f"    private {field_type} {field_name};")
+    lines.extend(["", "    public Long getId() {", "        return id;", "    }"])
+    for field_type, field_name in fields:
+        lines.extend([
+            "",
+            f"    public {field_type} get{_capitalize(field_name)}() {{",
+            f"        return {field_name};",
+            "    }",
+            "",
+            f"    public void set{_capitalize(field_name)}({field_type} {field_name}) {{",
+            f"        this.{field_name} = {field_name};",
+            "    }",
+        ])
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _repository(package: str, domain: str, fields: List[tuple]) -> str:
+    lines = [
+        f"package {package}.repository;",
+        "",
+        f"import {package}.entity.{domain};",
+        "import org.springframework.data.jpa.repository.JpaRepository;",
+        "import org.springframework.stereotype.Repository;",
+        "import java.util.List;",
+        "",
+        "@Repository",
+        f"public interface {domain}Repository extends JpaRepository<{domain}, Long> {{",
+    ]
+    for field_type, field_name in fields[:4]:
+        lines.append(f"    List<{domain}> findBy{_capitalize(field_name)}({field_type} {field_name});")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _service(package: str, domain: str, fields: List[tuple], actions: List[str]) -> str:
+    variable = domain[0].lower() + domain[1:]
+    lines = [
+        f"package {package}.service;",
+        "",
+        f"import {package}.entity.{domain};",
+        f"import {package}.repository.{domain}Repository;",
+        "import org.springframework.beans.factory.annotation.Autowired;",
+        "import org.springframework.stereotype.Service;",
+        "import org.springframework.transaction.annotation.Transactional;",
+        "import java.util.List;",
+        "import java.util.Optional;",
+        "",
+        "@Service",
+        f"public class {domain}Service {{",
+        "",
+        "    @Autowired",
+        f"    private {domain}Repository {variable}Repository;",
+        "",
+        f"    public List<{domain}> findAll() {{",
+        f"        return {variable}Repository.findAll();",
+        "    }",
+        "",
+        f"    public Optional<{domain}> findById(Long id) {{",
+        f"        return {variable}Repository.findById(id);",
+        "    }",
+        "",
+        "    @Transactional",
+        f"    public {domain} save({domain} {variable}) {{",
+        f"        if ({variable}.get{_capitalize(fields[0][1])}() == null) {{",
+        f"            throw new IllegalArgumentException(\"{domain} {fields[0][1]} is required\");",
+        "        }",
+        f"        return {variable}Repository.save({variable});",
+        "    }",
+        "",
+        "    @Transactional",
+        "    public void delete(Long id) {",
+        f"        {variable}Repository.deleteById(id);",
+        "    }",
+    ]
+    for action in actions:
+        lines.extend([
+            "",
+            "    @Transactional",
+            f"    public {domain} {action}{domain}(Long id) {{",
+            f"        {domain} {variable} = {variable}Repository.findById(id)",
+            f"            .orElseThrow(() -> new IllegalStateException(\"{domain} not found: \" + id));",
+            f"        // {_capitalize(action)} the {domain.lower()} and record the change",
+            f"        {variable}.setStatus(\"{action.upper()}\");",
+            f"        return {variable}Repository.save({variable});",
+            "    }",
+        ])
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _controller(package: str, domain: str, actions: List[str]) -> str:
+    variable = domain[0].lower() + domain[1:]
+    path = f"/api/{domain.lower()}s"
+    lines = [
+        f"package {package}.controller;",
+        "",
+        f"import {package}.entity.{domain};",
+        f"import {package}.service.{domain}Service;",
+        "import org.springframework.beans.factory.annotation.Autowired;",
+        "import org.springframework.http.ResponseEntity;",
+        "import org.springframework.web.bind.annotation.*;",
+        "import java.util.List;",
+        "",
+        "@RestController",
+        f"@RequestMapping(\"{path}\")",
+        f"public class {domain}Controller {{",
+        "",
+        "    @Autowired",
+        f"    private {domain}Service {variable}Service;",
+        "",
+        "    @GetMapping",
+        f"    public List<{domain}> list() {{",
+        f"        return {variable}Service.findAll();",
+        "    }",
+        "",
+        "    @GetMapping(\"/{id}\")",
+        f"    public ResponseEntity<{domain}> get(@PathVariable Long id) {{",
+        f"        return {variable}Service.findById(id)",
+        "            .map(ResponseEntity::ok)",
+        "            .orElse(ResponseEntity.notFound().build());",
+        "    }",
+        "",
+        "    @PostMapping",
+        f"    public {domain} create(@RequestBody {domain} {variable}) {{",
+        f"        return {variable}Service.save({variable});",
+        "    }",
+    ]
+    for action in actions:
+        lines.extend([
+            "",
+            f"    @PostMapping(\"/{{id}}/{action}\")",
+            f"    public {domain} {action}(@PathVariable Long id) {{",
+            f"        return {variable}Service.{action}{domain}(id);",
+            "    }",
+        ])
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def domain_name(index: int) -> str:
+    """Get the unique domain class name for a domain index."""
+    noun = DOMAIN_NOUNS[index % len(DOMAIN_NOUNS)]
+    round_ = index // len(DOMAIN_NOUNS)
+    return noun if round_ == 0 else f"{noun}{round_}"
+
+
+def generate_corpus(
+    root_path: str,
+    files: int = 400,
+    actions_per_service: int = 4,
+    base_package: str = "com.example.shop",
+    seed: int = 0
+) -> CorpusStats:
+    """Write a synthetic Spring Boot project.
+
+    Args:
+        root_path: Directory the project is written to
+        files: Approximate number of Java files, rounded up to whole domains of four files
+        actions_per_service: Extra business methods per service and controller
+        base_package: Root Java package
+        seed: Random seed, the same seed always produces the same corpus
+
+    Returns:
+        CorpusStats describing the generated files
+    """
+    rng = random.Random(seed)
+    stats = CorpusStats(root_path=root_path)
+    stats.domains = max(1, (files + 3) // 4)
+    source_root = os.path.join(root_path, "src", "main", "java", *base_package.split("."))
+
+    for index in range(stats.domains):
+        domain = domain_name(index)
+        package = f"{base_package}.{domain.lower()}"
+        fields = rng.sample(FIELD_TYPES, k=min(len(FIELD_TYPES), 4 + rng.randrange(5)))
+        if ("String", "status") not in fields:
+            fields.append(("String", "status"))
+        actions = [ACTIONS[(index + i) % len(ACTIONS)] for i in range(actions_per_service)]
+
+        sources = {
+            ("entity", domain): _entity(package, domain, fields),
+            ("repository", f"{domain}Repository"): _repository(package, domain, fields),
+            ("service", f"{domain}Service"): _service(package, domain, fields, actions),
+            ("controller", f"{domain}Controller"): _controller(package, domain, actions),
+        }
+        for (layer, class_name), source in sources.items():
+            directory = os.path.join(source_root, domain.lower(), layer)
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"{class_name}.java"), "w", encoding="utf-8") as f:
+                f.write(source)
+            stats.files += 1
+            stats.lines += source.count("\n")
+            stats.bytes += len(source.encode("utf-8"))
+            stats.class_names.append(class_name)
+
+    return stats
@@ -3,30 +3,64 @@ MCP Server implementation for code understanding.
 This server provides tools for updating code repositories and querying code context.
 """
 
+import json
+import logging
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import AsyncIterator
+from typing import AsyncIterator, List, Optional
 from mcp.types import TextContent
 from mcp.server.fastmcp import FastMCP, Context
 
 # Import our own services
+from config.settings import settings
 from services.codebase_service import CodebaseService
+from services.metrics import metrics
+from type_definitions.storage_types import SearchFilter
 
 
-mcp = FastMCP("codebase-mcp")
+logger = logging.getLogger(__name__)
 
 @dataclass
 class ServerContext:
     codebase_service: CodebaseService
 
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[ServerContext]:
+    """Create the services once at startup and check their backends before serving"""
+    codebase_service = CodebaseService()
+    try:
+        health = await codebase_service.health_check(check_embedding=settings.STARTUP_WARMUP_EMBEDDING)
+        if not health["healthy"]:
+            raise RuntimeError(f"Codebase service failed its startup health check: {health}")
+        logger.info(f"Codebase service ready: {health}")
+        yield ServerContext(codebase_service=codebase_service)
+    finally:
+        codebase_service.close()
+
+mcp = FastMCP("codebase-mcp", lifespan=server_lifespan)
+
+def get_codebase_service(ctx: Context) -> CodebaseService:
+    """Get the long-lived CodebaseService created by the server lifespan"""
+    return ctx.request_context.lifespan_context.codebase_service
+
 @mcp.tool()
-async def update_codebase(project_name: str, codebase_path: str, ctx: Context) -> str:
-    """Tool that updates the codebase"""
+async def update_codebase(
+    project_name: str,
+    codebase_path: str,
+    ctx: Context,
+    incremental: bool = False,
+    base_revision: str = "",
+    head_revision: str = ""
+) -> str:
+    """Tool that updates the codebase, optionally re-embedding only files changed since the last run or a git revision"""
     try:
-        codebase_service = CodebaseService()
+        codebase_service = get_codebase_service(ctx)
         result = await codebase_service.update_codebase(
             project_name=project_name,
             root_path=codebase_path,
+            incremental=incremental,
+            base_revision=base_revision or None,
+            head_revision=head_revision or None,
         )
         if result:
             return [TextContent(
@@ -44,15 +78,63 @@ async def update_codebase(project_name: str, codebase_path: str, ctx: Context) -
             text=f"Error updating codebase: {str(e)}"
         )]
     
+@mcp.tool()
+async def watch_codebase(project_name: str, codebase_path: str, ctx: Context) -> str:
+    """Tool that keeps the index in sync with file edits, re-embedding only changed declarations"""
+    try:
+        codebase_service = get_codebase_service(ctx)
+        watcher = await codebase_service.start_watching(project_name, codebase_path)
+        return [TextContent(
+            type="text",
+            text=f"Watching '{codebase_path}' for project '{project_name}' ({watcher.status()['backend']})"
+        )]
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error starting watch: {str(e)}"
+        )]
+
+@mcp.tool()
+async def unwatch_codebase(project_name: str, ctx: Context) -> str:
+    """Tool that stops watching a project"""
+    try:
+        codebase_service = get_codebase_service(ctx)
+        stopped = await codebase_service.stop_watching(project_name)
+        return [TextContent(
+            type="text",
+            text=f"Stopped watching project '{project_name}'" if stopped else f"Project '{project_name}' is not watched"
+        )]
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error stopping watch: {str(e)}"
+        )]
+
+@mcp.tool()
+async def watch_status(ctx: Context) -> str:
+    """Tool that reports the state and counters of every watched project"""
+    try:
+        codebase_service = get_codebase_service(ctx)
+        status = codebase_service.watch_status()
+        return [TextContent(
+            type="text",
+            text=json.dumps(status, indent=2) if status else "No project is watched"
+        )]
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error getting watch status: {str(e)}"
+        )]
+
 @mcp.tool()
 async def files_count(codebase_path: str, ctx: Context) -> str:
     """Tool that gets the files count in the codebase"""
     try:
-        codebase_service = CodebaseService()
-        result = codebase_service.java_code_parser.parse_directory(codebase_path)
+        codebase_service = get_codebase_service(ctx)
+        count = sum(1 for _ in codebase_service.java_code_parser.iter_parsed_files(codebase_path))
         return [TextContent(
             type="text",
-            text=f"Files count: {len(result)}"
+            text=f"Files count: {count}"
         )]
     except Exception as e:
         return [TextContent(
@@ -64,7 +146,7 @@ async def files_count(codebase_path: str, ctx: Context) -> str:
 async def get_points_for_vector(codebase_path: str, ctx: Context) -> str:
     """Tool that gets the points for vector"""
     try:
-        codebase_service = CodebaseService()
+        codebase_service = get_codebase_service(ctx)
         result = codebase_service.get_separated_code_for_vector(codebase_path)
         return [TextContent(
             type="text",
@@ -77,14 +159,98 @@ async def get_points_for_vector(codebase_path: str, ctx: Context) -> str:
         )]
 
 @mcp.tool()
-async def read_codebase(project_name: str, question: str, ctx: Context) -> str:
-    """Tool that reads the codebase"""
+async def embedding_cache_stats(ctx: Context) -> str:
+    """Tool that reports embedding cache hits and misses"""
     try:
-        codebase_service = CodebaseService()
+        codebase_service = get_codebase_service(ctx)
+        stats = codebase_service.vector_embedding.cache_stats()
+        if not stats:
+            return [TextContent(
+                type="text",
+                text="Embedding cache is disabled"
+            )]
+        return [TextContent(
+            type="text",
+            text=(
+                f"Hits: {stats['hits']}, Misses: {stats['misses']}, Hit rate: {stats['hit_rate']:.2%}\n"
+                f"Entries: {stats['entries']}, Size: {stats['bytes']} / {stats['max_bytes']} bytes, "
+                f"Evictions: {stats['evictions']}"
+            )
+        )]
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error getting embedding cache stats: {str(e)}"
+        )]
+
+@mcp.tool()
+async def get_metrics(ctx: Context, format: str = "json") -> str:
+    """Tool that reports stage timings, counters and latency histograms as JSON or Prometheus text"""
+    try:
+        if format == "prometheus":
+            text = metrics.to_prometheus()
+        elif format == "json":
+            codebase_service = get_codebase_service(ctx)
+            snapshot = metrics.snapshot()
+            snapshot["caches"] = {
+                "embedding": codebase_service.vector_embedding.cache_stats(),
+                "query_embedding": codebase_service.query_embedding_cache.stats(),
+                "query_result": codebase_service.query_result_cache.stats(),
+            }
+            text = json.dumps(snapshot, indent=2)
+        else:
+            text = f"Unknown metrics format: {format}, expected json or prometheus"
+        return [TextContent(
+            type="text",
+            text=text
+        )]
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error getting metrics: {str(e)}"
+        )]
+
+def search_filter_of(package_prefix: str, class_prefix: str) -> Optional[SearchFilter]:
+    """Build the filter of a tool's package and class prefix arguments, None when both are empty"""
+    if not package_prefix and not class_prefix:
+        return None
+    return SearchFilter(package_prefix=package_prefix, class_prefix=class_prefix)
+
+def format_result(i: int, result: dict) -> str:
+    """Format one search result for a tool response"""
+    metadata = result["metadata"]
+    text = f"\n--- Result {i+1} (score: {result['score']:.4f}) ---\n"
+    if result.get("match"):
+        text += f"Match: {result['match']}\n"
+    text += f"File: {metadata.get('file_path', 'Unknown')}\n"
+    text += f"Type: {metadata.get('type', 'Unknown')}\n"
+    if metadata.get("class_name"):
+        text += f"Class: {metadata.get('class_name')}\n"
+    if metadata.get("method_name"):
+        text += f"Method: {metadata.get('method_name')}\n"
+    if metadata.get("start_line"):
+        text += f"Lines: {metadata['start_line']}-{metadata['end_line']}\n"
+    text += f"\n{result.get('content') or 'No content available'}\n"
+    return text
+
+@mcp.tool()
+async def read_codebase(
+    project_name: str,
+    question: str,
+    ctx: Context,
+    mode: str = "",
+    package_prefix: str = "",
+    class_prefix: str = ""
+) -> str:
+    """Tool that reads the codebase, by vector, lexical (BM25 and symbol lookup) or hybrid search, optionally within a package or class"""
+    try:
+        codebase_service = get_codebase_service(ctx)
         results = await codebase_service.query_codebase(
             project_name=project_name,
             question=question,
-            limit=5
+            limit=5,
+            mode=mode or None,
+            search_filter=search_filter_of(package_prefix, class_prefix)
         )
         
         if not results:
@@ -95,17 +261,7 @@ async def read_codebase(project_name: str, question: str, ctx: Context) -> str:
 
         response_text = f"Query: {question}\n\nResults:\n"
         for i, result in enumerate(results):
-            metadata = result["metadata"]
-            score = result["score"]
-            
-            response_text += f"\n--- Result {i+1} (similarity: {score:.4f}) ---\n"
-            response_text += f"File: {metadata.get('file_path', 'Unknown')}\n"
-            response_text += f"Type: {metadata.get('type', 'Unknown')}\n"
-            if metadata.get("class_name"):
-                response_text += f"Class: {metadata.get('class_name')}\n"
-            if metadata.get("method_name"):
-                response_text += f"Method: {metadata.get('method_name')}\n"
-            response_text += f"\n{metadata.get('content', 'No content available')}\n"
+            response_text += format_result(i, result)
         
         return [TextContent(
             type="text",
@@ -118,5 +274,70 @@ async def read_codebase(project_name: str, question: str, ctx: Context) -> str:
             text=f"Error querying codebase: {str(e)}"
         )]
 
+@mcp.tool()
+async def search_batch(
+    project_name: str,
+    questions: List[str],
+    ctx: Context,
+    limit: int = 5,
+    mode: str = "",
+    package_prefix: str = "",
+    class_prefix: str = ""
+) -> str:
+    """Tool that answers several questions about the codebase in one call, listing every code snippet once"""
+    try:
+        codebase_service = get_codebase_service(ctx)
+        groups = await codebase_service.query_codebase_batch(
+            project_name=project_name,
+            questions=questions,
+            limit=limit,
+            mode=mode or None,
+            search_filter=search_filter_of(package_prefix, class_prefix)
+        )
+        
+        if not groups:
+            return [TextContent(
+                type="text",
+                text=f"No results found for {len(questions)} queries"
+            )]
+
+        response_text = ""
+        for index, group in enumerate(groups):
+            response_text += f"\n=== Query {index + 1}: {group['question']} ===\n"
+            if not group["results"]:
+                response_text += "No new results (see the other queries)\n"
+            for i, result in enumerate(group["results"]):
+                response_text += format_result(i, result)
+                others = [str(other + 1) for other in result["questions"] if other != index]
+                if others:
+                    response_text += f"Also matches queries: {', '.join(others)}\n"
+        
+        return [TextContent(
+            type="text",
+            text=response_text
+        )]
+    
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error querying codebase: {str(e)}"
+        )]
+
+@mcp.tool()
+async def health_check(ctx: Context) -> str:
+    """Tool that checks the vector storage and embedding backends"""
+    try:
+        codebase_service = get_codebase_service(ctx)
+        status = await codebase_service.health_check()
+        return [TextContent(
+            type="text",
+            text="\n".join(f"{name}: {'ok' if ok else 'failed'}" for name, ok in status.items())
+        )]
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error checking health: {str(e)}"
+        )]
+
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
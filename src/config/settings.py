@@ -6,17 +6,87 @@ class Settings(BaseSettings):
     """Application settings."""
     
     # Google API settings
-    GOOGLE_API_KEY: str
+    GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
+
+    # Embedding provider settings
+    EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "google")  # google, hashing
     
+    # Vector storage settings
+    VECTOR_STORAGE_BACKEND: str = os.getenv("VECTOR_STORAGE_BACKEND", "qdrant")  # qdrant, local
+    LOCAL_VECTOR_STORAGE_PATH: str = os.getenv("LOCAL_VECTOR_STORAGE_PATH", os.path.join("~", ".codebase-mcp", "vectors"))
+    VECTOR_TENANCY: str = os.getenv("VECTOR_TENANCY", "shared")  # shared, collection, shard (Qdrant only)
+
     # Qdrant settings
     QDRANT_HOST: str = os.getenv("QDRANT_HOST", "qdrant")
     QDRANT_PORT: int = os.getenv("QDRANT_PORT", 6333)
     QDRANT_GRPC_PORT: Optional[int] = os.getenv("QDRANT_GRPC_PORT", 6334)
     QDRANT_COLLECTION_NAME: str = os.getenv("QDRANT_COLLECTION_NAME", "code_vectors")
     VECTOR_SIZE: int = os.getenv("VECTOR_SIZE", 3072)
-    
+    QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", False)
+    QDRANT_UPSERT_BATCH_SIZE: int = os.getenv("QDRANT_UPSERT_BATCH_SIZE", 256)
+    QDRANT_UPSERT_WORKERS: int = os.getenv("QDRANT_UPSERT_WORKERS", 4)
+
+    # Collection layout settings, applied when a collection is created
+    VECTOR_QUANTIZATION: str = os.getenv("VECTOR_QUANTIZATION", "none")  # none, scalar, binary
+    VECTOR_QUANTIZATION_ALWAYS_RAM: bool = os.getenv("VECTOR_QUANTIZATION_ALWAYS_RAM", True)
+    VECTOR_ON_DISK: bool = os.getenv("VECTOR_ON_DISK", False)
+    PAYLOAD_ON_DISK: bool = os.getenv("PAYLOAD_ON_DISK", False)
+    HNSW_M: Optional[int] = os.getenv("HNSW_M")
+    HNSW_EF_CONSTRUCT: Optional[int] = os.getenv("HNSW_EF_CONSTRUCT")
+    VECTOR_DIMENSIONS: Optional[int] = os.getenv("VECTOR_DIMENSIONS")  # Matryoshka truncation of VECTOR_SIZE
+    VECTOR_RERANK_FULL: bool = os.getenv("VECTOR_RERANK_FULL", False)
+
+    # Vector search settings
+    SEARCH_HNSW_EF: Optional[int] = os.getenv("SEARCH_HNSW_EF")
+    SEARCH_EXACT: bool = os.getenv("SEARCH_EXACT", False)
+    SEARCH_RESCORE: bool = os.getenv("SEARCH_RESCORE", True)
+    SEARCH_OVERSAMPLING: Optional[float] = os.getenv("SEARCH_OVERSAMPLING", 2.0)
+    SEARCH_RERANK_FACTOR: float = os.getenv("SEARCH_RERANK_FACTOR", 4.0)
+
+    # Embedding scheduler settings
+    EMBEDDING_BATCH_SIZE: int = os.getenv("EMBEDDING_BATCH_SIZE", 50)
+    EMBEDDING_MAX_BATCH_TOKENS: int = os.getenv("EMBEDDING_MAX_BATCH_TOKENS", 60000)
+    EMBEDDING_CONCURRENCY: int = os.getenv("EMBEDDING_CONCURRENCY", 4)
+    EMBEDDING_MAX_RETRIES: int = os.getenv("EMBEDDING_MAX_RETRIES", 5)
+    EMBEDDING_RETRY_BASE_DELAY: float = os.getenv("EMBEDDING_RETRY_BASE_DELAY", 1.0)
+
+    # Embedding cache settings
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", True)
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("~", ".codebase-mcp", "embedding_cache.sqlite3"))
+    EMBEDDING_CACHE_MAX_BYTES: int = os.getenv("EMBEDDING_CACHE_MAX_BYTES", 2 * 1024 ** 3)
+
+    # Query cache settings
+    QUERY_EMBEDDING_CACHE_SIZE: int = os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 1024)
+    QUERY_RESULT_CACHE_SIZE: int = os.getenv("QUERY_RESULT_CACHE_SIZE", 1024)
+    QUERY_CACHE_TTL_SECONDS: float = os.getenv("QUERY_CACHE_TTL_SECONDS", 3600)
+
+    # Search settings
+    SEARCH_MODE: str = os.getenv("SEARCH_MODE", "vector")  # vector, lexical, hybrid
+    HYBRID_RRF_K: int = os.getenv("HYBRID_RRF_K", 60)
+    HYBRID_CANDIDATE_FACTOR: int = os.getenv("HYBRID_CANDIDATE_FACTOR", 4)
+
+    # Result content settings, payloads only hold file paths and line ranges
+    CONTENT_SOURCE: str = os.getenv("CONTENT_SOURCE", "source")  # source, store
+    CONTENT_STORE_PATH: str = os.getenv("CONTENT_STORE_PATH", os.path.join("~", ".codebase-mcp", "content.sqlite3"))
+
+    # Server settings
+    STARTUP_WARMUP_EMBEDDING: bool = os.getenv("STARTUP_WARMUP_EMBEDDING", True)
+
     # Project settings
     DEFAULT_LANGUAGE: str = "java"
+    PARSER_WORKERS: int = os.getenv("PARSER_WORKERS", 1)
+    INGEST_QUEUE_SIZE: int = os.getenv("INGEST_QUEUE_SIZE", 256)
+
+    # Watch mode settings
+    WATCH_BACKEND: str = os.getenv("WATCH_BACKEND", "auto")  # auto, inotify, polling
+    WATCH_DEBOUNCE_SECONDS: float = os.getenv("WATCH_DEBOUNCE_SECONDS", 0.25)
+    WATCH_POLL_INTERVAL: float = os.getenv("WATCH_POLL_INTERVAL", 0.5)
+
+    # Chunking settings
+    CHUNK_STRATEGY: str = os.getenv("CHUNK_STRATEGY", "method")  # file, method
+    CHUNK_MAX_TOKENS: int = os.getenv("CHUNK_MAX_TOKENS", 2048)
+    CHUNK_OVERLAP_TOKENS: int = os.getenv("CHUNK_OVERLAP_TOKENS", 128)
+    INDEX_STATE_DIR: str = os.getenv("INDEX_STATE_DIR", os.path.join("~", ".codebase-mcp"))
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,204 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Set, Tuple
+
+from services.vector_embedding import estimate_tokens
+from type_definitions.code_types import CodeDataForVector, CodeVectorMetadata
+from type_definitions.parse_records import ParsedClass, ParsedCode, ParsedMethod
+
+
+class CodeChunker(ABC):
+    """Strategy that splits a parsed file into the chunks sent to the embedding model."""
+
+    @abstractmethod
+    def chunk(self, code_metadata: ParsedCode, project_name: str = "") -> List[CodeDataForVector]:
+        """Split a parsed file into chunks.
+
+        Args:
+            code_metadata: Parsed file, as compact records or pydantic models
+            project_name: Name of the project the file belongs to
+
+        Returns:
+            List of chunks with their vector metadata
+        """
+
+
+class FileChunker(CodeChunker):
+    """Chunker that embeds each file as a single vector."""
+
+    def chunk(self, code_metadata: ParsedCode, project_name: str = "") -> List[CodeDataForVector]:
+        return [CodeDataForVector(
+            transfer_body=code_metadata.content,
+            metadata=CodeVectorMetadata.from_code_metadata(code_metadata, project_name)
+        )]
+
+
+class MethodChunker(CodeChunker):
+    """Chunker producing one summary chunk per class and one chunk per method.
+
+    Class summaries hold the class declaration, its fields and its method
+    signatures. Methods larger than the token budget are split by lines into
+    overlapping parts. Every chunk starts with a short header naming its
+    package and class, so small chunks keep their context.
+    """
+
+    def __init__(self, max_tokens: int = 2048, overlap_tokens: int = 128):
+        """Initialize the method chunker.
+
+        Args:
+            max_tokens: Maximum estimated tokens per chunk
+            overlap_tokens: Estimated tokens repeated between parts of a split method
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_tokens = max(1, int(max_tokens))
+        self.overlap_tokens = max(0, min(int(overlap_tokens), self.max_tokens // 2))
+
+    def chunk(self, code_metadata: ParsedCode, project_name: str = "") -> List[CodeDataForVector]:
+        if not code_metadata.classes:
+            return FileChunker().chunk(code_metadata, project_name)
+
+        chunks = []
+        used_ids: Set[str] = set()
+        for class_info in code_metadata.classes:
+            chunks.append(self._class_summary_chunk(code_metadata, class_info, project_name, used_ids))
+            for method in class_info.methods:
+                chunks.extend(self._method_chunks(code_metadata, class_info, method, project_name, used_ids))
+        return chunks
+
+    def _unique_chunk_id(self, chunk_id: str, used_ids: Set[str]) -> str:
+        """Make a chunk ID unique within its file."""
+        unique_id = chunk_id
+        counter = 1
+        while unique_id in used_ids:
+            counter += 1
+            unique_id = f"{chunk_id}~{counter}"
+        used_ids.add(unique_id)
+        return unique_id
+
+    def _header(self, code_metadata: ParsedCode, class_info: ParsedClass) -> str:
+        """Build the context header prepended to every chunk of a class."""
+        qualified_name = f"{code_metadata.package}.{class_info.name}" if code_metadata.package else class_info.name
+        return f"// File: {code_metadata.file_path}\n// Class: {qualified_name}\n"
+
+    def _method_signature(self, method: ParsedMethod) -> str:
+        """Get the declaration of a method without its body."""
+        body = method.body
+        name_index = body.find(f"{method.name}(") if method.name else -1
+        end = len(body)
+        for terminator in ("{", ";"):
+            index = body.find(terminator, max(name_index, 0))
+            if index != -1:
+                end = min(end, index)
+        return " ".join(body[:end].split())
+
+    def _class_declaration(self, class_info: ParsedClass) -> str:
+        """Get the declaration line of a class without its body."""
+        body = class_info.body
+        name_index = body.find(class_info.name) if class_info.name else 0
+        index = body.find("{", max(name_index, 0))
+        declaration = " ".join(body[:index if index != -1 else len(body)].split())
+        # Anonymous class bodies start at their brace and have no declaration
+        return declaration or class_info.name
+
+    def _class_summary_chunk(
+        self,
+        code_metadata: ParsedCode,
+        class_info: ParsedClass,
+        project_name: str,
+        used_ids: Set[str]
+    ) -> CodeDataForVector:
+        """Build the summary chunk of a class."""
+        lines = [self._class_declaration(class_info) + " {"]
+        lines.extend(f"    {' '.join(field.body.split())}" for field in class_info.fields)
+        lines.extend(f"    {self._method_signature(method)};" for method in class_info.methods)
+        lines.append("}")
+
+        metadata = CodeVectorMetadata(
+            project_name=project_name,
+            file_path=code_metadata.file_path,
+            chunk_id=self._unique_chunk_id(f"class:{class_info.name}", used_ids),
+            type="class",
+            package=code_metadata.package,
+            class_name=class_info.name,
+            methods_name=[method.name for method in class_info.methods],
+            fields_name=[field.name for field in class_info.fields],
+            start_line=class_info.start_line + 1,
+            end_line=class_info.end_line + 1
+        )
+        return CodeDataForVector(
+            transfer_body=self._header(code_metadata, class_info) + "\n".join(lines),
+            metadata=metadata
+        )
+
+    def _method_chunks(
+        self,
+        code_metadata: ParsedCode,
+        class_info: ParsedClass,
+        method: ParsedMethod,
+        project_name: str,
+        used_ids: Set[str]
+    ) -> List[CodeDataForVector]:
+        """Build the chunks of a method, splitting it when over the token budget."""
+        header = self._header(code_metadata, class_info)
+        parameter_types = ",".join(parameter.type for parameter in method.parameters)
+        chunk_id = self._unique_chunk_id(
+            f"method:{class_info.name}.{method.name}({parameter_types})",
+            used_ids
+        )
+        parts = self._split(method.body, self.max_tokens - estimate_tokens(header))
+
+        chunks = []
+        for index, (text, first_line, last_line) in enumerate(parts):
+            metadata = CodeVectorMetadata(
+                project_name=project_name,
+                file_path=code_metadata.file_path,
+                chunk_id=chunk_id if len(parts) == 1 else f"{chunk_id}#{index}",
+                type="method",
+                package=code_metadata.package,
+                class_name=class_info.name,
+                method_name=method.name,
+                start_line=method.start_line + 1 + first_line,
+                end_line=method.start_line + 1 + last_line
+            )
+            chunks.append(CodeDataForVector(transfer_body=header + text, metadata=metadata))
+        return chunks
+
+    def _split(self, text: str, budget: int) -> List[Tuple[str, int, int]]:
+        """Split text by lines into parts of at most ``budget`` estimated tokens.
+
+        Consecutive parts share roughly ``overlap_tokens`` of trailing lines.
+        A single line over the budget becomes a part of its own.
+
+        Args:
+            text: Text to split
+            budget: Maximum estimated tokens per part
+
+        Returns:
+            List of (part text, first line offset, last line offset) tuples
+        """
+        budget = max(1, budget)
+        if estimate_tokens(text) <= budget:
+            return [(text, 0, text.count("\n"))]
+
+        lines = text.split("\n")
+        line_tokens = [estimate_tokens(line + "\n") for line in lines]
+        parts = []
+        start = 0
+        while start < len(lines):
+            end = start
+            tokens = 0
+            while end < len(lines) and (end == start or tokens + line_tokens[end] <= budget):
+                tokens += line_tokens[end]
+                end += 1
+            parts.append(("\n".join(lines[start:end]), start, end - 1))
+            if end >= len(lines):
+                break
+
+            # Step back over trailing lines to overlap the next part
+            next_start = end
+            overlap = 0
+            while next_start - 1 > start and overlap + line_tokens[next_start - 1] <= self.overlap_tokens:
+                next_start -= 1
+                overlap += line_tokens[next_start]
+            start = next_start
+        return parts
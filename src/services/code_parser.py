@@ -1,18 +1,60 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterator, Optional, Any, Tuple
 import logging
 
-from type_definitions.code_types import ClassInfo, CodeMetadata, FieldInfo, MethodInfo, ParameterInfo
+from type_definitions.code_types import CodeMetadata
+from type_definitions.parse_records import (
+    ClassRecord,
+    FieldRecord,
+    MethodRecord,
+    ParameterRecord,
+    ParsedFile,
+    SourceBuffer
+)
 
 from config.settings import settings
+from services.metrics import metrics
 from tree_sitter_languages import get_language, get_parser
 
+# Every declaration the parser extracts, captured in a single pass over the tree.
+# One alternation is cheaper to match than a pattern per node type.
+DECLARATION_QUERY = """
+[
+  (package_declaration) (import_declaration)
+  (class_declaration) (interface_declaration) (enum_declaration) (record_declaration) (annotation_type_declaration)
+  (method_declaration) (annotation_type_element_declaration) (constructor_declaration) (compact_constructor_declaration)
+  (field_declaration) (constant_declaration) (enum_constant)
+] @declaration
+(object_creation_expression (class_body) @declaration)
+"""
+
+# Category and kind of each captured node type
+DECLARATION_KINDS = {
+    'package_declaration': ('package', ''),
+    'import_declaration': ('import', ''),
+    'class_declaration': ('type', 'class'),
+    'interface_declaration': ('type', 'interface'),
+    'enum_declaration': ('type', 'enum'),
+    'record_declaration': ('type', 'record'),
+    'annotation_type_declaration': ('type', 'annotation'),
+    'class_body': ('type', 'anonymous'),
+    'method_declaration': ('method', 'method'),
+    'annotation_type_element_declaration': ('method', 'method'),
+    'constructor_declaration': ('method', 'constructor'),
+    'compact_constructor_declaration': ('method', 'constructor'),
+    'field_declaration': ('field', 'field'),
+    'constant_declaration': ('field', 'field'),
+    'enum_constant': ('field', 'constant'),
+}
+
 class JavaCodeParser:
     """Parser for Java source code using tree-sitter.
     
     This class provides functionality to parse Java source files and extract
-    structural information such as classes, methods, and fields.
+    structural information such as classes, interfaces, enums, records,
+    methods, constructors and fields.
     """
     
     def __init__(self):
@@ -20,6 +62,7 @@ class JavaCodeParser:
         try:
             self.JAVA_LANGUAGE = get_language('java')
             self.parser = get_parser('java')
+            self._declaration_query = self.JAVA_LANGUAGE.query(DECLARATION_QUERY)
             self.logger = logging.getLogger(__name__)
         except Exception as e:
             self.logger.error(f"Failed to initialize Java parser: {str(e)}")
@@ -37,53 +80,54 @@ class JavaCodeParser:
         """
         return content[node.start_byte:node.end_byte].decode('utf-8')
 
-    def _extract_parameters(self, params_node: Any, content: bytes) -> List[Dict[str, str]]:
+    def _extract_parameters(self, params_node: Any, source: SourceBuffer) -> List[ParameterRecord]:
         """Extract method parameters from a formal_parameters node.
         
         Args:
             params_node: Tree-sitter node containing formal parameters
-            content: Source file content in bytes
+            source: Source buffer of the file
             
         Returns:
-            List of parameter information dictionaries
+            List of parameter records
         """
         parameters = []
-        for param in params_node.children:
-            if param.type == 'formal_parameter':
-                param_info = self._extract_parameter_info(param, content)
+        for param in params_node.named_children:
+            if param.type in ('formal_parameter', 'spread_parameter'):
+                param_info = self._extract_parameter_info(param, source)
                 if param_info:
                     parameters.append(param_info)
         return parameters
 
-    def _extract_parameter_info(self, param_node: Any, content: bytes) -> Optional[Dict[str, str]]:
+    def _extract_parameter_info(self, param_node: Any, source: SourceBuffer) -> Optional[ParameterRecord]:
         """Extract information from a single parameter node.
         
         Args:
-            param_node: Tree-sitter node for a single parameter
-            content: Source file content in bytes
+            param_node: Tree-sitter node for a formal or varargs parameter
+            source: Source buffer of the file
             
         Returns:
-            Parameter information dictionary or None if incomplete
+            Parameter record or None if incomplete
         """
-        param_type = None
-        param_name = None
+        type_node = param_node.child_by_field_name('type')
+        name_node = param_node.child_by_field_name('name')
+        if param_node.type == 'spread_parameter':
+            # Varargs carry neither field: the type is the first non-modifier child
+            type_node = next((child for child in param_node.named_children if child.type != 'modifiers'), None)
+            declarator = next((child for child in param_node.named_children if child.type == 'variable_declarator'), None)
+            name_node = declarator.child_by_field_name('name') if declarator else None
 
-        
-        for param_child in param_node.children:
-            if param_child.type == 'type_identifier':
-                param_type = self._extract_node_text(param_child, content)
-            elif param_child.type == 'identifier':
-                param_name = self._extract_node_text(param_child, content)
-                
-        if param_type and param_name:
-            return ParameterInfo(
-                type=param_type, 
-                name=param_name,
-                start_line=param_node.start_point[0],
-                end_line=param_node.end_point[0],
-                body=self._extract_node_text(param_node, content)
-            )
-        return None
+        if type_node is None or name_node is None:
+            return None
+        param_type = self._extract_node_text(type_node, source.data)
+        return ParameterRecord(
+            source,
+            param_node.start_byte,
+            param_node.end_byte,
+            param_node.start_point[0],
+            param_node.end_point[0],
+            name=self._extract_node_text(name_node, source.data),
+            type=param_type + '...' if param_node.type == 'spread_parameter' else param_type
+        )
 
     def _extract_modifiers(self, modifiers_node: Any, content: bytes) -> List[str]:
         """Extract modifiers (public, private, static, etc.) from a modifiers node.
@@ -98,190 +142,385 @@ class JavaCodeParser:
         return [self._extract_node_text(modifier, content) 
                 for modifier in modifiers_node.children]
 
-    def _extract_method_info(self, method_node: Any, content: bytes) -> MethodInfo:
-        """Extract information from a method declaration node.
+    def _apply_modifiers(self, node: Any, source: SourceBuffer, record: Any) -> None:
+        """Set the modifiers and annotation names of a declaration record.
         
         Args:
-            method_node: Tree-sitter node for method declaration
-            content: Source file content in bytes
+            node: Tree-sitter node of the declaration
+            source: Source buffer of the file
+            record: Record to update
+        """
+        modifiers_node = node.named_child(0)
+        if modifiers_node is None or modifiers_node.type != 'modifiers':
+            return
+        record.modifiers = self._extract_modifiers(modifiers_node, source.data)
+        record.annotations = [
+            self._extract_node_text(child.child_by_field_name('name'), source.data)
+            for child in modifiers_node.named_children
+            if child.type in ('marker_annotation', 'annotation')
+        ]
+
+    def _span(self, record_type: type, node: Any, source: SourceBuffer) -> Any:
+        """Create a record located at a tree-sitter node."""
+        return record_type(source, node.start_byte, node.end_byte, node.start_point[0], node.end_point[0])
+
+    def _extract_type_info(
+        self,
+        type_node: Any,
+        source: SourceBuffer,
+        kind: str,
+        parent: Optional[ClassRecord],
+        anonymous_counts: Dict[str, int]
+    ) -> ClassRecord:
+        """Extract a class, interface, enum, record, annotation type or anonymous class.
+        
+        Nested types are named after their enclosing type (``Outer.Inner``) and
+        anonymous classes are numbered per enclosing type (``Outer$1``).
+        
+        Args:
+            type_node: Tree-sitter node of the declaration, or the class_body of an anonymous class
+            source: Source buffer of the file
+            kind: Kind of type declaration
+            parent: Innermost enclosing type, if any
+            anonymous_counts: Anonymous classes seen so far per enclosing type
             
         Returns:
-            Dictionary containing method information
+            Class record without members
         """
-        method_info = MethodInfo(
-            name='',
-            type='method',
-            return_type='',
-            parameters=[],
-            modifiers=[],
-            start_line=method_node.start_point[0],
-            end_line=method_node.end_point[0],
-            body=self._extract_node_text(method_node, content)
-        )
+        class_info = self._span(ClassRecord, type_node, source)
+        class_info.type = kind
 
-        for child in method_node.children:
-            if child.type == 'identifier':
-                method_info.name = self._extract_node_text(child, content)
-            elif child.type == 'modifiers':
-                method_info.modifiers = self._extract_modifiers(child, content)
-            elif child.type == 'formal_parameters':
-                method_info.parameters = self._extract_parameters(child, content)
-            elif child.type == 'type_identifier':
-                method_info.return_type = self._extract_node_text(child, content)
+        if kind == 'anonymous':
+            parent_name = parent.name if parent else ''
+            anonymous_counts[parent_name] = anonymous_counts.get(parent_name, 0) + 1
+            class_info.name = f"{parent_name}${anonymous_counts[parent_name]}"
+            return class_info
 
-        return method_info
+        name_node = type_node.child_by_field_name('name')
+        name = self._extract_node_text(name_node, source.data) if name_node else ''
+        class_info.name = f"{parent.name}.{name}" if parent else name
+        self._apply_modifiers(type_node, source, class_info)
 
-    def _extract_field_info(self, field_node: Any, content: bytes) -> FieldInfo:
-        """Extract information from a field declaration node.
+        if kind == 'record':
+            # Record components are the record's fields
+            params_node = type_node.child_by_field_name('parameters')
+            for component in self._extract_parameters(params_node, source) if params_node else []:
+                field_info = FieldRecord(
+                    source, component.start_byte, component.end_byte, component.start_line, component.end_line
+                )
+                field_info.name = component.name
+                field_info.type = component.type
+                class_info.fields.append(field_info)
+        return class_info
+
+    def _extract_method_info(self, method_node: Any, source: SourceBuffer, kind: str) -> MethodRecord:
+        """Extract information from a method or constructor declaration node.
         
         Args:
-            field_node: Tree-sitter node for field declaration
-            content: Source file content in bytes
+            method_node: Tree-sitter node for the declaration
+            source: Source buffer of the file
+            kind: ``method`` or ``constructor``
             
         Returns:
-            Dictionary containing field information
+            Method record
         """
-        field_info = FieldInfo(
-            type='field',
-            name='',
-            start_line=field_node.start_point[0],
-            end_line=field_node.end_point[0],
-            body=self._extract_node_text(field_node, content),
-            modifiers=[]
-        )
+        method_info = self._span(MethodRecord, method_node, source)
+        method_info.type = kind
 
-        for child in field_node.children:
-            if child.type == 'modifiers':
-                field_info.modifiers = self._extract_modifiers(child, content)
-            elif child.type == 'type_identifier':
-                field_info.type = self._extract_node_text(child, content)
-            elif child.type == 'variable_declarator':
-                for var_child in child.children:
-                    if var_child.type == 'identifier':
-                        field_info.name = self._extract_node_text(var_child, content)
+        name_node = method_node.child_by_field_name('name')
+        if name_node is not None:
+            method_info.name = self._extract_node_text(name_node, source.data)
+        type_node = method_node.child_by_field_name('type')
+        if type_node is not None:
+            method_info.return_type = self._extract_node_text(type_node, source.data)
+        params_node = method_node.child_by_field_name('parameters')
+        if params_node is not None:
+            method_info.parameters = self._extract_parameters(params_node, source)
+        self._apply_modifiers(method_node, source, method_info)
 
-        return field_info
+        return method_info
 
-    def _extract_class_info(self, class_node: Any, content: bytes) -> ClassInfo:
-        """Extract information from a class declaration node.
+    def _extract_field_info(self, field_node: Any, source: SourceBuffer, kind: str, owner: ClassRecord) -> FieldRecord:
+        """Extract information from a field, constant or enum constant node.
         
         Args:
-            class_node: Tree-sitter node for class declaration
-            content: Source file content in bytes
+            field_node: Tree-sitter node for the declaration
+            source: Source buffer of the file
+            kind: ``field`` or ``constant`` for enum constants
+            owner: Type declaring the field
             
         Returns:
-            Dictionary containing class information
+            Field record named after its first declarator
         """
-        class_info = ClassInfo(
-            name='',
-            type='class',
-            modifiers=[],
-            fields=[],
-            methods=[],
-            start_line=class_node.start_point[0],
-            end_line=class_node.end_point[0], 
-            body=self._extract_node_text(class_node, content)
-        )
+        field_info = self._span(FieldRecord, field_node, source)
 
-        for child in class_node.children:
-            if child.type == 'identifier':
-                class_info.name = self._extract_node_text(child, content)
-            elif child.type == 'modifiers':
-                class_info.modifiers = self._extract_modifiers(child, content)
-            elif child.type == 'class_body':
-                self._process_class_body(child, content, class_info)
+        if kind == 'constant':
+            field_info.name = self._extract_node_text(field_node.child_by_field_name('name'), source.data)
+            field_info.type = owner.name
+            return field_info
 
-        return class_info
+        type_node = field_node.child_by_field_name('type')
+        if type_node is not None:
+            field_info.type = self._extract_node_text(type_node, source.data)
+        declarator = field_node.child_by_field_name('declarator')
+        name_node = declarator.child_by_field_name('name') if declarator else None
+        if name_node is not None:
+            field_info.name = self._extract_node_text(name_node, source.data)
+        self._apply_modifiers(field_node, source, field_info)
+
+        return field_info
 
-    def _process_class_body(self, body_node: Any, content: bytes, class_info: ClassInfo) -> None:
-        """Process the body of a class node to extract fields and methods.
+    def _extract_file_metadata(self, root_node: Any, source: SourceBuffer, file_info: ParsedFile) -> None:
+        """Extract package, imports and every type declaration in one query pass.
+        
+        Captures come back in source order, so a stack of open type
+        declarations tells which type each member belongs to. Nested and
+        anonymous types are listed in ``file_info.classes`` after their
+        enclosing type, with their own members.
         
         Args:
-            body_node: Tree-sitter node for class body
-            content: Source file content in bytes
-            class_info: Dictionary to update with extracted information
+            root_node: Root tree-sitter node
+            source: Source buffer of the file
+            file_info: Parsed file to update
         """
-        for child in body_node.children:
-            if child.type == 'field_declaration':
-                field_info = self._extract_field_info(child, content)
-                class_info.fields.append(field_info)
-            elif child.type == 'method_declaration':
-                method_info = self._extract_method_info(child, content)
-                class_info.methods.append(method_info)
+        captures = self._declaration_query.captures(root_node)
+        captures.sort(key=lambda capture: (capture[0].start_byte, -capture[0].end_byte))
+
+        open_types: List[ClassRecord] = []
+        anonymous_counts: Dict[str, int] = {}
+        for node, _ in captures:
+            while open_types and open_types[-1].end_byte <= node.start_byte:
+                open_types.pop()
+            category, kind = DECLARATION_KINDS[node.type]
+
+            if category in ('package', 'import'):
+                name_node = next(
+                    (child for child in node.named_children if child.type in ('scoped_identifier', 'identifier')),
+                    None
+                )
+                if name_node is None:
+                    continue
+                if category == 'package':
+                    file_info.package = self._extract_node_text(name_node, source.data)
+                else:
+                    file_info.imports.append(self._extract_node_text(name_node, source.data))
+            elif category == 'type':
+                parent = open_types[-1] if open_types else None
+                class_info = self._extract_type_info(node, source, kind, parent, anonymous_counts)
+                file_info.classes.append(class_info)
+                open_types.append(class_info)
+            elif not open_types:
+                continue
+            elif category == 'method':
+                open_types[-1].methods.append(self._extract_method_info(node, source, kind))
+            elif category == 'field':
+                open_types[-1].fields.append(self._extract_field_info(node, source, kind, open_types[-1]))
 
-    def _extract_file_metadata(self, root_node: Any, content: bytes, file_info: CodeMetadata) -> None:
-        """Extract package and import information from file.
+    def parse_source(
+        self,
+        file_path: str,
+        content: bytes,
+        old_tree: Optional[Any] = None
+    ) -> Optional[Tuple[ParsedFile, Any]]:
+        """Parse Java source into compact records, optionally reusing a previous tree.
+        
+        When ``old_tree`` is given it must already have been updated with
+        ``tree.edit`` for the change between its source and ``content``, so
+        tree-sitter only re-parses the edited region.
         
         Args:
-            root_node: Root tree-sitter node
-            content: Source file content in bytes
-            file_info: CodeMetadata object to update
+            file_path: Path recorded in the parsed file
+            content: Raw file content
+            old_tree: Edited tree of the previous version of the file
+            
+        Returns:
+            Tuple of the parsed file records and the new syntax tree, or None if parsing fails
         """
-        for child in root_node.children:
-            if child.type == 'package_declaration':
-                for pkg_child in child.children:
-                    if pkg_child.type == 'scoped_identifier':
-                        file_info.package = self._extract_node_text(pkg_child, content)
-            elif child.type == 'import_declaration':
-                for imp_child in child.children:
-                    if imp_child.type == 'scoped_identifier':
-                        file_info.imports.append(self._extract_node_text(imp_child, content))
-            elif child.type == 'class_declaration':
-                class_info = self._extract_class_info(child, content)
-                file_info.classes.append(class_info)
+        try:
+            with metrics.timer("stage_seconds", stage="tree_sitter"):
+                tree = self.parser.parse(content, old_tree) if old_tree is not None else self.parser.parse(content)
 
-    def parse_file(self, file_path: str) -> Optional[CodeMetadata]:
-        """Parse a single Java file and extract its structure.
+            with metrics.timer("stage_seconds", stage="extract"):
+                # Records decode lazily, so invalid UTF-8 must fail here, where the file is skipped
+                content.decode("utf-8")
+                source = SourceBuffer(content)
+                file_info = ParsedFile(file_path, source)
+                self._extract_file_metadata(tree.root_node, source, file_info)
+
+            metrics.inc("files_parsed_total")
+            metrics.inc("parsed_bytes_total", len(content))
+            return file_info, tree
+
+        except Exception as e:
+            metrics.inc("parse_errors_total")
+            self.logger.error(f"Error parsing file {file_path}: {str(e)}")
+            return None
+
+    def parse_file_records(self, file_path: str) -> Optional[ParsedFile]:
+        """Parse a single Java file into compact records.
+        
+        Source text is kept once as bytes and only decoded when a record's
+        ``body`` or the file's ``content`` is read.
         
         Args:
             file_path: Path to the Java file
             
         Returns:
-            Dictionary containing the parsed content or None if parsing fails
+            Parsed file records or None if parsing fails
         """
         try:
             with open(file_path, 'rb') as f:
                 content = f.read()
+        except Exception as e:
+            metrics.inc("parse_errors_total")
+            self.logger.error(f"Error parsing file {file_path}: {str(e)}")
+            return None
 
-            file_info = CodeMetadata(
-                file_path=file_path,
-                content=content.decode('utf-8'),
-                size=len(content.splitlines()),
-                classes=[],
-                imports=[],
-                package=""
-            )
+        parsed = self.parse_source(file_path, content)
+        return parsed[0] if parsed is not None else None
 
-            tree = self.parser.parse(content)
-            self._extract_file_metadata(tree.root_node, content, file_info)
+    def parse_file(self, file_path: str) -> Optional[CodeMetadata]:
+        """Parse a single Java file and extract its structure.
+        
+        Args:
+            file_path: Path to the Java file
+            
+        Returns:
+            Dictionary containing the parsed content or None if parsing fails
+        """
+        parsed_file = self.parse_file_records(file_path)
+        if parsed_file is None:
+            return None
+        file_info = parsed_file.to_code_metadata()
+        self.logger.debug(f"Parsed file {file_path} with metadata: {file_info}")
+        return file_info
 
-            self.logger.debug(f"Parsed file {file_path} with metadata: {file_info}")
+    def iter_java_files(self, directory_path: str) -> Iterator[str]:
+        """Lazily yield all Java files in a directory.
+        
+        Args:
+            directory_path: Path to the directory containing Java files
             
-            return file_info
+        Yields:
+            Java file paths, in directory walk order
+        """
+        for root, _, files in os.walk(directory_path):
+            for file in files:
+                if file.endswith('.java'):
+                    yield os.path.join(root, file)
 
-        except Exception as e:
-            self.logger.error(f"Error parsing file {file_path}: {str(e)}")
-            return None
+    def list_java_files(self, directory_path: str) -> List[str]:
+        """List all Java files in a directory.
+        
+        Args:
+            directory_path: Path to the directory containing Java files
+            
+        Returns:
+            List of Java file paths, in directory walk order
+        """
+        return list(self.iter_java_files(directory_path))
 
-    def parse_directory(self, directory_path: str) -> List[CodeMetadata]:
+    def iter_parsed_files(self, directory_path: str, workers: Optional[int] = None) -> Iterator[ParsedFile]:
+        """Parse all Java files in a directory into compact records.
+        
+        Args:
+            directory_path: Path to the directory containing Java files
+            workers: Number of parser processes (defaults to settings.PARSER_WORKERS,
+                0 means one per CPU core, 1 parses serially in this process)
+            
+        Yields:
+            Parsed file records, in directory walk order; files failing to parse are skipped
+        """
+        workers = settings.PARSER_WORKERS if workers is None else workers
+        workers = int(workers) or os.cpu_count() or 1
+
+        file_paths = self.list_java_files(directory_path)
+        if workers > 1 and len(file_paths) > 1:
+            yield from self._parse_files_parallel(file_paths, workers)
+            return
+
+        for file_path in file_paths:
+            parsed_file = self.parse_file_records(file_path)
+            if parsed_file is not None:
+                yield parsed_file
+
+    def parse_directory(self, directory_path: str, workers: Optional[int] = None) -> List[CodeMetadata]:
         """Parse all Java files in a directory.
         
         Args:
             directory_path: Path to the directory containing Java files
+            workers: Number of parser processes (defaults to settings.PARSER_WORKERS,
+                0 means one per CPU core, 1 parses serially in this process)
             
         Returns:
             List of parsed file contents
         """
         parsed_files = []
         try:
-            for root, _, files in os.walk(directory_path):
-                for file in files:
-                    if file.endswith('.java'):
-                        file_path = os.path.join(root, file)
-                        parsed_file = self.parse_file(file_path)
-                        if parsed_file:
-                            parsed_files.append(parsed_file)
+            for parsed_file in self.iter_parsed_files(directory_path, workers):
+                parsed_files.append(parsed_file.to_code_metadata())
         except Exception as e:
             self.logger.error(f"Error parsing directory {directory_path}: {str(e)}")
         
-        return parsed_files 
\ No newline at end of file
+        return parsed_files
+
+    def _parse_files_parallel(self, file_paths: List[str], workers: int) -> Iterator[ParsedFile]:
+        """Parse files across a process pool, keeping the input order.
+        
+        Each worker process owns one parser and sends back compact records,
+        which pickle as one source buffer plus small offset records.
+        
+        Args:
+            file_paths: Paths of the Java files to parse
+            workers: Number of worker processes
+            
+        Yields:
+            Parsed file records
+        """
+        workers = min(workers, len(file_paths))
+        chunksize = max(1, len(file_paths) // (workers * 4))
+        self.logger.info(f"Parsing {len(file_paths)} files with {workers} worker processes")
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_parse_worker) as executor:
+            for parsed_file in executor.map(parse_file_in_worker, file_paths, chunksize=chunksize):
+                record_worker_parse(parsed_file)
+                if parsed_file is not None:
+                    yield parsed_file
+
+
+# Parser owned by each worker process created with init_parse_worker
+_worker_parser: Optional[JavaCodeParser] = None
+
+
+def init_parse_worker() -> None:
+    """Create the parser of a worker process."""
+    global _worker_parser
+    _worker_parser = JavaCodeParser()
+
+
+def record_worker_parse(parsed_file: Optional[ParsedFile]) -> None:
+    """Count a file parsed by a worker process in this process's metrics.
+    
+    Worker processes record into their own registry, which never reaches
+    this one, so the parse counters are derived from the worker's result.
+    
+    Args:
+        parsed_file: Result of parse_file_in_worker
+    """
+    if parsed_file is None:
+        metrics.inc("parse_errors_total")
+        return
+    metrics.inc("files_parsed_total")
+    metrics.inc("parsed_bytes_total", len(parsed_file.source.data))
+
+
+def parse_file_in_worker(file_path: str) -> Optional[ParsedFile]:
+    """Parse a file in a worker process.
+    
+    Args:
+        file_path: Path to the Java file
+        
+    Returns:
+        The parsed file records, or None if parsing fails
+    """
+    return _worker_parser.parse_file_records(file_path)
@@ -1,8 +1,22 @@
+import os
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import logging
 from services.service_factory import ServiceFactory
-from type_definitions.code_types import CodeDataForVector, CodeVectorMetadata
+from services.codebase_watcher import CodebaseWatcher
+from services.content_store import load_contents
+from services.embedding_scheduler import EmbeddingScheduler
+from services.git_changes import GitRepository
+from services.index_manifest import index_settings_fingerprint
+from services.ingest_pipeline import IngestPipeline
+from services.lexical_index import LexicalIndex, extract_symbols, quotes_symbols, reciprocal_rank_fusion
+from services.metrics import metrics
+from services.query_cache import TTLCache
+from type_definitions.code_types import CodeDataForVector
+from type_definitions.index_types import FileManifestEntry, ProjectManifest
+from type_definitions.parse_records import ParsedCode
+from type_definitions.storage_types import SearchFilter
 from config.settings import settings
 
 
@@ -15,6 +29,20 @@ class CodebaseService:
         self.vector_storage = ServiceFactory.get_vector_storage()
         self.vector_embedding = ServiceFactory.get_vector_embedding()
         self.java_code_parser = ServiceFactory.get_java_code_parser()
+        self.index_manifest = ServiceFactory.get_index_manifest_store()
+        self.code_chunker = ServiceFactory.get_code_chunker()
+        self.lexical_indexes = ServiceFactory.get_lexical_index_store()
+        self.content_store = ServiceFactory.get_content_store()
+        self.query_embedding_cache = TTLCache(
+            settings.QUERY_EMBEDDING_CACHE_SIZE,
+            settings.QUERY_CACHE_TTL_SECONDS
+        )
+        self.query_result_cache = TTLCache(
+            settings.QUERY_RESULT_CACHE_SIZE,
+            settings.QUERY_CACHE_TTL_SECONDS
+        )
+        self._index_versions: Dict[str, int] = {}
+        self._watchers: Dict[str, CodebaseWatcher] = {}
 
     def _find_java_files(self, root_path: str) -> List[str]:
         """Find all Java files in the given directory and its subdirectories.
@@ -37,37 +65,261 @@ class CodebaseService:
         return java_files
     
 
-    def get_separated_code_for_vector(self, root_path: str) -> List[str]:
+    def _to_code_data_for_vector(self, code_metadata: ParsedCode, project_name: str = "") -> List[CodeDataForVector]:
+        """Convert a parsed file into the chunks sent to the embedding model.
+        
+        Args:
+            code_metadata: Parsed file, as compact records or pydantic models
+            project_name: Name of the project the file belongs to
+            
+        Returns:
+            List of CodeDataForVector, as split by the configured chunker
+        """
+        return self.code_chunker.chunk(code_metadata, project_name)
+
+    def get_separated_code_for_vector(self, root_path: str, project_name: str = "") -> List[CodeDataForVector]:
         """Get the separated code in the codebase for a project.
         
+        Args:
+            root_path: Root directory path containing the codebase
+            project_name: Name of the project, recorded in each vector's metadata
+            
+        """
+        chunks = []
+        files = 0
+        for parsed_file in self.java_code_parser.iter_parsed_files(root_path):
+            files += 1
+            chunks.extend(self._to_code_data_for_vector(parsed_file, project_name))
+        self.logger.info(f"Parsed {files} files in {root_path}")
+
+        return chunks
+
+    def _plan_update(
+        self,
+        project_name: str,
+        root_path: str,
+        incremental: bool
+    ) -> Tuple[ProjectManifest, Iterable[str], List[str], Dict[str, FileManifestEntry]]:
+        """Work out which files to embed and which points to delete.
+        
         Args:
             project_name: Name of the project
+            root_path: Root directory path containing the codebase
+            incremental: Whether to reuse the previous manifest
             
+        Returns:
+            Tuple of the previous manifest, files to ingest, stale point IDs and
+            fresh manifest entries of the files that are kept
         """
-        code_metadata_list = self.java_code_parser.parse_directory(root_path)
-        self.logger.info(f"Parsed {len(code_metadata_list)} files in {root_path}")
+        previous = self.index_manifest.load(project_name)
+        root = os.path.abspath(root_path)
+        fingerprint = index_settings_fingerprint()
 
-        result = []
-        for code_metadata in code_metadata_list:
-            # current strategy is put each file content into the vector
-            # TODO: test to put each class content into the vector instead of file content
-            # TODO: test to put each method content into the vector instead of file content
+        if incremental and self._manifest_applies(previous, root, fingerprint):
+            changes, entries = self.index_manifest.detect_changes(
+                previous,
+                self.java_code_parser.list_java_files(root_path)
+            )
+            self.logger.info(
+                f"Incremental update for project {project_name}: {len(changes.added)} added, "
+                f"{len(changes.modified)} modified, {len(changes.removed)} removed, "
+                f"{len(changes.unchanged)} unchanged"
+            )
+            stale_ids = previous.point_ids_for(changes.modified + changes.removed)
+            return previous, changes.changed, stale_ids, entries
+
+        if incremental:
+            self.logger.info(f"No usable manifest for project {project_name}, running a full update")
 
-            code_vector_metadata = CodeVectorMetadata.from_code_metadata(code_metadata)
-            code_data_for_vector = CodeDataForVector(
-                transfer_body=code_metadata.content,
-                metadata=code_vector_metadata
+        # Delete existing vectors for the project, dropping its collection when it has its own
+        if settings.VECTOR_TENANCY == "collection":
+            ServiceFactory.drop_project_collection(project_name)
+        else:
+            self.vector_storage.delete_project_vectors(self._collection(project_name), project_name)
+        self.lexical_indexes.get(project_name).clear()
+        stale_ids = list(previous.point_ids_for(list(previous.files))) if previous else []
+        manifest = ProjectManifest(project_name=project_name, root_path=root, settings_fingerprint=fingerprint)
+        return manifest, self.java_code_parser.iter_java_files(root_path), stale_ids, {}
+
+    def _manifest_applies(self, manifest: Optional[ProjectManifest], root: str, fingerprint: str) -> bool:
+        """Check whether a previous manifest can be updated instead of re-indexing everything.
+        
+        Args:
+            manifest: Previous manifest of the project, if any
+            root: Absolute root directory being indexed
+            fingerprint: Fingerprint of the current chunking and embedding settings
+            
+        Returns:
+            True if the manifest describes the same root indexed with the same settings
+        """
+        if manifest is None or manifest.root_path != root:
+            return False
+        if manifest.settings_fingerprint != fingerprint:
+            self.logger.info(
+                f"Chunking or embedding settings changed since project {manifest.project_name} was indexed"
             )
-            result.append(code_data_for_vector)
+            return False
+        return True
 
-        return result
+    def _plan_git_update(
+        self,
+        project_name: str,
+        root_path: str,
+        base_revision: str,
+        head_revision: Optional[str]
+    ) -> Optional[Tuple[ProjectManifest, List[str], List[str], Dict[str, FileManifestEntry], List[Tuple[str, str, str]]]]:
+        """Work out which files to embed, move and delete from a git diff.
+        
+        Only the files git reports as changed are looked at, so planning cost
+        follows the size of the diff rather than of the repository.
+        
+        Args:
+            project_name: Name of the project
+            root_path: Root directory path containing the codebase, inside a git working tree
+            base_revision: Revision indexed by the previous run
+            head_revision: Revision to index, which must be checked out, or None
+                for the working tree
+            
+        Returns:
+            Tuple of the previous manifest, files to ingest, stale point IDs,
+            manifest entries of the files that are kept and renamed files as
+            (old path, new path, old path relative to the repository) triples;
+            None when there is no manifest to apply the diff to
+        
+        Raises:
+            ValueError: If the working tree is not checked out at head_revision
+            RuntimeError: If git fails
+        """
+        previous = self.index_manifest.load(project_name)
+        root = os.path.abspath(root_path)
+        if not self._manifest_applies(previous, root, index_settings_fingerprint()):
+            return None
 
+        repository = GitRepository(root_path)
+        if head_revision is not None and repository.resolve(head_revision) != repository.resolve("HEAD"):
+            raise ValueError(f"The working tree of {root_path} is not checked out at {head_revision}")
+        changes = repository.diff(base_revision, head_revision)
+        previous.revision = repository.resolve(head_revision) if head_revision is not None else ""
+
+        # Git reports paths relative to the repository, the manifest uses paths under root_path
+        root_prefix = os.path.relpath(os.path.realpath(root), os.path.realpath(repository.toplevel()))
+
+        def local_path(path: str) -> Optional[str]:
+            relative = os.path.relpath(path, root_prefix)
+            if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+                return None
+            return os.path.join(root_path, relative)
+
+        added = [path for path in map(local_path, changes.added) if path]
+        modified = [path for path in map(local_path, changes.modified) if path]
+        deleted = [path for path in map(local_path, changes.deleted) if path]
+        renames = []
+        for renamed in changes.renamed:
+            old_path, new_path = local_path(renamed.old_path), local_path(renamed.new_path)
+            if old_path is not None and new_path is not None and old_path in previous.files:
+                renames.append((old_path, new_path, renamed.old_path))
+                continue
+            if old_path is not None:
+                deleted.append(old_path)
+            if new_path is not None:
+                added.append(new_path)
+
+        self.logger.info(
+            f"Revision update for project {project_name}: {len(added)} added, {len(modified)} modified, "
+            f"{len(deleted)} deleted, {len(renames)} renamed"
+        )
+        removed = set(deleted) | {old_path for old_path, _, _ in renames}
+        stale_ids = previous.point_ids_for(modified + sorted(removed))
+        entries = {path: entry for path, entry in previous.files.items() if path not in removed}
+        file_paths = [path for path in added + modified if os.path.isfile(path)]
+        return previous, file_paths, stale_ids, entries, renames
+
+    async def _move_renamed_files(
+        self,
+        project_name: str,
+        root_path: str,
+        base_revision: str,
+        renames: List[Tuple[str, str, str]]
+    ) -> Dict[str, List[str]]:
+        """Store the points of renamed files under their new paths, reusing stored vectors.
+        
+        The previous version of each file is read from git and chunked as if
+        it already had its new path. Chunks whose text is unchanged keep their
+        stored vector; only the others are embedded.
+        
+        Args:
+            project_name: Name of the project
+            root_path: Root directory path containing the codebase
+            base_revision: Revision the old versions are read from
+            renames: Renamed files as returned by _plan_git_update
+            
+        Returns:
+            Point IDs stored per new file path
+        """
+        repository = GitRepository(root_path)
+        reused: List[Tuple[CodeDataForVector, List[float]]] = []
+        to_embed: List[CodeDataForVector] = []
+
+        for old_path, new_path, base_path in renames:
+            parsed = self.java_code_parser.parse_file_records(new_path)
+            if parsed is None:
+                continue
+            chunks = self._to_code_data_for_vector(parsed, project_name)
+            old_parsed = self.java_code_parser.parse_source(new_path, repository.show(base_revision, base_path))
+            old_texts = {
+                chunk.metadata.chunk_id: chunk.transfer_body
+                for chunk in (self._to_code_data_for_vector(old_parsed[0], project_name) if old_parsed else [])
+            }
+
+            # Point IDs the unchanged chunks were stored under before the rename
+            old_ids = {
+                chunk.metadata.chunk_id: chunk.metadata.model_copy(update={"file_path": old_path}).point_id()
+                for chunk in chunks
+                if old_texts.get(chunk.metadata.chunk_id) == chunk.transfer_body
+            }
+            vectors = self.vector_storage.retrieve_vectors(self._collection(project_name), list(old_ids.values()))
+            for chunk in chunks:
+                old_id = old_ids.get(chunk.metadata.chunk_id)
+                if old_id is not None and old_id in vectors:
+                    reused.append((chunk, vectors[old_id]))
+                else:
+                    to_embed.append(chunk)
+
+        if to_embed:
+            embedded = await EmbeddingScheduler(self.vector_embedding).embed(to_embed)
+            reused.extend(zip(to_embed, embedded))
+        metrics.inc("renamed_chunks_total", len(reused) - len(to_embed), action="reused")
+        metrics.inc("renamed_chunks_total", len(to_embed), action="embedded")
+        self.logger.info(f"Moved {len(renames)} renamed files, {len(to_embed)} of {len(reused)} chunks embedded again")
+        if not reused:
+            return {}
+
+        metadata_list = [chunk.metadata for chunk, _ in reused]
+        point_ids = [metadata.point_id() for metadata in metadata_list]
+        if not self.vector_storage.store_vectors(
+            self._collection(project_name),
+            [vector for _, vector in reused],
+            metadata_list,
+            ids=point_ids
+        ):
+            raise Exception("Failed to store vectors")
+        self.lexical_indexes.get(project_name).add_chunks(chunk for chunk, _ in reused)
+        if self.content_store is not None:
+            self.content_store.add_chunks(chunk for chunk, _ in reused)
+
+        ids_by_file: Dict[str, List[str]] = {}
+        for metadata, point_id in zip(metadata_list, point_ids):
+            ids_by_file.setdefault(metadata.file_path, []).append(point_id)
+        return ids_by_file
 
     async def update_codebase(
         self,
         project_name: str,
         root_path: str,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        incremental: bool = False,
+        base_revision: Optional[str] = None,
+        head_revision: Optional[str] = None
     ) -> bool:
         """Update the codebase vectors for a project.
         
@@ -75,79 +327,549 @@ class CodebaseService:
             project_name: Name of the project
             root_path: Root directory path containing the codebase
             language: Programming language (defaults to settings.DEFAULT_LANGUAGE)
+            incremental: Only re-embed files added or changed since the last run
+                and delete points of removed files, based on the project manifest
+            base_revision: Git revision indexed by the previous run; when set,
+                only the files changed since that revision are re-indexed and
+                renamed files keep their vectors
+            head_revision: Git revision being indexed, which must be checked out
+                (defaults to the working tree)
             
         Returns:
             bool: True if successful, False otherwise
         """
+        start = time.perf_counter()
+        # Manifest keys and point IDs use file paths under the absolute root, as the watcher does
+        root_path = os.path.abspath(root_path)
         try:
-            # Delete existing vectors for the project
-            self.vector_storage.delete_project_vectors(
-                settings.QDRANT_COLLECTION_NAME,
-                project_name
-            )
-            
             language = language or settings.DEFAULT_LANGUAGE
-            vectors = []
-            vector_metadata_list = []
-            
-            java_files = self._find_java_files(root_path)
-            self.logger.info(f"Found {len(java_files)} Java files in {root_path}")
 
-            separated_codes = self.get_separated_code_for_vector(root_path)
+            if not incremental and base_revision is None:
+                java_files = self._find_java_files(root_path)
+                self.logger.info(f"Found {len(java_files)} Java files in {root_path}")
 
-            for separated_code in separated_codes:
-                separated_code_vector = await self.vector_embedding.generate_embedding(separated_code.transfer_body)
-                vectors.append(separated_code_vector)
-                vector_metadata_list.append(separated_code.metadata)
+            renames: List[Tuple[str, str, str]] = []
+            with metrics.timer("stage_seconds", stage="plan"):
+                plan = None
+                if base_revision is not None:
+                    plan = self._plan_git_update(project_name, root_path, base_revision, head_revision)
+                    if plan is None:
+                        self.logger.info(f"No usable manifest for project {project_name}, running a full update")
+                if plan is not None:
+                    previous, file_paths, stale_ids, entries, renames = plan
+                else:
+                    previous, file_paths, stale_ids, entries = self._plan_update(
+                        project_name,
+                        root_path,
+                        incremental
+                    )
+                    if base_revision is not None and head_revision is not None:
+                        previous.revision = GitRepository(root_path).resolve(head_revision)
 
-            # Store vectors and metadata
-            if vectors and vector_metadata_list:
-                success = self.vector_storage.store_vectors(
-                    settings.QDRANT_COLLECTION_NAME,
-                    vectors,
-                    vector_metadata_list
-                )
-                if not success:
-                    self.logger.error("Failed to store vectors")
-                    raise Exception("Failed to store vectors")
+            # Parse, embed and store as a bounded stream instead of holding every file in memory
+            pipeline = IngestPipeline(
+                java_code_parser=self.java_code_parser,
+                scheduler=EmbeddingScheduler(self.vector_embedding),
+                vector_storage=self.vector_storage,
+                collection_name=self._collection(project_name),
+                to_code_data=lambda code_metadata: self._to_code_data_for_vector(code_metadata, project_name),
+                lexical_index=self.lexical_indexes.get(project_name),
+                content_store=self.content_store
+            )
+            result = await pipeline.run(file_paths)
+            ids_by_file = dict(result.point_ids_by_file)
+            if renames:
+                ids_by_file.update(await self._move_renamed_files(project_name, root_path, base_revision, renames))
+
+            # Old points are only dropped once their replacements are stored,
+            # and points whose IDs were just upserted again are kept
+            current_ids = {point_id for ids in ids_by_file.values() for point_id in ids}
+            stale_ids = [point_id for point_id in stale_ids if point_id not in current_ids]
+            if stale_ids:
+                self.vector_storage.delete_points(self._collection(project_name), stale_ids)
+                self.lexical_indexes.get(project_name).remove(stale_ids)
+                if self.content_store is not None:
+                    self.content_store.remove(stale_ids)
+
+            self._save_manifest(previous, entries, ids_by_file)
             
-            self.logger.info(f"Stored {len(vectors)} vectors for project {project_name}")
+            metrics.inc("updates_total", status="success")
+            self.logger.info(f"Stored {result.vectors_stored} vectors for project {project_name}")
             return True
             
         except Exception as e:
+            metrics.inc("updates_total", status="failure")
             self.logger.error(f"Failed to update codebase for project {project_name}: {str(e)}")
             raise e
 
+        finally:
+            metrics.observe("update_seconds", time.perf_counter() - start)
+            # Even a failed run may have changed stored vectors
+            self.lexical_indexes.save(project_name)
+            self._invalidate_query_cache(project_name)
+
+    def _invalidate_query_cache(self, project_name: str) -> None:
+        """Start a new index version for a project and drop its cached results.
+        
+        Args:
+            project_name: Name of the re-indexed project
+        """
+        self._index_versions[project_name] = self._index_versions.get(project_name, 0) + 1
+        removed = self.query_result_cache.invalidate(lambda key: key[0] == project_name)
+        self.logger.debug(f"Invalidated {removed} cached query results for project {project_name}")
+
+    async def _get_query_embedding(self, question: str) -> List[float]:
+        """Get the embedding of a question, reusing recent embeddings of the same question.
+        
+        Args:
+            question: Normalized natural language question
+            
+        Returns:
+            Embedding of the question
+        """
+        query_vector = self.query_embedding_cache.get(question)
+        if query_vector is None:
+            metrics.inc("query_cache_misses_total", cache="embedding")
+            query_vector = await self.vector_embedding.generate_query_embedding(question)
+            self.query_embedding_cache.set(question, query_vector)
+        else:
+            metrics.inc("query_cache_hits_total", cache="embedding")
+        return query_vector
+
+    async def _get_query_embeddings(self, questions: List[str]) -> List[List[float]]:
+        """Get the embeddings of several questions, sending all cache misses in one batch.
+        
+        Args:
+            questions: Normalized natural language questions
+            
+        Returns:
+            Embedding of every question, in order
+        """
+        vectors: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        for question in dict.fromkeys(questions):
+            query_vector = self.query_embedding_cache.get(question)
+            if query_vector is None:
+                missing.append(question)
+            else:
+                vectors[question] = query_vector
+        metrics.inc("query_cache_hits_total", len(vectors), cache="embedding")
+        metrics.inc("query_cache_misses_total", len(missing), cache="embedding")
+
+        if missing:
+            generated = await self.vector_embedding.generate_query_embeddings_batch(missing)
+            for question, query_vector in zip(missing, generated):
+                self.query_embedding_cache.set(question, query_vector)
+                vectors[question] = query_vector
+        return [vectors[question] for question in questions]
+
+    def _save_manifest(
+        self,
+        manifest: ProjectManifest,
+        entries: Dict[str, FileManifestEntry],
+        ids_by_file: Dict[str, List[str]]
+    ) -> None:
+        """Record the files and point IDs of this run in the project manifest.
+        
+        Args:
+            manifest: Manifest to update
+            entries: Fresh entries of all files currently in the codebase
+            ids_by_file: Point IDs stored during this run, per file
+        """
+        files = {}
+        for file_path, entry in entries.items():
+            if file_path not in ids_by_file:
+                files[file_path] = entry
+        for file_path, ids in ids_by_file.items():
+            entry = entries.get(file_path)
+            if entry is None:
+                try:
+                    entry = self.index_manifest.fingerprint(file_path)
+                except OSError as e:
+                    self.logger.warning(f"Not tracking {file_path} in manifest: {str(e)}")
+                    continue
+            entry.point_ids = ids
+            files[file_path] = entry
+
+        manifest.files = files
+        self.index_manifest.save(manifest)
+
+    async def health_check(self, check_embedding: bool = True) -> Dict[str, bool]:
+        """Check the backends the service depends on.
+        
+        Args:
+            check_embedding: Also send a warm-up request to the embedding model
+            
+        Returns:
+            Status per backend, with ``healthy`` set when all checks pass
+        """
+        status = {
+            "vector_storage": self.vector_storage.health_check(),
+            # Project collections are only created on first use
+            "collection": (
+                settings.VECTOR_TENANCY == "collection"
+                or bool(
+                    self.vector_storage.collection_exists(settings.QDRANT_COLLECTION_NAME)
+                    and self.vector_storage.check_tenancy(settings.QDRANT_COLLECTION_NAME)
+                )
+            ),
+        }
+        if check_embedding:
+            status["embedding"] = await self.vector_embedding.warm_up()
+        status["healthy"] = all(status.values())
+        return status
+
+    async def start_watching(self, project_name: str, root_path: str) -> CodebaseWatcher:
+        """Keep a project's index in sync with its files as they are edited.
+        
+        Replaces any watcher already running for the project.
+        
+        Args:
+            project_name: Name of the project
+            root_path: Root directory path containing the codebase
+            
+        Returns:
+            The started watcher
+        """
+        await self.stop_watching(project_name)
+        watcher = CodebaseWatcher(
+            project_name=project_name,
+            root_path=root_path,
+            vector_storage=self.vector_storage,
+            vector_embedding=self.vector_embedding,
+            index_manifest=self.index_manifest,
+            collection_name=self._collection(project_name),
+            to_code_data=lambda code_metadata: self._to_code_data_for_vector(code_metadata, project_name),
+            on_update=lambda: self._on_watch_update(project_name),
+            lexical_index=self.lexical_indexes.get(project_name),
+            content_store=self.content_store
+        )
+        await watcher.start()
+        self._watchers[project_name] = watcher
+        return watcher
+
+    def _on_watch_update(self, project_name: str) -> None:
+        """Persist the lexical index and drop cached results after a watcher batch."""
+        self.lexical_indexes.save(project_name)
+        self._invalidate_query_cache(project_name)
+
+    async def stop_watching(self, project_name: str) -> bool:
+        """Stop the watcher of a project.
+        
+        Args:
+            project_name: Name of the project
+            
+        Returns:
+            bool: True if a watcher was stopped, False if none was running
+        """
+        watcher = self._watchers.pop(project_name, None)
+        if watcher is None:
+            return False
+        await watcher.stop()
+        return True
+
+    def watch_status(self) -> List[Dict[str, Any]]:
+        """Get the state and counters of every watcher."""
+        return [watcher.status() for watcher in self._watchers.values()]
+
+    def close(self) -> None:
+        """Release the clients held by the service."""
+        for watcher in self._watchers.values():
+            watcher.close()
+        self._watchers.clear()
+        self.vector_storage.close()
+        self.vector_embedding.close()
+        if self.content_store is not None:
+            self.content_store.close()
+
+    SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+    def _collection(self, project_name: str) -> str:
+        """Get the collection holding a project's vectors under the configured tenancy."""
+        return ServiceFactory.get_project_collection(project_name)
+
+    def _load_contents(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Read the content of the returned hits only, outside of the cached results."""
+        with metrics.timer("stage_seconds", stage="content_load"):
+            return load_contents(results, self.content_store)
+
+    def _vector_search(
+        self,
+        project_name: str,
+        query_vector: List[float],
+        limit: int,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Search the project's vectors by cosine similarity."""
+        with metrics.timer("stage_seconds", stage="query_search"):
+            return self.vector_storage.search_vectors(
+                self._collection(project_name),
+                query_vector,
+                limit=limit,
+                project_name=project_name,
+                search_filter=search_filter
+            )
+
+    def _lexical_answer(
+        self,
+        lexical_index: LexicalIndex,
+        question: str,
+        limit: int,
+        mode: str,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Answer a question from the lexical index alone, if it can be.
+        
+        In ``hybrid`` mode a bare word is only taken for a symbol when a chunk
+        declares it; conceptual one-word questions such as ``caching`` are
+        left to the fused vector and BM25 ranking.
+        
+        Args:
+            lexical_index: Lexical index of the project
+            question: Normalized natural language question
+            limit: Maximum number of results to return
+            mode: Search mode, BM25 results are only returned in ``lexical`` mode
+            search_filter: Package and class prefix conditions results must match
+            
+        Returns:
+            Symbol lookup or BM25 results, empty if the question needs a vector search
+        """
+        with metrics.timer("stage_seconds", stage="lexical_search"):
+            quoted = quotes_symbols(question)
+            for symbol in extract_symbols(question):
+                results = lexical_index.lookup_symbol(symbol, limit, search_filter)
+                if results and (mode == "lexical" or quoted or results[0]["match"] == "declaration"):
+                    metrics.inc("symbol_lookups_total")
+                    return results
+            if mode == "lexical":
+                return lexical_index.search(question, limit, search_filter)
+        return []
+
+    def _fuse_hybrid(
+        self,
+        lexical_index: LexicalIndex,
+        question: str,
+        vector_results: List[Dict[str, Any]],
+        candidates: int,
+        limit: int,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Fuse vector candidates of a question with as many BM25 candidates by reciprocal rank."""
+        with metrics.timer("stage_seconds", stage="lexical_search"):
+            lexical_results = lexical_index.search(question, candidates, search_filter)
+        return reciprocal_rank_fusion(
+            [vector_results, lexical_results],
+            limit,
+            k=int(settings.HYBRID_RRF_K)
+        )
+
     async def query_codebase(
         self,
         project_name: str,
         question: str,
-        limit: int = 5
+        limit: int = 5,
+        mode: Optional[str] = None,
+        search_filter: Optional[SearchFilter] = None
     ) -> List[Dict[str, Any]]:
         """Query the codebase with a natural language question.
         
+        In ``lexical`` and ``hybrid`` modes, a question naming a symbol (quoted
+        in backticks, or a bare identifier such as ``UserRepository.findByEmail``)
+        is answered from the lexical index without embedding the question.
+        
         Args:
             project_name: Name of the project to query
             question: Natural language question
             limit: Maximum number of results to return
+            mode: ``vector`` (cosine search), ``lexical`` (BM25 over identifiers) or
+                ``hybrid`` (both fused by reciprocal rank), defaults to settings.SEARCH_MODE
+            search_filter: Restrict results to a package or class prefix
             
         Returns:
-            List of relevant code snippets with metadata
+            List of relevant code snippets with metadata, and their ``content``
+            read from the content store or the source tree
         """
         try:
-            # Generate vector for the question
-            query_vector = await self.vector_embedding.generate_embedding(question)
+            mode = mode or settings.SEARCH_MODE
+            if mode not in self.SEARCH_MODES:
+                raise ValueError(f"Unknown search mode: {mode}")
+
+            # Whitespace-only differences hit the same cache entries
+            question = " ".join(question.split())
+            cache_key = (project_name, question, limit, mode, search_filter, self._index_versions.get(project_name, 0))
+            cached = self.query_result_cache.get(cache_key)
+            if cached is not None:
+                metrics.inc("query_cache_hits_total", cache="result")
+                return self._load_contents(cached)
+            metrics.inc("query_cache_misses_total", cache="result")
+
+            with metrics.timer("query_seconds"):
+                results = None
+                # The storage reports failures as empty results, which must not outlive the failure
+                cacheable = True
+                if mode != "vector":
+                    lexical_index = self.lexical_indexes.get(project_name)
+                    results = self._lexical_answer(lexical_index, question, limit, mode, search_filter)
+
+                if not results and mode != "lexical":
+                    # Generate vector for the question
+                    with metrics.timer("stage_seconds", stage="query_embedding"):
+                        query_vector = await self._get_query_embedding(question)
+
+                    if mode == "vector":
+                        results = self._vector_search(project_name, query_vector, limit, search_filter)
+                        cacheable = bool(results)
+                    else:
+                        # Both rankings contribute candidates beyond the final limit
+                        candidates = limit * int(settings.HYBRID_CANDIDATE_FACTOR)
+                        vector_results = self._vector_search(project_name, query_vector, candidates, search_filter)
+                        cacheable = bool(vector_results)
+                        results = self._fuse_hybrid(
+                            lexical_index, question, vector_results, candidates, limit, search_filter
+                        )
+            metrics.inc("queries_total", mode=mode)
+
+            if cacheable:
+                self.query_result_cache.set(cache_key, results)
+            return self._load_contents(results)
             
-            # Search for similar vectors
-            results = self.vector_storage.search_vectors(
-                settings.QDRANT_COLLECTION_NAME,
-                query_vector,
-                limit=limit,
-                project_name=project_name
-            )
+        except Exception as e:
+            self.logger.error(f"Failed to query codebase for project {project_name}: {str(e)}")
+            return []
+
+    @staticmethod
+    def _group_batch_results(
+        questions: List[str],
+        results: List[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Group the results of a batch per question, listing every hit once.
+        
+        A hit matched by several questions is kept in the group where it ranks
+        best (the earliest question on ties), and ``questions`` lists the
+        indices of all questions that matched it.
+        
+        Args:
+            questions: Questions of the batch
+            results: Ranked results of every question
             
-            return results
+        Returns:
+            One ``{"question", "results"}`` group per question
+        """
+        best: Dict[Any, Tuple[int, int]] = {}
+        matched_by: Dict[Any, List[int]] = {}
+        for index, question_results in enumerate(results):
+            for rank, result in enumerate(question_results):
+                point_id = result["id"]
+                matched_by.setdefault(point_id, []).append(index)
+                if point_id not in best or rank < best[point_id][0]:
+                    best[point_id] = (rank, index)
+
+        groups = []
+        for index, (question, question_results) in enumerate(zip(questions, results)):
+            groups.append({
+                "question": question,
+                "results": [
+                    {**result, "questions": matched_by[result["id"]]}
+                    for result in question_results
+                    if best[result["id"]][1] == index
+                ]
+            })
+        return groups
+
+    async def query_codebase_batch(
+        self,
+        project_name: str,
+        questions: List[str],
+        limit: int = 5,
+        mode: Optional[str] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Query the codebase with several questions at once.
+        
+        Questions are answered like query_codebase, but all questions needing a
+        vector search are embedded in one request and searched with one batch
+        search. A hit relevant to several questions is returned only once.
+        
+        Args:
+            project_name: Name of the project to query
+            questions: Natural language questions
+            limit: Maximum number of results per question
+            mode: ``vector``, ``lexical`` or ``hybrid``, defaults to settings.SEARCH_MODE
+            search_filter: Restrict results to a package or class prefix
             
+        Returns:
+            One ``{"question", "results"}`` group per question, in order, with
+            the ``content`` of every hit
+        """
+        try:
+            mode = mode or settings.SEARCH_MODE
+            if mode not in self.SEARCH_MODES:
+                raise ValueError(f"Unknown search mode: {mode}")
+
+            # Same normalization and cache keys as query_codebase
+            questions = [" ".join(question.split()) for question in questions]
+            version = self._index_versions.get(project_name, 0)
+            cache_keys = [(project_name, question, limit, mode, search_filter, version) for question in questions]
+            results: List[Optional[List[Dict[str, Any]]]] = [None] * len(questions)
+            for index, cache_key in enumerate(cache_keys):
+                cached = self.query_result_cache.get(cache_key)
+                if cached is not None:
+                    metrics.inc("query_cache_hits_total", cache="result")
+                    results[index] = list(cached)
+                else:
+                    metrics.inc("query_cache_misses_total", cache="result")
+            uncached = [index for index, result in enumerate(results) if result is None]
+            # Empty vector results may come from a failing storage and are not cached
+            uncacheable = set()
+
+            with metrics.timer("query_batch_seconds"):
+                if mode != "vector":
+                    lexical_index = self.lexical_indexes.get(project_name)
+                    for index in uncached:
+                        results[index] = self._lexical_answer(
+                            lexical_index, questions[index], limit, mode, search_filter
+                        )
+
+                pending = [index for index in uncached if not results[index] and mode != "lexical"]
+                if pending:
+                    with metrics.timer("stage_seconds", stage="query_embedding"):
+                        query_vectors = await self._get_query_embeddings([questions[index] for index in pending])
+
+                    # Both rankings contribute candidates beyond the final limit
+                    candidates = limit if mode == "vector" else limit * int(settings.HYBRID_CANDIDATE_FACTOR)
+                    with metrics.timer("stage_seconds", stage="query_search"):
+                        batch_results = self.vector_storage.search_vectors_batch(
+                            self._collection(project_name),
+                            query_vectors,
+                            limit=candidates,
+                            project_name=project_name,
+                            search_filter=search_filter
+                        )
+                    vector_hits = dict(zip(pending, batch_results))
+                    for index in pending:
+                        vector_results = vector_hits.get(index, [])
+                        if not vector_results:
+                            uncacheable.add(index)
+                        if mode == "vector":
+                            results[index] = vector_results
+                        else:
+                            results[index] = self._fuse_hybrid(
+                                lexical_index, questions[index], vector_results, candidates, limit, search_filter
+                            )
+
+            for index in uncached:
+                if index not in uncacheable:
+                    self.query_result_cache.set(cache_keys[index], results[index])
+            metrics.inc("queries_total", len(uncached), mode=mode)
+            metrics.inc("query_batches_total")
+
+            groups = self._group_batch_results(questions, results)
+            # Each hit is listed once, so its content is read once
+            loaded = iter(self._load_contents([result for group in groups for result in group["results"]]))
+            for group in groups:
+                group["results"] = [next(loaded) for _ in group["results"]]
+            return groups
+
         except Exception as e:
-            self.logger.error(f"Failed to query codebase for project {project_name}: {str(e)}")
-            return [] 
\ No newline at end of file
+            self.logger.error(f"Failed to batch query codebase for project {project_name}: {str(e)}")
+            return []
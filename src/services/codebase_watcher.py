@@ -0,0 +1,714 @@
+import asyncio
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from config.settings import settings
+from services.code_parser import JavaCodeParser
+from services.content_store import ContentStore
+from services.embedding_scheduler import EmbeddingScheduler
+from services.index_manifest import IndexManifestStore, index_settings_fingerprint
+from services.lexical_index import LexicalIndex
+from services.metrics import metrics
+from services.vector_embedding import VectorEmbeddingService
+from services.vector_storage_backend import VectorStorageBackend
+from type_definitions.code_types import CodeDataForVector
+from type_definitions.index_types import FileManifestEntry, ProjectManifest
+from type_definitions.parse_records import ParsedCode
+
+# inotify event flags, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# Byte offset and (row, column) point of a position in a source file
+Point = Tuple[int, int]
+
+
+def _common_prefix_length(a: memoryview, b: memoryview, limit: int) -> int:
+    """Length of the common prefix of two buffers, found by binary search on slice equality."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix_length(a: memoryview, b: memoryview, limit: int) -> int:
+    """Length of the common suffix of two buffers, found by binary search on slice equality."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _point(content: bytes, offset: int) -> Point:
+    """Tree-sitter point (row, byte column) of a byte offset."""
+    row = content.count(b"\n", 0, offset)
+    return row, offset - (content.rfind(b"\n", 0, offset) + 1)
+
+
+def compute_edit(old: bytes, new: bytes) -> Optional[Dict[str, Any]]:
+    """Describe the change between two versions of a file as one tree-sitter edit.
+
+    The edit covers the bytes between the longest common prefix and the
+    longest common suffix, which is exact for a single contiguous change and a
+    safe superset for several.
+
+    Args:
+        old: Previous file content
+        new: Current file content
+
+    Returns:
+        Keyword arguments for ``Tree.edit``, or None if the contents are equal
+    """
+    if old == new:
+        return None
+    old_view, new_view = memoryview(old), memoryview(new)
+    limit = min(len(old), len(new))
+    start = _common_prefix_length(old_view, new_view, limit)
+    suffix = _common_suffix_length(old_view, new_view, limit - start)
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+    return {
+        "start_byte": start,
+        "old_end_byte": old_end,
+        "new_end_byte": new_end,
+        "start_point": _point(old, start),
+        "old_end_point": _point(old, old_end),
+        "new_end_point": _point(new, new_end),
+    }
+
+
+class ChangeSource(ABC):
+    """Source of file change notifications for a watched directory."""
+
+    @abstractmethod
+    async def next_changes(self) -> Optional[Set[str]]:
+        """Wait until files change.
+
+        Returns:
+            Paths that may have changed, or None when events were lost and
+            every file has to be checked again
+        """
+
+    def close(self) -> None:
+        """Stop watching and release the resources held by the source."""
+
+
+class PollingChangeSource(ChangeSource):
+    """Detects changes by comparing the mtime and size of every file at a fixed interval."""
+
+    def __init__(self, root_path: str, interval: float, list_files: Callable[[str], List[str]]):
+        """Initialize the source and take the first snapshot.
+
+        Args:
+            root_path: Directory to watch
+            interval: Seconds between two scans
+            list_files: Lists the files to watch under a directory
+        """
+        self.root_path = root_path
+        self.interval = float(interval)
+        self.list_files = list_files
+        self._stats = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for file_path in self.list_files(self.root_path):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    async def next_changes(self) -> Optional[Set[str]]:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            stats = await loop.run_in_executor(None, self._scan)
+            changed = {file_path for file_path, stat in stats.items() if self._stats.get(file_path) != stat}
+            changed.update(file_path for file_path in self._stats if file_path not in stats)
+            self._stats = stats
+            if changed:
+                return changed
+
+
+class InotifyChangeSource(ChangeSource):
+    """Receives change events from the Linux kernel through inotify, without polling."""
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, root_path: str, suffix: str = ".java"):
+        """Initialize the source and watch every directory under the root.
+
+        Args:
+            root_path: Directory to watch
+            suffix: Only files with this suffix are reported
+
+        Raises:
+            OSError: If inotify is unavailable
+        """
+        self.logger = logging.getLogger(__name__)
+        self.suffix = suffix
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: Dict[int, str] = {}
+        self._ready = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watch_tree(root_path)
+
+    @staticmethod
+    def available() -> bool:
+        """Check whether inotify can be used on this platform."""
+        if not sys.platform.startswith("linux"):
+            return False
+        library = ctypes.util.find_library("c")
+        return library is not None and hasattr(ctypes.CDLL(library), "inotify_init1")
+
+    def _watch_tree(self, directory: str) -> Set[str]:
+        """Watch a directory and its subdirectories.
+
+        Returns:
+            Matching files already present, which may have been written before
+            the directory was watched
+        """
+        found = set()
+        for root, _, files in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), self.MASK)
+            if wd < 0:
+                self.logger.warning(f"Cannot watch {root}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._directories[wd] = root
+            found.update(os.path.join(root, file) for file in files if file.endswith(self.suffix))
+        return found
+
+    def _read_events(self) -> Optional[Set[str]]:
+        """Drain pending events into the set of changed paths, None if a rescan is needed."""
+        changed: Set[str] = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._directories.pop(wd, None)
+                    continue
+                directory = self._directories.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        changed.update(self._watch_tree(path))
+                    elif mask & IN_MOVED_FROM:
+                        # Files of a moved-away directory produce no events of their own
+                        rescan = True
+                    continue
+                if name.endswith(self.suffix):
+                    changed.add(path)
+        return None if rescan else changed
+
+    async def next_changes(self) -> Optional[Set[str]]:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop.add_reader(self._fd, self._ready.set)
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            changed = self._read_events()
+            if changed is None or changed:
+                return changed
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = -1
+
+
+def create_change_source(
+    root_path: str,
+    backend: str,
+    poll_interval: float,
+    list_files: Callable[[str], List[str]]
+) -> ChangeSource:
+    """Create the change source selected by a watch backend name.
+
+    Args:
+        root_path: Directory to watch
+        backend: ``inotify``, ``polling`` or ``auto`` (inotify when available)
+        poll_interval: Seconds between two scans of the polling source
+        list_files: Lists the files to watch under a directory
+
+    Returns:
+        The change source
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in ("auto", "inotify", "polling"):
+        raise ValueError(f"Unknown watch backend: {backend}")
+    if backend == "inotify" or (backend == "auto" and InotifyChangeSource.available()):
+        return InotifyChangeSource(root_path)
+    return PollingChangeSource(root_path, poll_interval, list_files)
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _WatchedFile:
+    """Last indexed version of a file: its content, syntax tree and chunk digests."""
+
+    __slots__ = ("content", "tree", "chunks")
+
+    def __init__(self, content: bytes, tree: Any, chunks: Dict[str, Tuple[str, str]]):
+        self.content = content
+        self.tree = tree
+        # Point ID -> (digest of the embedded text, digest of the payload)
+        self.chunks = chunks
+
+
+class _ChangeSet:
+    """Index updates computed for one batch of changed files."""
+
+    def __init__(self):
+        self.files: Dict[str, Optional[_WatchedFile]] = {}
+        self.entries: Dict[str, FileManifestEntry] = {}
+        self.to_embed: List[CodeDataForVector] = []
+        self.to_update: List[CodeDataForVector] = []
+        self.stale_ids: List[str] = []
+
+
+class CodebaseWatcher:
+    """Keeps a project's index in sync with its files while they are edited.
+
+    Change events are debounced into batches. Each changed file is re-parsed
+    incrementally from its previous syntax tree, and only chunks whose text
+    changed are embedded again; chunks that only moved get their payload
+    updated, and chunks that disappeared are deleted. The project manifest is
+    kept current, so a later incremental ``update_codebase`` has nothing to do.
+    """
+
+    def __init__(
+        self,
+        project_name: str,
+        root_path: str,
+        vector_storage: VectorStorageBackend,
+        vector_embedding: VectorEmbeddingService,
+        index_manifest: IndexManifestStore,
+        to_code_data: Callable[[ParsedCode], List[CodeDataForVector]],
+        on_update: Optional[Callable[[], None]] = None,
+        collection_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        debounce_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        content_store: Optional[ContentStore] = None
+    ):
+        """Initialize the watcher.
+
+        Args:
+            project_name: Name of the indexed project
+            root_path: Root directory of the project
+            vector_storage: Storage holding the project's vectors
+            vector_embedding: Service embedding changed chunks
+            index_manifest: Store of the project manifest
+            to_code_data: Converts a parsed file into the chunks to embed
+            on_update: Called after each batch changed the index
+            collection_name: Target collection (defaults to settings.QDRANT_COLLECTION_NAME)
+            backend: ``auto``, ``inotify`` or ``polling`` (defaults to settings.WATCH_BACKEND)
+            debounce_seconds: Quiet time that ends a burst of changes
+                (defaults to settings.WATCH_DEBOUNCE_SECONDS)
+            poll_interval: Seconds between scans of the polling backend
+                (defaults to settings.WATCH_POLL_INTERVAL)
+            lexical_index: Lexical index kept in step with the stored chunks
+            content_store: Store of chunk texts kept in step with the stored chunks
+        """
+        self.logger = logging.getLogger(__name__)
+        self.project_name = project_name
+        self.root_path = os.path.abspath(root_path)
+        self.vector_storage = vector_storage
+        self.vector_embedding = vector_embedding
+        self.index_manifest = index_manifest
+        self.to_code_data = to_code_data
+        self.on_update = on_update
+        self.collection_name = collection_name or settings.QDRANT_COLLECTION_NAME
+        self.backend = backend or settings.WATCH_BACKEND
+        self.debounce_seconds = float(settings.WATCH_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds)
+        self.poll_interval = float(settings.WATCH_POLL_INTERVAL if poll_interval is None else poll_interval)
+        self.lexical_index = lexical_index
+        self.content_store = content_store
+        # A parser of its own: tree-sitter parsers must not be shared between threads
+        self.parser = JavaCodeParser()
+        self.state = "stopped"
+        self.stats: Dict[str, Any] = {
+            "batches": 0, "files_changed": 0, "chunks_embedded": 0,
+            "payloads_updated": 0, "chunks_deleted": 0, "last_sync_seconds": 0.0, "last_error": "",
+        }
+        self._files: Dict[str, _WatchedFile] = {}
+        self._manifest: Optional[ProjectManifest] = None
+        self._source: Optional[ChangeSource] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the watch loop is active."""
+        return self._task is not None and not self._task.done()
+
+    def status(self) -> Dict[str, Any]:
+        """Get the watcher state and its counters."""
+        return {
+            "project_name": self.project_name,
+            "root_path": self.root_path,
+            "state": self.state,
+            "backend": type(self._source).__name__ if self._source is not None else "",
+            "files": len(self._files),
+            **self.stats,
+        }
+
+    async def start(self) -> None:
+        """Start watching in a background task.
+
+        Events are subscribed to before the current files are compared with
+        the manifest, so edits made while the watcher starts are not missed.
+        """
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._source = await loop.run_in_executor(None, partial(
+            create_change_source,
+            self.root_path,
+            self.backend,
+            self.poll_interval,
+            self.parser.list_java_files
+        ))
+        self.state = "starting"
+        self._task = asyncio.create_task(self._run())
+        self.logger.info(f"Watching {self.root_path} for project {self.project_name} with {type(self._source).__name__}")
+
+    async def stop(self) -> None:
+        """Stop watching and wait for the watch loop to finish."""
+        task = self._task
+        self.close()
+        if task is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def close(self) -> None:
+        """Stop watching without waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+        self.state = "stopped"
+
+    async def _run(self) -> None:
+        """Seed the file states, then apply debounced batches of changes until cancelled."""
+        try:
+            pending = await self._seed()
+            if pending:
+                await self._apply_safely(pending)
+            self.state = "watching"
+
+            while True:
+                changes = await self._source.next_changes()
+                changes = await self._debounce(changes)
+                if changes is None:
+                    changes = set(self._files) | set(self.parser.list_java_files(self.root_path))
+                await self._apply_safely(changes)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.stats["last_error"] = str(e)
+            self.logger.error(f"Watcher for project {self.project_name} failed: {str(e)}")
+
+    async def _debounce(self, changes: Optional[Set[str]]) -> Optional[Set[str]]:
+        """Merge further events until the files stay quiet for debounce_seconds.
+
+        A burst is never held back for more than four debounce periods, so a
+        file rewritten continuously is still indexed.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.debounce_seconds * 4
+        while True:
+            timeout = min(self.debounce_seconds, deadline - loop.time())
+            if timeout <= 0:
+                return changes
+            try:
+                more = await asyncio.wait_for(self._source.next_changes(), timeout)
+            except asyncio.TimeoutError:
+                return changes
+            changes = None if changes is None or more is None else changes | more
+
+    async def _apply_safely(self, file_paths: Iterable[str]) -> None:
+        """Apply a batch, logging failures so the watch loop keeps running."""
+        try:
+            await self.apply_changes(file_paths)
+            self.stats["last_error"] = ""
+        except Exception as e:
+            self.stats["last_error"] = str(e)
+            self.logger.error(f"Failed to apply changes for project {self.project_name}: {str(e)}")
+
+    async def _seed(self) -> List[str]:
+        """Record the indexed state of every file still matching the manifest.
+
+        Returns:
+            Files added, modified or removed since the last indexing run
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._seed_files)
+
+    def _seed_files(self) -> List[str]:
+        manifest = self.index_manifest.load(self.project_name)
+        if manifest is None:
+            self.logger.info(f"No manifest for project {self.project_name}, every file will be indexed")
+            manifest = ProjectManifest(
+                project_name=self.project_name,
+                root_path=self.root_path,
+                settings_fingerprint=index_settings_fingerprint()
+            )
+        elif manifest.settings_fingerprint != index_settings_fingerprint():
+            self.logger.warning(
+                f"Project {self.project_name} was indexed with other chunking or embedding settings; "
+                f"run a full update_codebase to re-index the files the watcher does not touch"
+            )
+        self._manifest = manifest
+
+        changes, entries = self.index_manifest.detect_changes(manifest, self.parser.list_java_files(self.root_path))
+        for file_path in changes.unchanged:
+            try:
+                with open(file_path, "rb") as f:
+                    content = f.read()
+            except OSError:
+                continue
+            parsed = self.parser.parse_source(file_path, content)
+            if parsed is None:
+                continue
+            parsed_file, tree = parsed
+            self._files[file_path] = _WatchedFile(content, tree, self._chunk_digests(self.to_code_data(parsed_file)))
+        self.logger.info(
+            f"Watcher seeded {len(self._files)} files of project {self.project_name}, "
+            f"{len(changes.changed) + len(changes.removed)} changed since the last update"
+        )
+        return changes.changed + changes.removed
+
+    @staticmethod
+    def _chunk_digests(chunks: List[CodeDataForVector]) -> Dict[str, Tuple[str, str]]:
+        return {
+            chunk.metadata.point_id(): (_digest(chunk.transfer_body), _digest(chunk.metadata.model_dump_json()))
+            for chunk in chunks
+        }
+
+    def _plan_changes(self, file_paths: List[str]) -> _ChangeSet:
+        """Re-parse changed files and sort their chunks into embed, payload update and delete.
+
+        Args:
+            file_paths: Files that may have changed
+
+        Returns:
+            The index updates of the batch, not applied yet
+        """
+        change_set = _ChangeSet()
+        for file_path in file_paths:
+            if not file_path.endswith(".java"):
+                continue
+            previous = self._files.get(file_path)
+            previous_ids = (
+                list(previous.chunks) if previous is not None
+                else self._manifest.point_ids_for([file_path])
+            )
+            try:
+                with open(file_path, "rb") as f:
+                    content = f.read()
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                if previous is not None or file_path in self._manifest.files:
+                    change_set.files[file_path] = None
+                    change_set.stale_ids.extend(previous_ids)
+                continue
+            except OSError as e:
+                self.logger.warning(f"Skipping unreadable file {file_path}: {str(e)}")
+                continue
+
+            if previous is not None and previous.content == content:
+                continue
+
+            old_tree = None
+            if previous is not None and previous.tree is not None:
+                previous.tree.edit(**compute_edit(previous.content, content))
+                old_tree = previous.tree
+                # The edited tree no longer matches the stored content
+                previous.tree = None
+            parsed = self.parser.parse_source(file_path, content, old_tree)
+            if parsed is None:
+                continue
+            parsed_file, tree = parsed
+
+            chunks = self.to_code_data(parsed_file)
+            digests = self._chunk_digests(chunks)
+            for chunk, (point_id, (text_digest, payload_digest)) in zip(chunks, digests.items()):
+                before = previous.chunks.get(point_id) if previous is not None else None
+                if before is None or before[0] != text_digest:
+                    change_set.to_embed.append(chunk)
+                elif before[1] != payload_digest:
+                    change_set.to_update.append(chunk)
+            change_set.stale_ids.extend(point_id for point_id in previous_ids if point_id not in digests)
+
+            change_set.files[file_path] = _WatchedFile(content, tree, digests)
+            change_set.entries[file_path] = FileManifestEntry(
+                content_hash=IndexManifestStore.hash_content(content),
+                mtime=stat.st_mtime,
+                size=stat.st_size,
+                point_ids=list(digests)
+            )
+        return change_set
+
+    async def apply_changes(self, file_paths: Iterable[str]) -> Dict[str, int]:
+        """Bring the index up to date with the given files.
+
+        Args:
+            file_paths: Files that may have been added, modified or removed
+
+        Returns:
+            Number of changed files, embedded chunks, updated payloads and deleted chunks
+
+        Raises:
+            Exception: If embedding or storage fails; the batch is then retried
+                with the next change of the same files
+        """
+        async with self._lock:
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            if self._manifest is None:
+                self._manifest = (
+                    self.index_manifest.load(self.project_name)
+                    or ProjectManifest(
+                        project_name=self.project_name,
+                        root_path=self.root_path,
+                        settings_fingerprint=index_settings_fingerprint()
+                    )
+                )
+            file_paths = sorted({os.path.abspath(file_path) for file_path in file_paths})
+            change_set = await loop.run_in_executor(None, self._plan_changes, file_paths)
+            if not change_set.files:
+                return {"files": 0, "embedded": 0, "updated": 0, "deleted": 0}
+
+            if change_set.to_embed:
+                vectors = await EmbeddingScheduler(self.vector_embedding).embed(change_set.to_embed)
+                metadata_list = [chunk.metadata for chunk in change_set.to_embed]
+                stored = await loop.run_in_executor(None, partial(
+                    self.vector_storage.store_vectors,
+                    self.collection_name,
+                    vectors,
+                    metadata_list,
+                    ids=[metadata.point_id() for metadata in metadata_list]
+                ))
+                if not stored:
+                    raise Exception("Failed to store vectors")
+            if change_set.to_update:
+                metadata_list = [chunk.metadata for chunk in change_set.to_update]
+                updated = await loop.run_in_executor(None, partial(
+                    self.vector_storage.update_payloads,
+                    self.collection_name,
+                    [metadata.point_id() for metadata in metadata_list],
+                    metadata_list
+                ))
+                if not updated:
+                    raise Exception("Failed to update payloads")
+            if change_set.stale_ids:
+                await loop.run_in_executor(None, partial(
+                    self.vector_storage.delete_points,
+                    self.collection_name,
+                    change_set.stale_ids
+                ))
+
+            if self.lexical_index is not None:
+                self.lexical_index.add_chunks(change_set.to_embed + change_set.to_update)
+                self.lexical_index.remove(change_set.stale_ids)
+            if self.content_store is not None:
+                # Chunks that only moved keep their text
+                self.content_store.add_chunks(change_set.to_embed)
+                self.content_store.remove(change_set.stale_ids)
+
+            for file_path, watched in change_set.files.items():
+                if watched is None:
+                    self._files.pop(file_path, None)
+                    self._manifest.files.pop(file_path, None)
+                else:
+                    self._files[file_path] = watched
+                    self._manifest.files[file_path] = change_set.entries[file_path]
+            self._manifest.root_path = self.root_path
+            self.index_manifest.save(self._manifest)
+            if self.on_update is not None:
+                self.on_update()
+
+            elapsed = time.perf_counter() - start
+            summary = {
+                "files": len(change_set.files),
+                "embedded": len(change_set.to_embed),
+                "updated": len(change_set.to_update),
+                "deleted": len(change_set.stale_ids),
+            }
+            self.stats["batches"] += 1
+            self.stats["files_changed"] += summary["files"]
+            self.stats["chunks_embedded"] += summary["embedded"]
+            self.stats["payloads_updated"] += summary["updated"]
+            self.stats["chunks_deleted"] += summary["deleted"]
+            self.stats["last_sync_seconds"] = elapsed
+            metrics.inc("watch_files_changed_total", summary["files"])
+            metrics.inc("watch_chunks_total", summary["embedded"], action="embedded")
+            metrics.inc("watch_chunks_total", summary["updated"], action="payload_updated")
+            metrics.inc("watch_chunks_total", summary["deleted"], action="deleted")
+            metrics.observe("watch_sync_seconds", elapsed)
+            self.logger.info(
+                f"Synced {summary['files']} files of project {self.project_name} in {elapsed:.2f}s: "
+                f"{summary['embedded']} chunks embedded, {summary['updated']} payloads updated, "
+                f"{summary['deleted']} chunks deleted"
+            )
+            return summary
@@ -0,0 +1,154 @@
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from type_definitions.code_types import CodeDataForVector
+
+
+class ContentStore:
+    """Compressed store of the text of indexed chunks.
+
+    Chunk texts are zlib-compressed into SQLite, keyed by point ID, so vector
+    payloads stay small and only the hits returned by a search are read back
+    and decompressed.
+    """
+
+    def __init__(self, path: str, level: int = 6):
+        """Initialize the content store.
+
+        Args:
+            path (str): Path of the SQLite database file
+            level (int): zlib compression level, from 1 (fastest) to 9 (smallest)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = os.path.expanduser(path)
+        self.level = int(level)
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS contents ("
+            "point_id TEXT PRIMARY KEY, "
+            "content BLOB NOT NULL)"
+        )
+        self._connection.commit()
+
+    def add_chunks(self, chunks: Iterable[CodeDataForVector]) -> None:
+        """Store the text of chunks under the point IDs derived from their metadata."""
+        rows = [
+            (chunk.metadata.point_id(), zlib.compress(chunk.transfer_body.encode("utf-8"), self.level))
+            for chunk in chunks
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO contents (point_id, content) VALUES (?, ?)",
+                    rows
+                )
+                self._connection.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to store content of {len(rows)} chunks: {str(e)}")
+
+    def get_many(self, point_ids: Sequence[str]) -> Dict[str, str]:
+        """Read the text of several chunks.
+
+        Args:
+            point_ids (Sequence[str]): Point IDs of the chunks
+
+        Returns:
+            Dict[str, str]: Text per point ID, without the IDs that are not stored
+        """
+        point_ids = list(dict.fromkeys(point_ids))
+        if not point_ids:
+            return {}
+        placeholders = ",".join("?" * len(point_ids))
+        try:
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT point_id, content FROM contents WHERE point_id IN ({placeholders})",
+                    point_ids
+                ).fetchall()
+            return {point_id: zlib.decompress(blob).decode("utf-8") for point_id, blob in rows}
+        except (sqlite3.Error, zlib.error) as e:
+            self.logger.error(f"Failed to read content of {len(point_ids)} chunks: {str(e)}")
+            return {}
+
+    def remove(self, point_ids: Iterable[str]) -> None:
+        """Remove the text of chunks, ignoring unknown point IDs."""
+        rows = [(point_id,) for point_id in point_ids]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._connection.executemany("DELETE FROM contents WHERE point_id = ?", rows)
+                self._connection.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to remove content of {len(rows)} chunks: {str(e)}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def read_line_range(lines: List[str], start_line: int, end_line: int) -> Optional[str]:
+    """Get a 1-based, inclusive line range of a file.
+
+    Args:
+        lines: Lines of the file, without line endings
+        start_line: First line of the range
+        end_line: Last line of the range
+
+    Returns:
+        The lines of the range, or None if the range is empty or outside the file
+    """
+    if start_line < 1 or end_line < start_line or start_line > len(lines):
+        return None
+    return "\n".join(lines[start_line - 1:end_line])
+
+
+def load_contents(results: List[Dict[str, Any]], content_store: Optional[ContentStore] = None) -> List[Dict[str, Any]]:
+    """Attach the content of search hits, read only for the hits returned.
+
+    Content comes from the compressed store when it holds the hit, and
+    otherwise from the hit's line range in the source tree. Each source file
+    is read at most once.
+
+    Args:
+        results: Search results with ``id`` and a payload under ``metadata``
+        content_store: Store of the indexed chunk texts, if enabled
+
+    Returns:
+        Copies of the results with ``content`` set, None when it is unavailable
+    """
+    stored: Dict[str, str] = {}
+    if content_store is not None:
+        stored = content_store.get_many([result["id"] for result in results if result.get("id") is not None])
+
+    files: Dict[str, Optional[List[str]]] = {}
+    loaded = []
+    for result in results:
+        content = stored.get(result.get("id"))
+        metadata = result.get("metadata") or {}
+        file_path = metadata.get("file_path")
+        if content is None and file_path:
+            if file_path not in files:
+                try:
+                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                        files[file_path] = f.read().splitlines()
+                except OSError:
+                    files[file_path] = None
+            lines = files[file_path]
+            if lines is not None:
+                content = read_line_range(lines, metadata.get("start_line", 0), metadata.get("end_line", 0))
+        loaded.append({**result, "content": content})
+    return loaded
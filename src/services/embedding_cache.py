@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class EmbeddingCache:
+    """Persistent, content-addressed cache of embedding vectors.
+
+    Vectors are stored as float32 blobs in SQLite, keyed by a hash of the model
+    name, task type and preprocessed text. The total size of stored vectors is
+    bounded; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """Initialize the embedding cache.
+
+        Args:
+            path (str): Path of the SQLite database file
+            max_bytes (int): Maximum total size of cached vectors in bytes
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = os.path.expanduser(path)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, "
+            "vector BLOB NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)"
+        )
+        self._connection.commit()
+        self._total_bytes = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(model_name: str, task_type: str, text: str) -> str:
+        """Build the cache key of a text.
+
+        Args:
+            model_name (str): Name of the embedding model
+            task_type (str): Embedding task type
+            text (str): Preprocessed text
+
+        Returns:
+            str: Hex digest identifying the embedding
+        """
+        digest = hashlib.sha256()
+        for part in (model_name, task_type, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _encode(vector: Sequence[float]) -> bytes:
+        """Encode a vector as a float32 blob."""
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        """Decode a float32 blob into a vector."""
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Get a cached vector.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[List[float]]: The vector, or None on a miss
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Get several cached vectors and mark them as recently used.
+
+        Args:
+            keys (Sequence[str]): Cache keys
+
+        Returns:
+            Dict[str, List[float]]: Vectors of the keys that were found
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        try:
+            with self._lock:
+                for start in range(0, len(unique_keys), 500):
+                    chunk = unique_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._connection.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = self._decode(blob)
+                if found:
+                    now = time.time()
+                    self._connection.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key in found]
+                    )
+                    self._connection.commit()
+                self.hits += len(found)
+                self.misses += len(unique_keys) - len(found)
+        except Exception as e:
+            self.logger.error(f"Failed to read embedding cache: {str(e)}")
+        return found
+
+    def put(self, key: str, vector: Sequence[float]) -> None:
+        """Store a vector in the cache.
+
+        Args:
+            key (str): Cache key
+            vector (Sequence[float]): Embedding vector
+        """
+        self.put_many([(key, vector)])
+
+    def put_many(self, items: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        """Store several vectors in the cache, evicting old entries if needed.
+
+        Args:
+            items (Sequence[Tuple[str, Sequence[float]]]): Pairs of cache key and vector
+        """
+        if not items:
+            return
+        try:
+            with self._lock:
+                now = time.time()
+                for key, vector in items:
+                    blob = self._encode(vector)
+                    row = self._connection.execute(
+                        "SELECT size FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)",
+                        (key, blob, len(blob), now)
+                    )
+                    self._total_bytes += len(blob) - (row[0] if row else 0)
+                self._evict()
+                self._connection.commit()
+        except Exception as e:
+            self.logger.error(f"Failed to write embedding cache: {str(e)}")
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until the cache fits its size bound."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._connection.execute(
+                "SELECT key, size FROM embeddings ORDER BY last_access ASC LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._connection.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached vector and reset the counters."""
+        with self._lock:
+            self._connection.execute("DELETE FROM embeddings")
+            self._connection.commit()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate, evictions, entries and stored bytes
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
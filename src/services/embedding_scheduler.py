@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.settings import settings
+from services.metrics import metrics
+from services.vector_embedding import VectorEmbeddingService, estimate_tokens
+from type_definitions.code_types import CodeDataForVector
+
+
+class EmbeddingScheduler:
+    """Scheduler that embeds many texts through batched, concurrent requests.
+
+    Texts are grouped into batches bounded by both item count and estimated
+    token count, and several batches are sent to the embedding service at once
+    under a concurrency limit. Batches failing with rate-limit errors are
+    retried with exponential backoff and jitter.
+    """
+
+    RATE_LIMIT_MARKERS = (
+        "429",
+        "rate limit",
+        "ratelimit",
+        "resource exhausted",
+        "resourceexhausted",
+        "resource_exhausted",
+        "quota",
+        "503",
+        "unavailable",
+    )
+
+    def __init__(
+        self,
+        vector_embedding: VectorEmbeddingService,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None
+    ):
+        """Initialize the embedding scheduler.
+
+        Args:
+            vector_embedding: Embedding service used to embed each batch
+            batch_size: Maximum number of texts per batch
+            max_batch_tokens: Maximum estimated tokens per batch
+            concurrency: Maximum number of batches in flight at once
+            max_retries: Maximum retries per batch on rate-limit errors
+            retry_base_delay: Base delay in seconds for exponential backoff
+        """
+        self.logger = logging.getLogger(__name__)
+        self.vector_embedding = vector_embedding
+        self.batch_size = max(1, int(batch_size or settings.EMBEDDING_BATCH_SIZE))
+        self.max_batch_tokens = max(1, int(max_batch_tokens or settings.EMBEDDING_MAX_BATCH_TOKENS))
+        self.concurrency = max(1, int(concurrency or settings.EMBEDDING_CONCURRENCY))
+        self.max_retries = int(settings.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries)
+        self.retry_base_delay = float(settings.EMBEDDING_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay)
+        self.stats: Dict[str, Any] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def make_batches(self, texts: Sequence[str]) -> List[List[int]]:
+        """Group texts into size- and token-bounded batches.
+
+        A single text larger than the token budget is placed in a batch of its
+        own rather than being dropped.
+
+        Args:
+            texts: Texts to group
+
+        Returns:
+            List of batches, each a list of indexes into ``texts``
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (
+                len(current) >= self.batch_size
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        """Check whether an error looks like a rate-limit or transient quota error.
+
+        Args:
+            error: Exception raised by the embedding service
+
+        Returns:
+            bool: True if the request should be retried, False otherwise
+        """
+        description = f"{type(error).__name__} {error}".lower()
+        return any(marker in description for marker in self.RATE_LIMIT_MARKERS)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore limiting in-flight batches, creating it lazily."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a single batch, retrying with backoff on rate-limit errors.
+
+        Args:
+            texts: Texts of one batch
+
+        Returns:
+            List of embedding vectors in the same order as ``texts``
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self._get_semaphore():
+                    embeddings = await self.vector_embedding.generate_embeddings_batch(texts)
+                if len(embeddings) != len(texts):
+                    raise ValueError(
+                        f"Embedding service returned {len(embeddings)} vectors for {len(texts)} texts"
+                    )
+                return embeddings
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_rate_limit_error(e):
+                    raise
+                delay = self.retry_base_delay * (2 ** attempt)
+                delay += random.uniform(0, delay)
+                attempt += 1
+                self.stats["retries"] = self.stats.get("retries", 0) + 1
+                metrics.inc("embedding_retries_total")
+                self.logger.warning(
+                    f"Rate limited embedding batch of {len(texts)} texts, "
+                    f"retry {attempt}/{self.max_retries} in {delay:.2f}s: {str(e)}"
+                )
+                await asyncio.sleep(delay)
+
+    async def embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts through concurrent batches, preserving input order.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embedding vectors, one per text
+        """
+        start = time.perf_counter()
+        batches = self.make_batches(texts)
+        self.stats = {"items": len(texts), "batches": len(batches), "retries": 0}
+
+        results = await asyncio.gather(
+            *(self.embed_batch([texts[i] for i in batch]) for batch in batches)
+        )
+
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for batch, embeddings in zip(batches, results):
+            for index, embedding in zip(batch, embeddings):
+                vectors[index] = embedding
+
+        elapsed = time.perf_counter() - start
+        self.stats["elapsed_seconds"] = elapsed
+        self.stats["items_per_second"] = len(texts) / elapsed if elapsed > 0 else 0.0
+        self.logger.info(
+            f"Embedded {len(texts)} texts in {len(batches)} batches in {elapsed:.2f}s "
+            f"({self.stats['items_per_second']:.1f} files/sec, {self.stats['retries']} retries)"
+        )
+        return vectors
+
+    async def embed(self, items: Sequence[CodeDataForVector]) -> List[List[float]]:
+        """Embed the transfer bodies of code data items.
+
+        Args:
+            items: Code data prepared for vectorization
+
+        Returns:
+            List of embedding vectors, one per item
+        """
+        return await self.embed_texts([item.transfer_body for item in items])
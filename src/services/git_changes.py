@@ -0,0 +1,118 @@
+import logging
+import os
+import subprocess
+from typing import List, Optional
+
+from type_definitions.index_types import GitChanges, RenamedFile
+
+
+class GitRepository:
+    """Reads revisions and diffs of a local git repository through the git CLI."""
+
+    def __init__(self, path: str):
+        """Initialize the repository reader.
+
+        Args:
+            path (str): Any directory inside the repository
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+
+    def _run(self, *args: str) -> bytes:
+        """Run a git command in the repository.
+
+        Raises:
+            RuntimeError: If git fails
+        """
+        process = subprocess.run(["git", "-C", self.path, *args], capture_output=True)
+        if process.returncode != 0:
+            message = process.stderr.decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"git {args[0]} failed: {message}")
+        return process.stdout
+
+    def toplevel(self) -> str:
+        """Get the root directory of the working tree."""
+        return os.fsdecode(self._run("rev-parse", "--show-toplevel").strip())
+
+    def resolve(self, revision: str) -> str:
+        """Resolve a revision to its commit hash.
+
+        Args:
+            revision (str): Branch, tag, commit hash or any other revision expression
+
+        Returns:
+            str: Full commit hash
+        """
+        return self._run("rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}").decode().strip()
+
+    def show(self, revision: str, path: str) -> bytes:
+        """Read a file as it was at a revision.
+
+        Args:
+            revision (str): Revision to read from
+            path (str): Path relative to the repository root
+
+        Returns:
+            bytes: File content
+        """
+        return self._run("show", f"{revision}:{path}")
+
+    def diff(self, base_revision: str, head_revision: Optional[str] = None, suffix: str = ".java") -> GitChanges:
+        """List the files changed between two revisions, with rename detection.
+
+        Without ``head_revision`` the base is compared with the working tree,
+        including untracked files that are not ignored.
+
+        Args:
+            base_revision (str): Revision that was indexed last
+            head_revision (Optional[str]): Revision to index, or None for the working tree
+            suffix (str): Only files with this suffix are reported
+
+        Returns:
+            GitChanges: Changed files, as paths relative to the repository root
+        """
+        args = ["diff", "--name-status", "-z", "-M", "--no-ext-diff", base_revision]
+        if head_revision is not None:
+            args.append(head_revision)
+        fields = [os.fsdecode(field) for field in self._run(*args).split(b"\0") if field]
+
+        changes = GitChanges()
+        index = 0
+        while index < len(fields):
+            status = fields[index]
+            if status[0] in "RC":
+                old_path, new_path = fields[index + 1], fields[index + 2]
+                index += 3
+                old_matches, new_matches = old_path.endswith(suffix), new_path.endswith(suffix)
+                if status[0] == "R" and old_matches and new_matches:
+                    changes.renamed.append(RenamedFile(old_path=old_path, new_path=new_path))
+                    continue
+                if status[0] == "R" and old_matches:
+                    changes.deleted.append(old_path)
+                if new_matches:
+                    changes.added.append(new_path)
+                continue
+
+            path = fields[index + 1]
+            index += 2
+            if not path.endswith(suffix):
+                continue
+            if status[0] == "A":
+                changes.added.append(path)
+            elif status[0] == "D":
+                changes.deleted.append(path)
+            else:
+                changes.modified.append(path)
+
+        if head_revision is None:
+            untracked = self._run("ls-files", "--others", "--exclude-standard", "-z")
+            changes.added.extend(
+                path for path in (os.fsdecode(field) for field in untracked.split(b"\0") if field)
+                if path.endswith(suffix)
+            )
+
+        self.logger.info(
+            f"git diff {base_revision}..{head_revision or 'working tree'}: {len(changes.added)} added, "
+            f"{len(changes.modified)} modified, {len(changes.deleted)} deleted, {len(changes.renamed)} renamed"
+        )
+        return changes
@@ -0,0 +1,66 @@
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Identifiers, numbers and single punctuation marks
+_TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+|[^\sA-Za-z0-9_]")
+# Boundaries inside camelCase and PascalCase identifiers
+_CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Offline embedding model based on feature hashing.
+
+    Each text is turned into lowercase identifier tokens, the camelCase parts
+    of those identifiers and adjacent token pairs. Every feature is hashed to
+    a signed position of a fixed-size vector, and the result is L2-normalized.
+    Texts sharing vocabulary get a high cosine similarity, which is enough to
+    exercise parsing, chunking, storage and search end to end without network
+    access or API costs. The vectors are deterministic across processes.
+    """
+
+    def __init__(self, size: int = 3072):
+        """Initialize the hashing embeddings.
+
+        Args:
+            size: Dimension of the generated vectors
+        """
+        self.size = int(size)
+
+    def _features(self, text: str) -> List[str]:
+        """Extract the hashed features of a text."""
+        tokens = _TOKEN_PATTERN.findall(text)
+        words = [token.lower() for token in tokens if token[0].isalnum() or token[0] == "_"]
+        features = list(words)
+        for token in tokens:
+            parts = _CAMEL_PATTERN.findall(token)
+            if len(parts) > 1:
+                features.extend(f"#{part.lower()}" for part in parts)
+        features.extend(f"{first} {second}" for first, second in zip(words, words[1:]))
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        """Embed one text."""
+        vector = np.zeros(self.size, dtype=np.float32)
+        for feature in self._features(text):
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.size] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
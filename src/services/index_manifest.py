@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.project_names import safe_project_name
+from services.vector_embedding import VectorEmbeddingService
+from type_definitions.index_types import FileManifestEntry, ManifestChanges, ProjectManifest
+
+
+def index_settings_fingerprint() -> str:
+    """Fingerprint the settings that shape chunks and their vectors.
+
+    Vectors kept from a run under a different fingerprint would mix two
+    chunkings or two embedding spaces in one index.
+
+    Returns:
+        str: Hex digest of the chunking, embedding model and vector size settings
+    """
+    values = {
+        "chunk_strategy": settings.CHUNK_STRATEGY,
+        "chunk_max_tokens": int(settings.CHUNK_MAX_TOKENS),
+        "chunk_overlap_tokens": int(settings.CHUNK_OVERLAP_TOKENS),
+        "embedding_provider": settings.EMBEDDING_PROVIDER,
+        "embedding_model": VectorEmbeddingService.MODEL_NAME,
+        "vector_size": int(settings.VECTOR_SIZE),
+        "vector_dimensions": settings.VECTOR_DIMENSIONS,
+    }
+    return hashlib.blake2b(json.dumps(values, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class IndexManifestStore:
+    """Store for per-project index manifests.
+
+    A manifest maps every indexed file to its content hash, modification time
+    and the point IDs stored for it, so later runs can re-embed only the files
+    that actually changed.
+    """
+
+    def __init__(self, state_dir: str):
+        """Initialize the manifest store.
+
+        Args:
+            state_dir (str): Directory where manifests are kept
+        """
+        self.state_dir = os.path.expanduser(state_dir)
+        self.logger = logging.getLogger(__name__)
+
+    def _manifest_path(self, project_name: str) -> str:
+        """Get the manifest file path for a project.
+
+        Args:
+            project_name (str): Name of the project
+
+        Returns:
+            str: Path of the project's manifest file
+        """
+        return os.path.join(self.state_dir, "manifests", f"{safe_project_name(project_name)}.json")
+
+    def load(self, project_name: str) -> Optional[ProjectManifest]:
+        """Load the manifest of a project.
+
+        Args:
+            project_name (str): Name of the project
+
+        Returns:
+            Optional[ProjectManifest]: The manifest, or None if missing, unreadable or of another project
+        """
+        path = self._manifest_path(project_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = ProjectManifest.model_validate(json.load(f))
+        except Exception as e:
+            self.logger.error(f"Failed to load manifest for project {project_name}: {str(e)}")
+            return None
+        if manifest.project_name != project_name:
+            self.logger.warning(
+                f"Manifest {path} belongs to project {manifest.project_name}, not {project_name}; ignoring it"
+            )
+            return None
+        return manifest
+
+    def save(self, manifest: ProjectManifest) -> bool:
+        """Atomically write the manifest of a project.
+
+        Args:
+            manifest (ProjectManifest): Manifest to save
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        path = self._manifest_path(manifest.project_name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(manifest.model_dump_json())
+            os.replace(tmp_path, path)
+            self.logger.debug(f"Saved manifest for project {manifest.project_name} with {len(manifest.files)} files")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to save manifest for project {manifest.project_name}: {str(e)}")
+            return False
+
+    def delete(self, project_name: str) -> bool:
+        """Delete the manifest of a project.
+
+        Args:
+            project_name (str): Name of the project
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            path = self._manifest_path(project_name)
+            if os.path.exists(path):
+                os.remove(path)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to delete manifest for project {project_name}: {str(e)}")
+            return False
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        """Hash file content.
+
+        Args:
+            content (bytes): Raw file content
+
+        Returns:
+            str: Hex digest of the content
+        """
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def fingerprint(self, file_path: str) -> FileManifestEntry:
+        """Build a manifest entry for a file on disk, without point IDs.
+
+        Args:
+            file_path (str): Path of the file
+
+        Returns:
+            FileManifestEntry: Entry with the file's hash, mtime and size
+        """
+        stat = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            content_hash = self.hash_content(f.read())
+        return FileManifestEntry(
+            content_hash=content_hash,
+            mtime=stat.st_mtime,
+            size=stat.st_size
+        )
+
+    def detect_changes(
+        self,
+        manifest: ProjectManifest,
+        file_paths: List[str]
+    ) -> Tuple[ManifestChanges, Dict[str, FileManifestEntry]]:
+        """Compare files on disk against a manifest.
+
+        Files whose size and mtime match the manifest are assumed unchanged
+        without being read. Other files are hashed, so touching a file without
+        editing it does not trigger a re-embed.
+
+        Args:
+            manifest (ProjectManifest): Manifest of the last indexing run
+            file_paths (List[str]): Files currently in the codebase
+
+        Returns:
+            Tuple of the detected changes and fresh entries for every current file
+        """
+        changes = ManifestChanges()
+        entries: Dict[str, FileManifestEntry] = {}
+
+        for file_path in file_paths:
+            previous = manifest.files.get(file_path)
+            try:
+                if previous is not None:
+                    stat = os.stat(file_path)
+                    if stat.st_mtime == previous.mtime and stat.st_size == previous.size:
+                        entries[file_path] = previous
+                        changes.unchanged.append(file_path)
+                        continue
+
+                entry = self.fingerprint(file_path)
+            except OSError as e:
+                self.logger.warning(f"Skipping unreadable file {file_path}: {str(e)}")
+                continue
+
+            if previous is None:
+                changes.added.append(file_path)
+            elif entry.content_hash != previous.content_hash:
+                changes.modified.append(file_path)
+            else:
+                entry.point_ids = previous.point_ids
+                changes.unchanged.append(file_path)
+            entries[file_path] = entry
+
+        current = set(entries)
+        changes.removed = [file_path for file_path in manifest.files if file_path not in current]
+        return changes, entries
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from config.settings import settings
+from services.code_parser import JavaCodeParser, init_parse_worker, parse_file_in_worker, record_worker_parse
+from services.content_store import ContentStore
+from services.embedding_scheduler import EmbeddingScheduler
+from services.lexical_index import LexicalIndex
+from services.metrics import metrics
+from services.vector_embedding import estimate_tokens
+from services.vector_storage_backend import VectorStorageBackend
+from type_definitions.code_types import CodeDataForVector
+from type_definitions.parse_records import ParsedCode, ParsedFile
+from type_definitions.index_types import IngestResult
+
+# Marks the end of a stage's output in the queue feeding the next stage
+_END = object()
+
+
+class IngestPipeline:
+    """Streaming ingest pipeline: discover → parse → chunk → embed → upsert.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure to the ones before it. Parsed files are dropped as soon as
+    they are chunked and vectors as soon as they are stored, which keeps peak
+    memory independent of the repository size and lets the first vectors
+    reach storage while later files are still being parsed.
+    """
+
+    def __init__(
+        self,
+        java_code_parser: JavaCodeParser,
+        scheduler: EmbeddingScheduler,
+        vector_storage: VectorStorageBackend,
+        collection_name: str,
+        to_code_data: Callable[[ParsedCode], List[CodeDataForVector]],
+        parse_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        content_store: Optional[ContentStore] = None
+    ):
+        """Initialize the ingest pipeline.
+
+        Args:
+            java_code_parser: Parser used when parsing in-process
+            scheduler: Scheduler providing embedding batch limits and retries
+            vector_storage: Storage the vectors are upserted into
+            collection_name: Name of the target collection
+            to_code_data: Converts a parsed file into the chunks to embed
+            parse_workers: Number of parser processes (defaults to settings.PARSER_WORKERS,
+                0 means one per CPU core, 1 parses in a background thread)
+            queue_size: Maximum number of chunks waiting to be embedded
+            lexical_index: Index the stored chunks are also added to
+            content_store: Store the text of stored chunks is also written to
+        """
+        self.logger = logging.getLogger(__name__)
+        self.java_code_parser = java_code_parser
+        self.scheduler = scheduler
+        self.vector_storage = vector_storage
+        self.collection_name = collection_name
+        self.to_code_data = to_code_data
+        workers = settings.PARSER_WORKERS if parse_workers is None else parse_workers
+        self.parse_workers = int(workers) or os.cpu_count() or 1
+        self.queue_size = max(1, int(queue_size or settings.INGEST_QUEUE_SIZE))
+        self.lexical_index = lexical_index
+        self.content_store = content_store
+
+    def _create_parse_executor(self) -> Executor:
+        """Create the executor that runs tree-sitter parsing off the event loop."""
+        if self.parse_workers > 1:
+            return ProcessPoolExecutor(max_workers=self.parse_workers, initializer=init_parse_worker)
+        return ThreadPoolExecutor(max_workers=1)
+
+    async def _parse_file(self, executor: Executor, file_path: str) -> Optional[ParsedFile]:
+        """Parse one file on the parse executor.
+
+        Args:
+            executor: Executor created by _create_parse_executor
+            file_path: Path to the Java file
+
+        Returns:
+            Parsed file records, or None if parsing fails
+        """
+        loop = asyncio.get_running_loop()
+        if self.parse_workers > 1:
+            parsed_file = await loop.run_in_executor(executor, parse_file_in_worker, file_path)
+            record_worker_parse(parsed_file)
+            return parsed_file
+        return await loop.run_in_executor(executor, self.java_code_parser.parse_file_records, file_path)
+
+    async def _discover(self, file_paths: Iterable[str], path_queue: asyncio.Queue) -> None:
+        """Feed file paths into the parse stage."""
+        for file_path in file_paths:
+            await path_queue.put(file_path)
+        for _ in range(self.parse_workers):
+            await path_queue.put(_END)
+
+    async def _parse_worker(
+        self,
+        executor: Executor,
+        path_queue: asyncio.Queue,
+        chunk_queue: asyncio.Queue,
+        result: IngestResult
+    ) -> None:
+        """Parse files and push their chunks to the embed stage."""
+        while True:
+            file_path = await path_queue.get()
+            if file_path is _END:
+                return
+            code_metadata = await self._parse_file(executor, file_path)
+            if code_metadata is None:
+                continue
+            result.files_parsed += 1
+            with metrics.timer("stage_seconds", stage="chunk"):
+                chunks = self.to_code_data(code_metadata)
+            metrics.inc("chunks_total", len(chunks))
+            for code_data in chunks:
+                result.chunks += 1
+                await chunk_queue.put(code_data)
+
+    async def _parse_stage(
+        self,
+        executor: Executor,
+        path_queue: asyncio.Queue,
+        chunk_queue: asyncio.Queue,
+        result: IngestResult
+    ) -> None:
+        """Run the parse workers and close the chunk queue when they finish."""
+        await asyncio.gather(*(
+            self._parse_worker(executor, path_queue, chunk_queue, result)
+            for _ in range(self.parse_workers)
+        ))
+        await chunk_queue.put(_END)
+
+    async def _embed_batch(
+        self,
+        items: List[CodeDataForVector],
+        vector_queue: asyncio.Queue,
+        slots: asyncio.Semaphore
+    ) -> None:
+        """Embed one batch and hand it to the upsert stage."""
+        try:
+            vectors = await self.scheduler.embed_batch([item.transfer_body for item in items])
+            await vector_queue.put((items, vectors))
+        finally:
+            slots.release()
+
+    async def _embed_stage(
+        self,
+        group: asyncio.TaskGroup,
+        chunk_queue: asyncio.Queue,
+        vector_queue: asyncio.Queue
+    ) -> None:
+        """Group chunks into bounded batches and embed several batches at once."""
+        slots = asyncio.Semaphore(self.scheduler.concurrency)
+        tasks = []
+
+        async def dispatch(items: List[CodeDataForVector]) -> None:
+            await slots.acquire()
+            tasks.append(group.create_task(self._embed_batch(items, vector_queue, slots)))
+
+        batch: List[CodeDataForVector] = []
+        batch_tokens = 0
+        while True:
+            item = await chunk_queue.get()
+            if item is _END:
+                break
+            tokens = estimate_tokens(item.transfer_body)
+            if batch and (
+                len(batch) >= self.scheduler.batch_size
+                or batch_tokens + tokens > self.scheduler.max_batch_tokens
+            ):
+                await dispatch(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(item)
+            batch_tokens += tokens
+        if batch:
+            await dispatch(batch)
+
+        await asyncio.gather(*tasks)
+        await vector_queue.put(_END)
+
+    async def _store(
+        self,
+        entry: Tuple[List[CodeDataForVector], List[List[float]]],
+        wait: bool,
+        result: IngestResult,
+        start: float
+    ) -> None:
+        """Store one embedded batch and record its point IDs."""
+        items, vectors = entry
+        metadata_list = [item.metadata for item in items]
+        point_ids = [metadata.point_id() for metadata in metadata_list]
+
+        loop = asyncio.get_running_loop()
+        success = await loop.run_in_executor(None, partial(
+            self.vector_storage.store_vectors,
+            self.collection_name,
+            vectors,
+            metadata_list,
+            ids=point_ids,
+            wait=wait
+        ))
+        if not success:
+            self.logger.error("Failed to store vectors")
+            raise Exception("Failed to store vectors")
+
+        if self.lexical_index is not None:
+            self.lexical_index.add_chunks(items)
+        if self.content_store is not None:
+            self.content_store.add_chunks(items)
+
+        if result.vectors_stored == 0:
+            result.first_upsert_seconds = time.perf_counter() - start
+        result.vectors_stored += len(point_ids)
+        for metadata, point_id in zip(metadata_list, point_ids):
+            result.point_ids_by_file.setdefault(metadata.file_path, []).append(point_id)
+
+    async def _upsert_stage(self, vector_queue: asyncio.Queue, result: IngestResult, start: float) -> None:
+        """Store embedded batches, waiting for acknowledgement only on the last one."""
+        pending = None
+        while True:
+            entry = await vector_queue.get()
+            if entry is _END:
+                break
+            if pending is not None:
+                await self._store(pending, False, result, start)
+            pending = entry
+        if pending is not None:
+            await self._store(pending, True, result, start)
+
+    async def run(self, file_paths: Iterable[str]) -> IngestResult:
+        """Run the pipeline over the given files.
+
+        Args:
+            file_paths: Java files to ingest, consumed lazily
+
+        Returns:
+            IngestResult with counters and the point IDs stored per file
+
+        Raises:
+            Exception: The first error raised by any stage
+        """
+        start = time.perf_counter()
+        result = IngestResult()
+        path_queue: asyncio.Queue = asyncio.Queue(maxsize=self.parse_workers * 4)
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        vector_queue: asyncio.Queue = asyncio.Queue(maxsize=self.scheduler.concurrency)
+
+        with self._create_parse_executor() as executor:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(self._discover(file_paths, path_queue))
+                    group.create_task(self._parse_stage(executor, path_queue, chunk_queue, result))
+                    group.create_task(self._embed_stage(group, chunk_queue, vector_queue))
+                    group.create_task(self._upsert_stage(vector_queue, result, start))
+            except ExceptionGroup as e:
+                raise e.exceptions[0]
+
+        result.elapsed_seconds = time.perf_counter() - start
+        metrics.observe("stage_seconds", result.elapsed_seconds, stage="ingest")
+        files_per_second = result.files_parsed / result.elapsed_seconds if result.elapsed_seconds > 0 else 0.0
+        self.logger.info(
+            f"Ingested {result.files_parsed} files as {result.vectors_stored} vectors in "
+            f"{result.elapsed_seconds:.2f}s ({files_per_second:.1f} files/sec, "
+            f"first vectors stored after {result.first_upsert_seconds:.2f}s)"
+        )
+        return result
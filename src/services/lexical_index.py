@@ -0,0 +1,368 @@
+import heapq
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from services.project_names import safe_project_name
+from type_definitions.code_types import CodeDataForVector, CodeVectorMetadata
+from type_definitions.storage_types import SearchFilter
+
+_IDENTIFIER = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+# A symbol as written in a question: `Name`, `Outer.Inner.method` or `method()`
+_SYMBOL = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*(?:\.[A-Za-z_$][A-Za-z0-9_$]*)*(?:\(\))?")
+_BACKTICKED = re.compile(r"`([^`]+)`")
+
+# Java keywords and question words that carry no meaning for retrieval
+STOPWORDS = frozenset({
+    "abstract", "boolean", "break", "byte", "case", "catch", "char", "class", "continue", "default",
+    "do", "double", "else", "extends", "false", "final", "finally", "float", "for", "if", "implements",
+    "import", "int", "interface", "long", "new", "null", "package", "private", "protected", "public",
+    "return", "short", "static", "super", "this", "throw", "throws", "true", "try", "void", "while",
+    "a", "an", "and", "are", "does", "how", "in", "is", "of", "or", "the", "to", "what", "where", "which",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms.
+
+    Every identifier is kept whole and, when it is a compound such as
+    ``findByEmail`` or ``MAX_SIZE``, also split into its parts.
+
+    Args:
+        text: Source code or question
+
+    Returns:
+        Terms in order of appearance, with repetitions
+    """
+    terms = []
+    for identifier in _IDENTIFIER.findall(text):
+        lower = identifier.lower()
+        if lower not in STOPWORDS:
+            terms.append(lower)
+        parts = _CAMEL_PART.findall(identifier)
+        if len(parts) > 1:
+            terms.extend(part for part in (part.lower() for part in parts) if part not in STOPWORDS)
+    return terms
+
+
+def extract_symbols(question: str) -> List[str]:
+    """Find the code symbols a question asks about.
+
+    Symbols are spans quoted in backticks, or the whole question when it is
+    nothing but a (possibly qualified) identifier.
+
+    Args:
+        question: Natural language question
+
+    Returns:
+        Symbols without call parentheses, empty for free-text questions
+    """
+    candidates = _BACKTICKED.findall(question) or [question.strip()]
+    return [
+        candidate.strip().removesuffix("()")
+        for candidate in candidates
+        if _SYMBOL.fullmatch(candidate.strip())
+    ]
+
+
+def quotes_symbols(question: str) -> bool:
+    """Check whether a question quotes symbols in backticks."""
+    return _BACKTICKED.search(question) is not None
+
+
+def _declared_symbols(metadata: CodeVectorMetadata) -> Set[str]:
+    """Names declared by a chunk, lowercased, alone and qualified by their owner."""
+    symbols = set()
+    if metadata.package:
+        symbols.add(metadata.package)
+    if metadata.class_name:
+        symbols.add(metadata.class_name)
+        if metadata.package:
+            symbols.add(f"{metadata.package}.{metadata.class_name}")
+    names = [metadata.method_name] if metadata.method_name else []
+    if metadata.type == "class":
+        names.extend(metadata.fields_name)
+    for name in names:
+        symbols.add(name)
+        if metadata.class_name:
+            symbols.add(f"{metadata.class_name}.{name}")
+    return {symbol.lower() for symbol in symbols}
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[List[Dict[str, Any]]],
+    limit: int,
+    k: int = 60
+) -> List[Dict[str, Any]]:
+    """Fuse ranked result lists by reciprocal rank.
+
+    Each result scores ``1 / (k + rank)`` in every list it appears in, so
+    rankings on incomparable scales (cosine similarity, BM25) can be merged.
+
+    Args:
+        result_lists: Ranked results with ``id``, ``score`` and ``metadata``
+        limit: Maximum number of results to return
+        k: Rank offset damping the weight of the first ranks
+
+    Returns:
+        Fused results, with the fused score as ``score``
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            entry = fused.get(result["id"])
+            if entry is None:
+                entry = fused[result["id"]] = {**result, "score": 0.0}
+            entry["score"] += 1.0 / (k + rank)
+    return heapq.nlargest(limit, fused.values(), key=lambda result: result["score"])
+
+
+class LexicalIndex:
+    """In-memory BM25 and symbol index of one project's chunks.
+
+    Documents are keyed by the point ID of their vector, so the index stays in
+    step with vector storage and its results can be fused with vector hits.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # Point ID -> (metadata, term frequencies, declared symbols, length in terms)
+        self.documents: Dict[str, Tuple[Dict[str, Any], Dict[str, int], List[str], int]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.symbols: Dict[str, Set[str]] = {}
+        self.total_length = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _insert(self, point_id: str, metadata: Dict[str, Any], terms: Dict[str, int], symbols: List[str]) -> None:
+        self.remove([point_id])
+        length = sum(terms.values())
+        self.documents[point_id] = (metadata, terms, symbols, length)
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[point_id] = frequency
+        for symbol in symbols:
+            self.symbols.setdefault(symbol, set()).add(point_id)
+        self.total_length += length
+        self.dirty = True
+
+    def add(self, point_id: str, text: str, metadata: CodeVectorMetadata) -> None:
+        """Index a chunk, replacing any document with the same point ID.
+
+        Args:
+            point_id: Point ID of the chunk's vector
+            text: Text the chunk was embedded from
+            metadata: Metadata stored with the vector
+        """
+        names = " ".join([metadata.class_name, metadata.method_name, *metadata.fields_name])
+        terms = dict(Counter(tokenize(f"{text}\n{names}")))
+        self._insert(point_id, metadata.payload(), terms, sorted(_declared_symbols(metadata)))
+
+    def add_chunks(self, chunks: Iterable[CodeDataForVector]) -> None:
+        """Index chunks under the point IDs derived from their metadata."""
+        for chunk in chunks:
+            self.add(chunk.metadata.point_id(), chunk.transfer_body, chunk.metadata)
+
+    def remove(self, point_ids: Iterable[str]) -> None:
+        """Remove documents, ignoring unknown point IDs."""
+        for point_id in point_ids:
+            document = self.documents.pop(point_id, None)
+            if document is None:
+                continue
+            _, terms, symbols, length = document
+            for term in terms:
+                posting = self.postings[term]
+                del posting[point_id]
+                if not posting:
+                    del self.postings[term]
+            for symbol in symbols:
+                holders = self.symbols[symbol]
+                holders.discard(point_id)
+                if not holders:
+                    del self.symbols[symbol]
+            self.total_length -= length
+            self.dirty = True
+
+    def clear(self) -> None:
+        """Remove every document."""
+        self.documents.clear()
+        self.postings.clear()
+        self.symbols.clear()
+        self.total_length = 0
+        self.dirty = True
+
+    def _bm25(self, terms: Iterable[str], candidates: Optional[Set[str]] = None) -> Dict[str, float]:
+        """BM25 score of every document containing at least one term."""
+        count = len(self.documents)
+        if count == 0:
+            return {}
+        average_length = self.total_length / count or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for point_id, frequency in posting.items():
+                if candidates is not None and point_id not in candidates:
+                    continue
+                length = self.documents[point_id][3]
+                norm = frequency + self.K1 * (1 - self.B + self.B * length / average_length)
+                scores[point_id] = scores.get(point_id, 0.0) + idf * frequency * (self.K1 + 1) / norm
+        return scores
+
+    def _results(self, ranked: List[Tuple[float, str]], **extra: Any) -> List[Dict[str, Any]]:
+        return [
+            {"id": point_id, "score": score, "metadata": self.documents[point_id][0], **extra}
+            for score, point_id in ranked
+        ]
+
+    def _accepts(self, point_id: str, search_filter: Optional[SearchFilter]) -> bool:
+        return search_filter is None or search_filter.matches(self.documents[point_id][0])
+
+    def search(self, question: str, limit: int = 5, search_filter: Optional[SearchFilter] = None) -> List[Dict[str, Any]]:
+        """Rank documents by BM25 against a question.
+
+        Args:
+            question: Natural language question or code fragment
+            limit: Maximum number of results to return
+            search_filter: Package and class prefix conditions results must match
+
+        Returns:
+            Results with ``id``, ``score`` and ``metadata``, best first
+        """
+        scores = self._bm25(tokenize(question))
+        ranked = heapq.nlargest(limit, (
+            (score, point_id) for point_id, score in scores.items() if self._accepts(point_id, search_filter)
+        ))
+        return self._results(ranked)
+
+    def lookup_symbol(self, symbol: str, limit: int = 5, search_filter: Optional[SearchFilter] = None) -> List[Dict[str, Any]]:
+        """Find where a symbol is declared and used.
+
+        Declarations come first, then chunks mentioning every part of the
+        symbol as a whole identifier, each group ranked by BM25. Results carry
+        ``match`` set to ``declaration`` or ``usage``.
+
+        Args:
+            symbol: Identifier, optionally qualified, such as ``UserRepository.findByEmail``
+            limit: Maximum number of results to return
+            search_filter: Package and class prefix conditions results must match
+
+        Returns:
+            Results with ``id``, ``score``, ``metadata`` and ``match``, empty if the symbol is unknown
+        """
+        parts = [part.lower() for part in symbol.split(".") if part]
+        if not parts:
+            return []
+        declared = self.symbols.get(".".join(parts), set())
+        usages = set(self.postings.get(parts[-1], {}))
+        for part in parts[:-1]:
+            usages &= set(self.postings.get(part, {}))
+        usages -= declared
+        if search_filter is not None:
+            declared = {point_id for point_id in declared if self._accepts(point_id, search_filter)}
+            usages = {point_id for point_id in usages if self._accepts(point_id, search_filter)}
+
+        scores = self._bm25(parts, declared | usages)
+        results = self._results(
+            sorted(((scores.get(point_id, 0.0), point_id) for point_id in declared), reverse=True)[:limit],
+            match="declaration"
+        )
+        if len(results) < limit:
+            results.extend(self._results(
+                heapq.nlargest(limit - len(results), ((scores.get(point_id, 0.0), point_id) for point_id in usages)),
+                match="usage"
+            ))
+        return results
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the documents; postings are rebuilt on load."""
+        return {
+            point_id: {"metadata": metadata, "terms": terms, "symbols": symbols}
+            for point_id, (metadata, terms, symbols, _) in self.documents.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LexicalIndex":
+        """Rebuild an index serialized by to_dict."""
+        index = cls()
+        for point_id, document in data.items():
+            index._insert(point_id, document["metadata"], document["terms"], document["symbols"])
+        index.dirty = False
+        return index
+
+
+class LexicalIndexStore:
+    """Per-project lexical indexes, kept in memory and persisted as JSON."""
+
+    def __init__(self, state_dir: str):
+        """Initialize the store.
+
+        Args:
+            state_dir (str): Directory where indexes are kept
+        """
+        self.state_dir = os.path.expanduser(state_dir)
+        self.logger = logging.getLogger(__name__)
+        self._indexes: Dict[str, LexicalIndex] = {}
+
+    def _index_path(self, project_name: str) -> str:
+        return os.path.join(self.state_dir, "lexical", f"{safe_project_name(project_name)}.json")
+
+    def get(self, project_name: str) -> LexicalIndex:
+        """Get the index of a project, loading it from disk on first use.
+
+        Args:
+            project_name (str): Name of the project
+
+        Returns:
+            LexicalIndex: The project's index, empty if it was never saved or is unreadable
+        """
+        index = self._indexes.get(project_name)
+        if index is not None:
+            return index
+        index = LexicalIndex()
+        path = self._index_path(project_name)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    index = LexicalIndex.from_dict(json.load(f))
+            except Exception as e:
+                self.logger.error(f"Failed to load lexical index for project {project_name}: {str(e)}")
+        self._indexes[project_name] = index
+        return index
+
+    def save(self, project_name: str) -> bool:
+        """Atomically write the index of a project if it changed.
+
+        Args:
+            project_name (str): Name of the project
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        index = self._indexes.get(project_name)
+        if index is None or not index.dirty:
+            return True
+        path = self._index_path(project_name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index.to_dict(), f)
+            os.replace(tmp_path, path)
+            index.dirty = False
+            self.logger.debug(f"Saved lexical index for project {project_name} with {len(index)} documents")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to save lexical index for project {project_name}: {str(e)}")
+            return False
@@ -0,0 +1,767 @@
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Set, Union
+
+import numpy as np
+
+from services.metrics import metrics
+from services.vector_storage_backend import VectorStorageBackend, truncate_embeddings
+from type_definitions.code_types import CodeVectorMetadata, name_prefixes
+from type_definitions.storage_types import CollectionOptions, SearchFilter, SearchOptions
+
+# Number of set bits of every byte value, for NumPy versions without bitwise_count
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _hamming_distances(codes: np.ndarray, bits: np.ndarray) -> np.ndarray:
+    """Count the differing bits between packed codes and one packed query.
+
+    Args:
+        codes (np.ndarray): Packed bits, one row per vector, rows a multiple of 8 bytes wide
+        bits (np.ndarray): Packed bits of the query
+
+    Returns:
+        np.ndarray: Hamming distance of every row
+    """
+    xor = np.bitwise_xor(codes, bits)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor.view(np.uint64)).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[xor].sum(axis=1, dtype=np.int32)
+
+
+class _LocalCollection:
+    """Vectors and payloads of one local collection.
+
+    Vectors are L2-normalized on insert and kept in a memory-mapped float32
+    matrix, so cosine similarity is a single matrix-vector product. IDs,
+    payloads and deletion flags live in a JSON sidecar written on flush.
+
+    A quantized or two-stage collection also keeps a compact index of its
+    vectors in RAM: int8 values with a per-vector scale (scalar), one sign bit
+    per dimension (binary) or, in two-stage collections, the truncated and
+    renormalized leading dimensions of Matryoshka embeddings (quantized too
+    when quantization is enabled). Searches scan the index, then rescore the
+    best candidates with the float vectors, which are only paged in for those
+    rows.
+    """
+
+    INITIAL_CAPACITY = 1024
+    # Rows dequantized at once, small enough for the temporary float block to stay in cache
+    SCAN_BLOCK_ROWS = 256
+    # Keyword fields of search filters -> payload field their values are derived from
+    KEYWORD_FIELDS = {"package_path": "package", "class_path": "class_name"}
+
+    def __init__(
+        self,
+        path: str,
+        vector_size: int,
+        quantization: str = "none",
+        coarse_dimensions: Optional[int] = None
+    ):
+        """Open or create a collection directory.
+
+        Args:
+            path (str): Directory of the collection
+            vector_size (int): Dimension of the stored vectors
+            quantization (str): ``none``, ``scalar`` or ``binary``, ignored for existing collections
+            coarse_dimensions (Optional[int]): Leading dimensions searched before reranking
+                with the full vectors, ignored for existing collections
+        """
+        self.path = path
+        self.vector_size = int(vector_size)
+        self.quantization = quantization
+        self.coarse_dimensions = coarse_dimensions
+        self.codes = np.zeros((0, 0), dtype=np.uint8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.lock = threading.RLock()
+        self.count = 0
+        self.capacity = 0
+        self.ids: List[Union[int, str]] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.id_to_row: Dict[Union[int, str], int] = {}
+        self.project_codes: Dict[str, int] = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.projects = np.zeros(0, dtype=np.int32)
+        # Keyword field -> value -> rows holding it
+        self.keyword_rows: Dict[str, Dict[str, Set[int]]] = {field: {} for field in self.KEYWORD_FIELDS}
+        self.vectors: Optional[np.memmap] = None
+        self.dirty = False
+
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(self._meta_path):
+            self._load()
+        else:
+            self._resize(self.INITIAL_CAPACITY)
+            self.flush()
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def _points_path(self) -> str:
+        return os.path.join(self.path, "points.json")
+
+    def _load(self) -> None:
+        """Load the collection from disk."""
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(self._points_path, "r", encoding="utf-8") as f:
+            points = json.load(f)
+
+        self.vector_size = meta["vector_size"]
+        self.quantization = meta.get("quantization", "none")
+        self.coarse_dimensions = meta.get("coarse_dimensions")
+        self.capacity = meta["capacity"]
+        self.count = len(points["ids"])
+        self.ids = points["ids"]
+        self.payloads = points["payloads"]
+        self.id_to_row = {point_id: row for row, point_id in enumerate(self.ids)}
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.vector_size))
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.alive[:self.count] = points["alive"]
+        self.projects = np.zeros(self.capacity, dtype=np.int32)
+        for row, payload in enumerate(self.payloads):
+            self._index_payload(row, payload)
+        self._resize_codes(self.capacity)
+        self._quantize_rows(np.arange(self.count))
+
+    def _project_code(self, project_name: str) -> int:
+        """Get the integer code used to filter rows by project."""
+        return self.project_codes.setdefault(project_name, len(self.project_codes))
+
+    def _index_payload(self, row: int, payload: Dict[str, Any]) -> None:
+        """Record the project and keyword values of a row's payload."""
+        self.projects[row] = self._project_code(payload.get("project_name", ""))
+        for field, source in self.KEYWORD_FIELDS.items():
+            for value in name_prefixes(payload.get(source, "")):
+                self.keyword_rows[field].setdefault(value, set()).add(row)
+
+    def _unindex_payload(self, row: int) -> None:
+        """Forget the keyword values of a row's current payload."""
+        payload = self.payloads[row]
+        for field, source in self.KEYWORD_FIELDS.items():
+            for value in name_prefixes(payload.get(source, "")):
+                rows = self.keyword_rows[field].get(value)
+                if rows is not None:
+                    rows.discard(row)
+                    if not rows:
+                        del self.keyword_rows[field][value]
+
+    def _resize(self, capacity: int) -> None:
+        """Grow the vector file and row arrays to a new capacity."""
+        if self.vectors is not None:
+            self.vectors.flush()
+            del self.vectors
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.vector_size * 4)
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.vector_size))
+        self.alive = np.concatenate([self.alive, np.zeros(capacity - self.capacity, dtype=bool)])
+        self.projects = np.concatenate([self.projects, np.zeros(capacity - self.capacity, dtype=np.int32)])
+        self._resize_codes(capacity)
+        self.capacity = capacity
+
+    @property
+    def indexed(self) -> bool:
+        """Whether searches scan the in-RAM index before the float vectors."""
+        return self.quantization != "none" or bool(self.coarse_dimensions)
+
+    def _first_stage(self, vectors: np.ndarray) -> np.ndarray:
+        """Get the vectors the index is built from: truncated in two-stage collections."""
+        if self.coarse_dimensions:
+            return truncate_embeddings(vectors, self.coarse_dimensions)
+        return vectors
+
+    def _resize_codes(self, capacity: int) -> None:
+        """Grow the index to a new capacity."""
+        if not self.indexed:
+            return
+        size = self.coarse_dimensions or self.vector_size
+        if self.quantization == "scalar":
+            width, dtype = size, np.int8
+        elif self.quantization == "binary":
+            # Packed bits are padded to whole 64-bit words so distances can count bits a word at a time
+            width, dtype = (size + 63) // 64 * 8, np.uint8
+        else:
+            width, dtype = size, np.float32
+        codes = np.zeros((capacity, width), dtype=dtype)
+        rows = min(len(self.codes), capacity)
+        if self.codes.shape[1:] == (width,):
+            codes[:rows] = self.codes[:rows]
+        self.codes = codes
+        self.scales = np.concatenate([self.scales[:rows], np.zeros(capacity - rows, dtype=np.float32)])
+
+    def _quantize_rows(self, rows: np.ndarray) -> None:
+        """Compute the index entries of stored rows from their float vectors."""
+        if not self.indexed:
+            return
+        for start in range(0, len(rows), self.SCAN_BLOCK_ROWS):
+            block = rows[start:start + self.SCAN_BLOCK_ROWS]
+            self._quantize(block, np.asarray(self.vectors[block]))
+
+    def _quantize(self, rows: Union[List[int], np.ndarray], vectors: np.ndarray) -> None:
+        """Store the index entries of normalized vectors at the given rows."""
+        if not self.indexed:
+            return
+        vectors = self._first_stage(vectors)
+        if self.quantization == "scalar":
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales = np.where(scales == 0, 1, scales).astype(np.float32)
+            self.codes[rows] = np.rint(vectors / scales[:, None]).astype(np.int8)
+            self.scales[rows] = scales
+        elif self.quantization == "binary":
+            bits = np.packbits(vectors > 0, axis=1)
+            self.codes[rows, :bits.shape[1]] = bits
+        else:
+            self.codes[rows] = vectors
+
+    def _quantized_scores(self, query_vectors: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Approximate the cosine scores of rows from their index entries.
+
+        Binary codes score ``1 - 2 * hamming / dimensions``, which ranks rows
+        like the angle between sign vectors.
+
+        Args:
+            query_vectors (np.ndarray): Normalized query vectors, one per row
+            rows (np.ndarray): Rows to score
+
+        Returns:
+            np.ndarray: Scores with one row per query and one column per row
+        """
+        query_vectors = self._first_stage(query_vectors)
+        # Without deleted or filtered rows, blocks are slices of the index rather than copies
+        contiguous = rows.size == self.count
+        if self.quantization == "none":
+            codes = self.codes[:self.count] if contiguous else self.codes[rows]
+            return query_vectors @ codes.T
+
+        scores = np.empty((len(query_vectors), rows.size), dtype=np.float32)
+        query_bits = None
+        if self.quantization == "binary":
+            packed = np.packbits(query_vectors > 0, axis=1)
+            query_bits = np.zeros((len(query_vectors), self.codes.shape[1]), dtype=np.uint8)
+            query_bits[:, :packed.shape[1]] = packed
+        for start in range(0, rows.size, self.SCAN_BLOCK_ROWS):
+            end = min(start + self.SCAN_BLOCK_ROWS, rows.size)
+            block = slice(start, end) if contiguous else rows[start:end]
+            codes = self.codes[block]
+            if query_bits is None:
+                scores[:, start:end] = (query_vectors @ codes.T.astype(np.float32)) * self.scales[block]
+            else:
+                for index, bits in enumerate(query_bits):
+                    distances = _hamming_distances(codes, bits)
+                    scores[index, start:end] = 1 - 2 * distances / query_vectors.shape[1]
+        return scores
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Get the bytes of the stored vectors and of the index kept in RAM."""
+        return {
+            "vectors": self.count * self.vector_size * 4,
+            "index": self.count * (self.codes.shape[1] * self.codes.itemsize + 4 * (self.quantization == "scalar")),
+        }
+
+    def upsert(self, ids: List[Union[int, str]], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        """Insert points or replace existing points with the same IDs."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        rows = []
+        for point_id, payload in zip(ids, payloads):
+            row = self.id_to_row.get(point_id)
+            if row is None:
+                if self.count >= self.capacity:
+                    self._resize(max(self.capacity * 2, self.INITIAL_CAPACITY))
+                row = self.count
+                self.count += 1
+                self.id_to_row[point_id] = row
+                self.ids.append(point_id)
+                self.payloads.append(payload)
+            else:
+                self._unindex_payload(row)
+                self.payloads[row] = payload
+            self.alive[row] = True
+            self._index_payload(row, payload)
+            rows.append(row)
+
+        self.vectors[rows] = vectors
+        self._quantize(rows, vectors)
+        self.dirty = True
+
+    def update_payloads(self, ids: List[Union[int, str]], payloads: List[Dict[str, Any]]) -> None:
+        """Replace the payloads of existing points, ignoring unknown IDs."""
+        for point_id, payload in zip(ids, payloads):
+            row = self.id_to_row.get(point_id)
+            if row is None:
+                continue
+            self._unindex_payload(row)
+            self.payloads[row] = payload
+            self._index_payload(row, payload)
+        self.dirty = True
+
+    def delete_rows(self, rows: np.ndarray) -> None:
+        """Mark rows as deleted."""
+        self.alive[rows] = False
+        self.dirty = True
+
+    def project_mask(self, project_name: Optional[str]) -> np.ndarray:
+        """Get the mask of live rows, optionally restricted to a project."""
+        mask = self.alive[:self.count].copy()
+        if project_name is not None:
+            code = self.project_codes.get(project_name)
+            if code is None:
+                return np.zeros(self.count, dtype=bool)
+            mask &= self.projects[:self.count] == code
+        return mask
+
+    def filter_mask(self, project_name: Optional[str], search_filter: Optional[SearchFilter]) -> np.ndarray:
+        """Get the mask of live rows of a project that also match a search filter."""
+        mask = self.project_mask(project_name)
+        if search_filter is None:
+            return mask
+        for field, value in search_filter.conditions().items():
+            rows = self.keyword_rows[field].get(value)
+            if not rows:
+                return np.zeros(self.count, dtype=bool)
+            selected = np.zeros(self.count, dtype=bool)
+            selected[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+            mask &= selected
+        return mask
+
+    def search(
+        self,
+        query_vectors: np.ndarray,
+        limit: int,
+        mask: np.ndarray,
+        options: Optional[SearchOptions] = None
+    ) -> List[List[tuple]]:
+        """Cosine top-k for a batch of queries over the masked rows.
+
+        Args:
+            query_vectors (np.ndarray): Matrix of query vectors, one per row
+            limit (int): Maximum number of results per query
+            mask (np.ndarray): Rows eligible as results
+            options (Optional[SearchOptions]): Quantization rescoring and oversampling
+
+        Returns:
+            List[List[tuple]]: Per query, (row, score) pairs sorted by descending score
+        """
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0 or limit <= 0:
+            return [[] for _ in range(len(query_vectors))]
+
+        norms = np.linalg.norm(query_vectors, axis=1, keepdims=True)
+        query_vectors = query_vectors / np.where(norms == 0, 1, norms)
+        options = options or SearchOptions()
+        if self.indexed and not options.exact:
+            return self._search_indexed(query_vectors, limit, candidates, options)
+
+        if candidates.size == self.count:
+            scores = query_vectors @ self.vectors[:self.count].T
+        else:
+            scores = query_vectors @ self.vectors[candidates].T
+
+        k = min(limit, candidates.size)
+        results = []
+        for query_scores in scores:
+            top = self._top(query_scores, k)
+            results.append([(int(candidates[i]), float(query_scores[i])) for i in top])
+        return results
+
+    def _search_indexed(
+        self,
+        query_vectors: np.ndarray,
+        limit: int,
+        candidates: np.ndarray,
+        options: SearchOptions
+    ) -> List[List[tuple]]:
+        """Top-k from the index, rescored with the float vectors of the best candidates."""
+        scores = self._quantized_scores(query_vectors, candidates)
+        # Two-stage collections always rerank, quantized ones unless rescoring is off
+        rescore = bool(self.coarse_dimensions) or options.rescore
+        factor = 1.0
+        if self.quantization != "none" and options.rescore:
+            factor = options.oversampling or 1.0
+        if self.coarse_dimensions:
+            factor = max(factor, options.rerank_factor)
+        k = min(limit, candidates.size)
+        if rescore:
+            k = min(max(k, math.ceil(limit * factor)), candidates.size)
+
+        results = []
+        for query_vector, query_scores in zip(query_vectors, scores):
+            top = self._top(query_scores, k)
+            if not rescore:
+                results.append([(int(candidates[i]), float(query_scores[i])) for i in top])
+                continue
+            rows = candidates[np.sort(top)]
+            exact_scores = self.vectors[rows] @ query_vector
+            best = self._top(exact_scores, min(limit, rows.size))
+            results.append([(int(rows[i]), float(exact_scores[i])) for i in best])
+        return results
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, sorted by descending score."""
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def compact(self) -> None:
+        """Drop deleted rows so the matrix only holds live vectors."""
+        live = np.flatnonzero(self.alive[:self.count])
+        if live.size == self.count:
+            return
+        vectors = np.array(self.vectors[live])
+        ids = [self.ids[row] for row in live]
+        payloads = [self.payloads[row] for row in live]
+
+        self.count = 0
+        self.ids = []
+        self.payloads = []
+        self.id_to_row = {}
+        self.keyword_rows = {field: {} for field in self.KEYWORD_FIELDS}
+        self.alive[:] = False
+        if len(ids):
+            self.vectors[:len(ids)] = vectors
+            for row, (point_id, payload) in enumerate(zip(ids, payloads)):
+                self.id_to_row[point_id] = row
+                self.ids.append(point_id)
+                self.payloads.append(payload)
+                self.alive[row] = True
+                self._index_payload(row, payload)
+            self.count = len(ids)
+            self._quantize_rows(np.arange(self.count))
+        self.dirty = True
+
+    def flush(self) -> None:
+        """Persist vectors and the sidecar to disk."""
+        if self.count and (~self.alive[:self.count]).sum() > self.count // 2:
+            self.compact()
+        self.vectors.flush()
+        points = {
+            "ids": self.ids,
+            "payloads": self.payloads,
+            "alive": self.alive[:self.count].tolist(),
+        }
+        for path, data in (
+            (self._points_path, points),
+            (self._meta_path, {
+                "vector_size": self.vector_size,
+                "capacity": self.capacity,
+                "quantization": self.quantization,
+                "coarse_dimensions": self.coarse_dimensions,
+            }),
+        ):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        self.dirty = False
+
+
+class LocalVectorStorageService(VectorStorageBackend):
+    """Embedded vector storage backed by memory-mapped NumPy matrices.
+
+    Needs no server: each collection is a directory holding a float32 vector
+    file and a JSON payload sidecar, searched with exact cosine top-k, or with
+    rescored quantized top-k in quantized collections. Suited to development,
+    CI and small to medium projects.
+
+    Float vectors are always memory-mapped, so only the quantization,
+    truncation, rescoring and oversampling options apply; HNSW and on-disk
+    options are accepted and ignored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        collection_options: Optional[CollectionOptions] = None,
+        search_options: Optional[SearchOptions] = None
+    ):
+        """Initialize the local vector storage.
+
+        Args:
+            path (str): Directory holding one subdirectory per collection
+            collection_options (Optional[CollectionOptions]): Layout of collections created without options
+            search_options (Optional[SearchOptions]): Knobs of searches run without options
+        """
+        self.path = os.path.expanduser(path)
+        self.collection_options = collection_options or CollectionOptions()
+        self.search_options = search_options or SearchOptions()
+        self.logger = logging.getLogger(__name__)
+        self._collections: Dict[str, _LocalCollection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def _collection_path(self, collection_name: str) -> str:
+        """Get the directory of a collection."""
+        return os.path.join(self.path, re.sub(r"[^A-Za-z0-9_.-]", "_", collection_name))
+
+    def _get_collection(self, collection_name: str) -> _LocalCollection:
+        """Get a loaded collection.
+
+        Raises:
+            KeyError: If the collection does not exist
+        """
+        with self._lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                path = self._collection_path(collection_name)
+                if not os.path.exists(os.path.join(path, "meta.json")):
+                    raise KeyError(f"Collection {collection_name} does not exist")
+                collection = _LocalCollection(path, 0)
+                self._collections[collection_name] = collection
+            return collection
+
+    @staticmethod
+    def _fit(collection: _LocalCollection, vectors: np.ndarray) -> np.ndarray:
+        """Truncate embeddings longer than a collection's vectors, leaving the others untouched."""
+        if vectors.shape[1] > collection.vector_size:
+            return truncate_embeddings(vectors, collection.vector_size)
+        return vectors
+
+    def create_collection(
+        self,
+        collection_name: str,
+        vector_size: int = 768,
+        options: Optional[CollectionOptions] = None
+    ) -> bool:
+        try:
+            options = options or self.collection_options
+            self.logger.debug(f"Creating collection {collection_name} with vector size {vector_size} and {options}")
+            with self._lock:
+                path = self._collection_path(collection_name)
+                if os.path.exists(os.path.join(path, "meta.json")):
+                    raise ValueError(f"Collection {collection_name} already exists")
+                # Truncated collections store only the leading dimensions, unless the full vectors rerank them
+                size = min(options.dimensions or vector_size, vector_size)
+                two_stage = options.rerank_full_vectors and size < vector_size
+                self._collections[collection_name] = _LocalCollection(
+                    path,
+                    vector_size if two_stage else size,
+                    options.quantization,
+                    coarse_dimensions=size if two_stage else None
+                )
+            self.logger.info(f"Collection {collection_name} created successfully")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to create collection {collection_name}: {str(e)}")
+            return False
+
+    def store_vectors(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        metadata_list: List[CodeVectorMetadata],
+        ids: Optional[List[Union[int, str]]] = None,
+        wait: bool = True
+    ) -> bool:
+        try:
+            if ids is None:
+                ids = [metadata.point_id() for metadata in metadata_list]
+            collection = self._get_collection(collection_name)
+            matrix = self._fit(collection, np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+            if matrix.shape[1] != collection.vector_size:
+                raise ValueError(
+                    f"Vector size {matrix.shape[1]} does not match collection size {collection.vector_size}"
+                )
+            with collection.lock, metrics.timer("vector_storage_request_seconds", operation="upsert"):
+                collection.upsert(list(ids), matrix, [metadata.payload() for metadata in metadata_list])
+                # Persisting the sidecar is deferred until a caller waits for durability
+                if wait:
+                    collection.flush()
+            metrics.inc("vector_points_upserted_total", len(ids))
+            self.logger.info(f"{len(ids)} vectors stored in collection {collection_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to store vectors in collection {collection_name}: {str(e)}")
+            return False
+
+    def update_payloads(
+        self,
+        collection_name: str,
+        ids: List[Union[int, str]],
+        metadata_list: List[CodeVectorMetadata],
+        wait: bool = True
+    ) -> bool:
+        if not ids:
+            return True
+        try:
+            collection = self._get_collection(collection_name)
+            with collection.lock, metrics.timer("vector_storage_request_seconds", operation="update_payload"):
+                collection.update_payloads(list(ids), [metadata.payload() for metadata in metadata_list])
+                if wait:
+                    collection.flush()
+            self.logger.debug(f"Updated {len(ids)} payloads in collection {collection_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to update payloads in collection {collection_name}: {str(e)}")
+            return False
+
+    def retrieve_vectors(self, collection_name: str, ids: List[Union[int, str]]) -> Dict[Union[int, str], List[float]]:
+        if not ids:
+            return {}
+        try:
+            collection = self._get_collection(collection_name)
+            with collection.lock, metrics.timer("vector_storage_request_seconds", operation="retrieve"):
+                return {
+                    point_id: collection.vectors[row].tolist()
+                    for point_id in ids
+                    for row in (collection.id_to_row.get(point_id),)
+                    if row is not None and collection.alive[row]
+                }
+        except Exception as e:
+            self.logger.error(f"Failed to retrieve vectors from collection {collection_name}: {str(e)}")
+            return {}
+
+    def search_vectors(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 5,
+        project_name: Optional[str] = None,
+        search_options: Optional[SearchOptions] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[Dict[str, Any]]:
+        try:
+            collection = self._get_collection(collection_name)
+            with collection.lock, metrics.timer("vector_storage_request_seconds", operation="search"):
+                mask = collection.filter_mask(project_name, search_filter)
+                hits = collection.search(
+                    self._fit(collection, np.asarray([query_vector], dtype=np.float32)),
+                    limit,
+                    mask,
+                    search_options or self.search_options
+                )[0]
+                return [
+                    {
+                        "id": collection.ids[row],
+                        "score": score,
+                        "metadata": collection.payloads[row]
+                    }
+                    for row, score in hits
+                ]
+        except Exception as e:
+            self.logger.error(f"Failed to search vectors in collection {collection_name}: {str(e)}")
+            return []
+
+    def search_vectors_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        project_name: Optional[str] = None,
+        search_options: Optional[SearchOptions] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[List[Dict[str, Any]]]:
+        if not query_vectors:
+            return []
+        try:
+            collection = self._get_collection(collection_name)
+            with collection.lock, metrics.timer("vector_storage_request_seconds", operation="search_batch"):
+                mask = collection.filter_mask(project_name, search_filter)
+                batch_hits = collection.search(
+                    self._fit(collection, np.asarray(query_vectors, dtype=np.float32)),
+                    limit,
+                    mask,
+                    search_options or self.search_options
+                )
+                return [
+                    [
+                        {
+                            "id": collection.ids[row],
+                            "score": score,
+                            "metadata": collection.payloads[row]
+                        }
+                        for row, score in hits
+                    ]
+                    for hits in batch_hits
+                ]
+        except Exception as e:
+            self.logger.error(f"Failed to batch search vectors in collection {collection_name}: {str(e)}")
+            return [[] for _ in query_vectors]
+
+    def delete_project_vectors(self, collection_name: str, project_name: str) -> bool:
+        try:
+            collection = self._get_collection(collection_name)
+            with collection.lock:
+                collection.delete_rows(np.flatnonzero(collection.project_mask(project_name)))
+                collection.flush()
+            self.logger.info(f"Vectors deleted for project {project_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to delete vectors for project {project_name}: {str(e)}")
+            return False
+
+    def delete_points(self, collection_name: str, ids: List[Union[int, str]]) -> bool:
+        if not ids:
+            return True
+        try:
+            collection = self._get_collection(collection_name)
+            with collection.lock:
+                rows = [collection.id_to_row[point_id] for point_id in ids if point_id in collection.id_to_row]
+                collection.delete_rows(np.asarray(rows, dtype=np.int64))
+                collection.flush()
+            self.logger.info(f"Deleted {len(ids)} points from collection {collection_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to delete points from collection {collection_name}: {str(e)}")
+            return False
+
+    def delete_collection(self, collection_name: str) -> bool:
+        """Delete a collection and its files.
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with self._lock:
+                self._collections.pop(collection_name, None)
+                shutil.rmtree(self._collection_path(collection_name), ignore_errors=True)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to delete collection {collection_name}: {str(e)}")
+            return False
+
+    def memory_usage(self, collection_name: str) -> Dict[str, int]:
+        """Get the size of a collection's vectors and of its in-RAM index.
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            Dict[str, int]: Bytes of the float vectors (memory-mapped) and of the index held in RAM
+        """
+        collection = self._get_collection(collection_name)
+        with collection.lock:
+            return collection.memory_usage()
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return (
+            collection_name in self._collections
+            or os.path.exists(os.path.join(self._collection_path(collection_name), "meta.json"))
+        )
+
+    def health_check(self) -> bool:
+        return os.access(self.path, os.W_OK)
+
+    def close(self) -> None:
+        """Persist every loaded collection."""
+        for collection_name, collection in list(self._collections.items()):
+            try:
+                with collection.lock:
+                    if collection.dirty:
+                        collection.flush()
+            except Exception as e:
+                self.logger.error(f"Failed to flush collection {collection_name}: {str(e)}")
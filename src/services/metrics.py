@@ -0,0 +1,189 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Upper bounds in seconds, from a cache lookup to a full repository update
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """Bucketed distribution of observed values."""
+
+    __slots__ = ("bucket_counts", "count", "sum")
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.count = 0
+        self.sum = 0.0
+
+
+class MetricsRegistry:
+    """In-process registry of counters and latency histograms.
+
+    Metrics are identified by a name and optional labels, and are exported as
+    a JSON-friendly snapshot or in the Prometheus text exposition format.
+    Counter names end in ``_total`` and histogram names in ``_seconds``.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "codebase_mcp_"):
+        """Initialize the registry.
+
+        Args:
+            buckets: Sorted histogram bucket upper bounds, in seconds
+            prefix: Prefix of metric names in the Prometheus export
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Increase a counter.
+
+        Args:
+            name: Counter name
+            value: Amount to add
+            **labels: Labels of the counter
+        """
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record a value in a histogram.
+
+        Args:
+            name: Histogram name
+            value: Observed value, in seconds for latencies
+            **labels: Labels of the histogram
+        """
+        key = self._label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            histogram.bucket_counts[index] += 1
+            histogram.count += 1
+            histogram.sum += value
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Time a block and record its duration in a histogram, even if it raises.
+
+        Args:
+            name: Histogram name
+            **labels: Labels of the histogram
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        """Get the current value of a counter, 0 if never increased."""
+        with self._lock:
+            return self._counters.get(name, {}).get(self._label_key(labels), 0)
+
+    def _quantile(self, histogram: _Histogram, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket containing it."""
+        if histogram.count == 0:
+            return 0.0
+        rank = q * histogram.count
+        seen = 0
+        for bound, count in zip(self.buckets, histogram.bucket_counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get every metric as plain data.
+
+        Returns:
+            Dict with ``counters`` and ``histograms``, each mapping a metric
+            name to its series with their labels and values
+        """
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                        "p50": self._quantile(histogram, 0.50),
+                        "p95": self._quantile(histogram, 0.95),
+                        "p99": self._quantile(histogram, 0.99),
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ""
+        escaped = (
+            name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for name, value in pairs
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    def to_prometheus(self) -> str:
+        """Export every metric in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text, one sample per line
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = self.prefix + name
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{self._format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                metric = self.prefix + name
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.bucket_counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{self._format_labels(key, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{metric}_bucket{self._format_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{metric}_sum{self._format_labels(key)} {histogram.sum}")
+                    lines.append(f"{metric}_count{self._format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Remove every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
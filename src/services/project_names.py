@@ -0,0 +1,23 @@
+import hashlib
+import re
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def safe_project_name(project_name: str) -> str:
+    """Derive a name usable in file and collection names from a project name.
+
+    Unsafe characters are replaced, and a hash of the original name is then
+    appended so that names only differing in replaced characters, such as
+    ``org/app`` and ``org_app``, stay apart.
+
+    Args:
+        project_name: Name of the project
+
+    Returns:
+        The project name itself if it is already safe, otherwise a distinct safe name
+    """
+    safe_name = _UNSAFE.sub("_", project_name)
+    if safe_name != project_name:
+        safe_name += "-" + hashlib.blake2b(project_name.encode("utf-8"), digest_size=4).hexdigest()
+    return safe_name
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after a fixed time.
+
+    Used for query embeddings and query results, where a stale entry is
+    cheap to recompute but a hit saves a remote round trip.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept
+            ttl_seconds (float): Lifetime of an entry in seconds, 0 disables expiry
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value and mark it as recently used.
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to store
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches a predicate.
+
+        Args:
+            predicate (Callable[[Hashable], bool]): Returns True for keys to remove
+
+        Returns:
+            int: Number of removed entries
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate and number of entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
@@ -1,43 +1,162 @@
 import logging
-from typing import Optional
+from typing import Optional, Set
 from config.settings import settings
 from services.vector_storage import VectorStorageService
+from services.vector_storage_backend import VectorStorageBackend
+from services.local_vector_storage import LocalVectorStorageService
 from services.vector_embedding import VectorEmbeddingService
+from services.embedding_cache import EmbeddingCache
 from services.code_parser import JavaCodeParser
+from services.index_manifest import IndexManifestStore
+from services.project_names import safe_project_name
+from services.lexical_index import LexicalIndexStore
+from services.content_store import ContentStore
+from services.code_chunker import CodeChunker, FileChunker, MethodChunker
+from type_definitions.storage_types import CollectionOptions, SearchOptions
 
 
 class ServiceFactory:
     """Factory for creating and managing service instances."""
     
-    _vector_storage: Optional[VectorStorageService] = None
+    _vector_storage: Optional[VectorStorageBackend] = None
     _vector_embedding: Optional[VectorEmbeddingService] = None
     _java_code_parser: Optional[JavaCodeParser] = None
+    _index_manifest_store: Optional[IndexManifestStore] = None
+    _lexical_index_store: Optional[LexicalIndexStore] = None
+    _code_chunker: Optional[CodeChunker] = None
+    _content_store: Optional[ContentStore] = None
+    _project_collections: Set[str] = set()
 
     logger = logging.getLogger(__name__)
     
     @classmethod
-    def get_vector_storage(cls) -> VectorStorageService:
-        """Get or create VectorStorageService instance."""
+    def get_vector_storage(cls) -> VectorStorageBackend:
+        """Get or create the vector storage selected by settings.VECTOR_STORAGE_BACKEND."""
         if cls._vector_storage is None:
-            cls._vector_storage = VectorStorageService(
-                host=settings.QDRANT_HOST,
-                port=settings.QDRANT_PORT
+            if settings.VECTOR_TENANCY not in ("shared", "collection", "shard"):
+                raise ValueError(f"Unknown vector tenancy: {settings.VECTOR_TENANCY}")
+            collection_options = CollectionOptions(
+                quantization=settings.VECTOR_QUANTIZATION,
+                quantization_always_ram=settings.VECTOR_QUANTIZATION_ALWAYS_RAM,
+                on_disk_vectors=settings.VECTOR_ON_DISK,
+                on_disk_payload=settings.PAYLOAD_ON_DISK,
+                hnsw_m=settings.HNSW_M,
+                hnsw_ef_construct=settings.HNSW_EF_CONSTRUCT,
+                dimensions=settings.VECTOR_DIMENSIONS,
+                rerank_full_vectors=settings.VECTOR_RERANK_FULL
             )
+            search_options = SearchOptions(
+                hnsw_ef=settings.SEARCH_HNSW_EF,
+                exact=settings.SEARCH_EXACT,
+                rescore=settings.SEARCH_RESCORE,
+                oversampling=settings.SEARCH_OVERSAMPLING,
+                rerank_factor=settings.SEARCH_RERANK_FACTOR
+            )
+            if settings.VECTOR_STORAGE_BACKEND == "qdrant":
+                cls._vector_storage = VectorStorageService(
+                    host=settings.QDRANT_HOST,
+                    port=settings.QDRANT_PORT,
+                    grpc_port=settings.QDRANT_GRPC_PORT,
+                    prefer_grpc=settings.QDRANT_PREFER_GRPC,
+                    upsert_batch_size=settings.QDRANT_UPSERT_BATCH_SIZE,
+                    upsert_workers=settings.QDRANT_UPSERT_WORKERS,
+                    collection_options=collection_options,
+                    search_options=search_options,
+                    tenancy=settings.VECTOR_TENANCY
+                )
+            elif settings.VECTOR_STORAGE_BACKEND == "local":
+                if settings.VECTOR_TENANCY == "shard":
+                    raise ValueError("Shard tenancy needs the qdrant vector storage backend")
+                cls._vector_storage = LocalVectorStorageService(
+                    settings.LOCAL_VECTOR_STORAGE_PATH,
+                    collection_options=collection_options,
+                    search_options=search_options
+                )
+            else:
+                raise ValueError(f"Unknown vector storage backend: {settings.VECTOR_STORAGE_BACKEND}")
 
             cls.logger.info(f"settings: {settings}")
-            # Ensure the default collection exists
-            if not cls._vector_storage.collection_exists(settings.QDRANT_COLLECTION_NAME):
+            # Ensure the default collection exists, with the payload indexes its filters use
+            if settings.VECTOR_TENANCY == "collection":
+                pass  # Project collections are created on first use
+            elif not cls._vector_storage.collection_exists(settings.QDRANT_COLLECTION_NAME):
                 cls._vector_storage.create_collection(
                     collection_name=settings.QDRANT_COLLECTION_NAME,
                     vector_size=settings.VECTOR_SIZE
                 )
+            else:
+                if not cls._vector_storage.check_tenancy(settings.QDRANT_COLLECTION_NAME):
+                    raise ValueError(
+                        f"Collection {settings.QDRANT_COLLECTION_NAME} does not support "
+                        f"{settings.VECTOR_TENANCY} tenancy"
+                    )
+                cls._vector_storage.ensure_payload_indexes(settings.QDRANT_COLLECTION_NAME)
         return cls._vector_storage
     
+    @classmethod
+    def get_project_collection(cls, project_name: str) -> str:
+        """Get the collection holding a project's vectors under settings.VECTOR_TENANCY.
+
+        With one collection per project, the collection is created on first use.
+
+        Args:
+            project_name (str): Name of the project
+
+        Returns:
+            str: Name of the collection
+        """
+        if settings.VECTOR_TENANCY != "collection":
+            return settings.QDRANT_COLLECTION_NAME
+        collection_name = cls._project_collection_name(project_name)
+        if collection_name not in cls._project_collections:
+            vector_storage = cls.get_vector_storage()
+            if not vector_storage.collection_exists(collection_name):
+                if not vector_storage.create_collection(
+                    collection_name=collection_name,
+                    vector_size=settings.VECTOR_SIZE
+                ):
+                    raise RuntimeError(f"Failed to create collection {collection_name}")
+            else:
+                vector_storage.ensure_payload_indexes(collection_name)
+            cls._project_collections.add(collection_name)
+        return collection_name
+
+    @classmethod
+    def drop_project_collection(cls, project_name: str) -> bool:
+        """Delete the collection of a project, with one collection per project.
+
+        Args:
+            project_name (str): Name of the project
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        collection_name = cls._project_collection_name(project_name)
+        cls._project_collections.discard(collection_name)
+        vector_storage = cls.get_vector_storage()
+        if not vector_storage.collection_exists(collection_name):
+            return True
+        return vector_storage.delete_collection(collection_name)
+
+    @staticmethod
+    def _project_collection_name(project_name: str) -> str:
+        """Derive a valid, distinct collection name from a project name."""
+        return f"{settings.QDRANT_COLLECTION_NAME}__{safe_project_name(project_name)}"
+
     @classmethod
     def get_vector_embedding(cls) -> VectorEmbeddingService:
         """Get or create VectorEmbeddingService instance."""
         if cls._vector_embedding is None:
-            cls._vector_embedding = VectorEmbeddingService()
+            cache = None
+            if settings.EMBEDDING_CACHE_ENABLED:
+                cache = EmbeddingCache(
+                    path=settings.EMBEDDING_CACHE_PATH,
+                    max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES
+                )
+            cls._vector_embedding = VectorEmbeddingService(
+                cache=cache,
+                provider=settings.EMBEDDING_PROVIDER
+            )
         return cls._vector_embedding
     
     @classmethod
@@ -45,4 +164,44 @@ class ServiceFactory:
         """Get or create JavaCodeParser instance."""
         if cls._java_code_parser is None:
             cls._java_code_parser = JavaCodeParser()
-        return cls._java_code_parser 
\ No newline at end of file
+        return cls._java_code_parser 
+    
+    @classmethod
+    def get_index_manifest_store(cls) -> IndexManifestStore:
+        """Get or create IndexManifestStore instance."""
+        if cls._index_manifest_store is None:
+            cls._index_manifest_store = IndexManifestStore(settings.INDEX_STATE_DIR)
+        return cls._index_manifest_store
+    
+    @classmethod
+    def get_lexical_index_store(cls) -> LexicalIndexStore:
+        """Get or create LexicalIndexStore instance."""
+        if cls._lexical_index_store is None:
+            cls._lexical_index_store = LexicalIndexStore(settings.INDEX_STATE_DIR)
+        return cls._lexical_index_store
+    
+    @classmethod
+    def get_content_store(cls) -> Optional[ContentStore]:
+        """Get or create the ContentStore, None unless settings.CONTENT_SOURCE is ``store``."""
+        if settings.CONTENT_SOURCE == "source":
+            return None
+        if settings.CONTENT_SOURCE != "store":
+            raise ValueError(f"Unknown content source: {settings.CONTENT_SOURCE}")
+        if cls._content_store is None:
+            cls._content_store = ContentStore(settings.CONTENT_STORE_PATH)
+        return cls._content_store
+    
+    @classmethod
+    def get_code_chunker(cls) -> CodeChunker:
+        """Get or create the CodeChunker selected by settings.CHUNK_STRATEGY."""
+        if cls._code_chunker is None:
+            if settings.CHUNK_STRATEGY == "file":
+                cls._code_chunker = FileChunker()
+            elif settings.CHUNK_STRATEGY == "method":
+                cls._code_chunker = MethodChunker(
+                    max_tokens=settings.CHUNK_MAX_TOKENS,
+                    overlap_tokens=settings.CHUNK_OVERLAP_TOKENS
+                )
+            else:
+                raise ValueError(f"Unknown chunk strategy: {settings.CHUNK_STRATEGY}")
+        return cls._code_chunker
\ No newline at end of file
@@ -1,25 +1,78 @@
 import os
-from typing import List
+from typing import Any, Dict, List, Optional
 import logging
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from config.settings import settings
+from services.embedding_cache import EmbeddingCache
+from services.hashing_embeddings import HashingEmbeddings
+from services.metrics import metrics
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of model tokens in a text.
+
+    Uses the common ~4 characters per token heuristic, which is close enough
+    for sizing batches without calling a tokenizer.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count (at least 1)
+    """
+    return max(1, len(text) // 4)
+
 
 class VectorEmbeddingService:
     """Service for generating embeddings using Google Generative AI.
     
     This class handles the integration with Google's Generative AI for generating
-    text embeddings from code snippets and related metadata.
+    text embeddings from code snippets and related metadata. The offline
+    ``hashing`` provider can be selected instead for benchmarks and tests.
     """
     
-    def __init__(self):
-        """Initialize the embedding service with Google Generative AI."""
+    MODEL_NAME = "models/gemini-embedding-exp-03-07"
+    TASK_TYPE = "retrieval_document"
+    QUERY_TASK_TYPE = "retrieval_query"
+    PROVIDERS = ("google", "hashing")
+
+    def __init__(self, cache: Optional[EmbeddingCache] = None, provider: Optional[str] = None):
+        """Initialize the embedding service with the selected provider.
+        
+        Args:
+            cache: Optional persistent cache consulted before calling the model
+            provider: Embedding provider, ``google`` or ``hashing``
+                (defaults to settings.EMBEDDING_PROVIDER)
+        
+        Raises:
+            ValueError: If the provider is unknown
+        """
         self.logger = logging.getLogger(__name__)
+        self.cache = cache
+        self.provider = provider or settings.EMBEDDING_PROVIDER
+        self.task_type = self.TASK_TYPE
+        if self.provider not in self.PROVIDERS:
+            raise ValueError(f"Unknown embedding provider: {self.provider}")
         try:
+            if self.provider == "hashing":
+                # Both task types share one model: hashing has no query/document asymmetry
+                self.model_name = f"hashing-{settings.VECTOR_SIZE}"
+                self.model = HashingEmbeddings(size=settings.VECTOR_SIZE)
+                self.query_model = self.model
+                self.logger.info("Using offline hashing embedding provider")
+                return
+
+            self.model_name = self.MODEL_NAME
             self.logger.debug("Initializing Google Generative AI embedding service...")
             self.model = GoogleGenerativeAIEmbeddings(
-                model="models/gemini-embedding-exp-03-07",
+                model=self.model_name,
+                google_api_key=settings.GOOGLE_API_KEY,
+                task_type=self.task_type,
+            )
+            self.query_model = GoogleGenerativeAIEmbeddings(
+                model=self.model_name,
                 google_api_key=settings.GOOGLE_API_KEY,
-                task_type="retrieval_document",
+                task_type=self.QUERY_TASK_TYPE,
             )
             self.logger.info("Successfully initialized Google Generative AI embedding service")
         except Exception as e:
@@ -56,6 +109,85 @@ class VectorEmbeddingService:
         self.logger.debug(f"Finished preprocessing. Final length: {len(processed_code.split(chr(10)))}")
         return processed_code
 
+    def _cache_key(self, processed_text: str, task_type: Optional[str] = None) -> str:
+        """Build the cache key of a preprocessed text for this model and task type."""
+        return EmbeddingCache.make_key(self.model_name, task_type or self.task_type, processed_text)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get embedding cache counters.
+        
+        Returns:
+            Cache hit/miss counters, or an empty dict when caching is disabled
+        """
+        return self.cache.stats() if self.cache is not None else {}
+
+    async def warm_up(self) -> bool:
+        """Send a tiny request to the model to open its connection and verify credentials.
+        
+        The cache is bypassed so the request always reaches the model.
+        
+        Returns:
+            bool: True if the model answered, False otherwise
+        """
+        try:
+            await self.model.aembed_query("warm up")
+            self.logger.info("Embedding model warmed up")
+            return True
+        except Exception as e:
+            self.logger.error(f"Embedding model warm-up failed: {str(e)}")
+            return False
+
+    def close(self) -> None:
+        """Release the resources held by the service."""
+        if self.cache is not None:
+            self.cache.close()
+
+    async def _embed_single(self, model: Any, task_type: str, text: str) -> List[float]:
+        """Embed one text with a model, going through the cache when enabled.
+        
+        Args:
+            model: Embedding model configured for ``task_type``
+            task_type: Task type of the model, part of the cache key
+            text: Text to generate embedding for
+            
+        Returns:
+            List of embedding values
+        """
+        self.logger.debug(f"Generating embedding for text of length: {len(text)}")
+        processed_text = self._preprocess_code(text)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(processed_text, task_type)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                metrics.inc("embedding_cache_hits_total")
+                return cached
+            metrics.inc("embedding_cache_misses_total")
+        
+        with metrics.timer("embedding_request_seconds", task_type=task_type):
+            embedding = await model.aembed_query(processed_text)
+        metrics.inc("embedding_texts_total", task_type=task_type)
+        metrics.inc("embedding_tokens_total", estimate_tokens(processed_text), task_type=task_type)
+        self.logger.debug(f"Generated embedding of dimension: {len(embedding)}")
+
+        if cache_key is not None:
+            self.cache.put(cache_key, embedding)
+        
+        return embedding
+
+    async def _embed_documents(self, model: Any, task_type: str, processed_texts: List[str]) -> List[List[float]]:
+        """Send one batch request to a model and record its metrics."""
+        with metrics.timer("embedding_request_seconds", task_type=task_type):
+            embeddings = await model.aembed_documents(processed_texts)
+        metrics.inc("embedding_texts_total", len(processed_texts), task_type=task_type)
+        metrics.inc(
+            "embedding_tokens_total",
+            sum(estimate_tokens(text) for text in processed_texts),
+            task_type=task_type
+        )
+        return embeddings
+
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text snippet.
         
@@ -66,18 +198,68 @@ class VectorEmbeddingService:
             List of embedding values
         """
         try:
-            self.logger.debug(f"Generating embedding for text of length: {len(text)}")
-            processed_text = self._preprocess_code(text)
+            return await self._embed_single(self.model, self.task_type, text)
             
-            embedding = await self.model.aembed_query(processed_text)
-            self.logger.debug(f"Generated embedding of dimension: {len(embedding)}")
+        except Exception as e:
+            self.logger.error(f"Error generating embedding: {str(e)}")
+            raise
+
+    async def generate_query_embedding(self, question: str) -> List[float]:
+        """Generate embedding for a search question with the retrieval_query task type.
+        
+        Args:
+            question: Natural language question
             
-            return embedding
+        Returns:
+            List of embedding values
+        """
+        try:
+            return await self._embed_single(self.query_model, self.QUERY_TASK_TYPE, question)
             
         except Exception as e:
-            self.logger.error(f"Error generating embedding: {str(e)}")
+            self.logger.error(f"Error generating query embedding: {str(e)}")
             raise
 
+    async def _embed_batch(self, model: Any, task_type: str, texts: List[str]) -> List[List[float]]:
+        """Embed texts in one request to a model, going through the cache when enabled.
+        
+        Args:
+            model: Embedding model configured for ``task_type``
+            task_type: Task type of the model, part of the cache key
+            texts: Texts to generate embeddings for
+            
+        Returns:
+            List of embedding vectors
+        """
+        self.logger.debug(f"Processing batch of {len(texts)} texts")
+        processed_texts = [self._preprocess_code(text) for text in texts]
+
+        if self.cache is None:
+            embeddings = await self._embed_documents(model, task_type, processed_texts)
+            self.logger.info(f"Generated {len(embeddings)} embeddings")
+            return embeddings
+
+        # Only send texts missing from the cache, each distinct text once
+        keys = [self._cache_key(processed_text, task_type) for processed_text in processed_texts]
+        found = self.cache.get_many(keys)
+        missing: Dict[str, str] = {}
+        for key, processed_text in zip(keys, processed_texts):
+            if key not in found:
+                missing.setdefault(key, processed_text)
+
+        metrics.inc("embedding_cache_hits_total", len(texts) - len(missing))
+        metrics.inc("embedding_cache_misses_total", len(missing))
+        if missing:
+            generated = await self._embed_documents(model, task_type, list(missing.values()))
+            new_items = list(zip(missing.keys(), generated))
+            self.cache.put_many(new_items)
+            found.update(new_items)
+        self.logger.info(
+            f"Generated {len(missing)} embeddings, {len(texts) - len(missing)} served from cache"
+        )
+
+        return [found[key] for key in keys]
+
     async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts in batch.
         
@@ -88,14 +270,26 @@ class VectorEmbeddingService:
             List of embedding vectors
         """
         try:
-            self.logger.debug(f"Processing batch of {len(texts)} texts")
-            processed_texts = [self._preprocess_code(text) for text in texts]
+            return await self._embed_batch(self.model, self.task_type, texts)
             
-            embeddings = await self.model.aembed_documents(processed_texts)
-            self.logger.info(f"Generated {len(embeddings)} embeddings")
+        except Exception as e:
+            self.logger.error(f"Error generating batch embeddings: {str(e)}")
+            raise
+
+    async def generate_query_embeddings_batch(self, questions: List[str]) -> List[List[float]]:
+        """Generate embeddings for several search questions in one request.
+        
+        Uses the retrieval_query task type, like generate_query_embedding.
+        
+        Args:
+            questions: Natural language questions
             
-            return embeddings
+        Returns:
+            List of embedding vectors, one per question
+        """
+        try:
+            return await self._embed_batch(self.query_model, self.QUERY_TASK_TYPE, questions)
             
         except Exception as e:
-            self.logger.error(f"Error generating batch embeddings: {str(e)}")
-            raise
\ No newline at end of file
+            self.logger.error(f"Error generating batch query embeddings: {str(e)}")
+            raise
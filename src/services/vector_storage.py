@@ -1,54 +1,287 @@
-from typing import List, Dict, Any, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait as wait_futures
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple, Union
 import logging
+import math
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams, PointStruct
 
+from services.metrics import metrics
+from services.vector_storage_backend import VectorStorageBackend, truncate_embeddings
 from type_definitions.code_types import CodeVectorMetadata
+from type_definitions.storage_types import CollectionOptions, SearchFilter, SearchOptions
 
-class VectorStorageService:
-    """Service for managing vector storage operations using Qdrant."""
+class VectorStorageService(VectorStorageBackend):
+    """Service for managing vector storage operations using Qdrant.
 
-    def __init__(self, host: str, port: int):
+    A collection created with truncated dimensions and full-vector reranking
+    holds two named vectors per point: the truncated ``coarse`` vector,
+    indexed and searched first, and the ``full`` vector, kept on disk without
+    an index and only scored for the coarse candidates.
+
+    In ``shard`` tenancy, collections use Qdrant's custom sharding with one
+    shard key per project: points are written to and searched in their
+    project's shard only, and deleting a project drops its shard.
+    """
+
+    COARSE_VECTOR = "coarse"
+    FULL_VECTOR = "full"
+    # Keyword-indexed payload fields, so filtered searches and project deletes
+    # look up their points instead of scanning the whole collection
+    PAYLOAD_INDEXES = ("project_name", "package", "class_name", "file_path", "package_path", "class_path")
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        grpc_port: Optional[int] = None,
+        prefer_grpc: bool = False,
+        upsert_batch_size: int = 256,
+        upsert_workers: int = 4,
+        collection_options: Optional[CollectionOptions] = None,
+        search_options: Optional[SearchOptions] = None,
+        tenancy: str = "shared"
+    ):
         """Initialize the vector storage service.
         
         Args:
             host (str): Qdrant server host
             port (int): Qdrant server port
+            grpc_port (Optional[int]): Qdrant gRPC port
+            prefer_grpc (bool): Use gRPC instead of REST for data operations
+            upsert_batch_size (int): Number of points sent per upsert request
+            upsert_workers (int): Number of upsert requests sent in parallel
+            collection_options (Optional[CollectionOptions]): Layout of collections created without options
+            search_options (Optional[SearchOptions]): Knobs of searches run without options
+            tenancy (str): ``shard`` to shard collections by project, any other mode
+                keeps every project in the collection it is given
         """
-        self.client = QdrantClient(host=host, port=port)
+        client_options = {"host": host, "port": port, "prefer_grpc": prefer_grpc}
+        if grpc_port:
+            client_options["grpc_port"] = int(grpc_port)
+        self.client = QdrantClient(**client_options)
+        self.upsert_batch_size = max(1, int(upsert_batch_size))
+        self.upsert_workers = max(1, int(upsert_workers))
+        self.collection_options = collection_options or CollectionOptions()
+        self.search_options = search_options or SearchOptions()
+        # Collection name -> (size of the searched vectors, whether full vectors are stored for reranking)
+        self._layouts: Dict[str, Tuple[int, bool]] = {}
+        self.sharded = tenancy == "shard"
+        # (collection name, project name) pairs whose shard key exists
+        self._shard_keys: Set[Tuple[str, str]] = set()
         self.logger = logging.getLogger(__name__)
 
-    def create_collection(self, collection_name: str, vector_size: int = 768) -> bool:
+    def create_collection(
+        self,
+        collection_name: str,
+        vector_size: int = 768,
+        options: Optional[CollectionOptions] = None
+    ) -> bool:
         """Create a new collection for storing vectors.
         
         Args:
             collection_name (str): Name of the collection
             vector_size (int): Size of the vectors to be stored
+            options (Optional[CollectionOptions]): Quantization, on-disk and HNSW layout,
+                defaults to the service's collection options
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            self.logger.debug(f"Creating collection {collection_name} with vector size {vector_size}")
+            options = options or self.collection_options
+            self.logger.debug(f"Creating collection {collection_name} with vector size {vector_size} and {options}")
+            size = min(options.dimensions or vector_size, vector_size)
+            two_stage = options.rerank_full_vectors and size < vector_size
+            quantization_config = self._quantization_config(options)
+            vectors_config = VectorParams(
+                size=size,
+                distance=Distance.COSINE,
+                on_disk=options.on_disk_vectors,
+                quantization_config=quantization_config if two_stage else None
+            )
+            if two_stage:
+                # Full vectors are only scored for coarse candidates, so they need no HNSW graph
+                vectors_config = {
+                    self.COARSE_VECTOR: vectors_config,
+                    self.FULL_VECTOR: VectorParams(
+                        size=vector_size,
+                        distance=Distance.COSINE,
+                        on_disk=True,
+                        hnsw_config=models.HnswConfigDiff(m=0)
+                    ),
+                }
+            sharding = {"sharding_method": models.ShardingMethod.CUSTOM} if self.sharded else {}
             self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=vector_size,
-                    distance=Distance.COSINE
-                )
+                vectors_config=vectors_config,
+                hnsw_config=self._hnsw_config(options),
+                quantization_config=None if two_stage else quantization_config,
+                on_disk_payload=options.on_disk_payload,
+                **sharding
             )
+            self._layouts[collection_name] = (size, two_stage)
             self.logger.info(f"Collection {collection_name} created successfully")
-            return True
+            return self.ensure_payload_indexes(collection_name)
         except Exception as e:
             self.logger.error(f"Failed to create collection {collection_name}: {str(e)}")
             return False
 
+    def ensure_payload_indexes(self, collection_name: str) -> bool:
+        """Create the keyword payload indexes a collection is missing.
+        
+        Args:
+            collection_name (str): Name of the collection
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            existing = self.client.get_collection(collection_name).payload_schema or {}
+            for field_name in self.PAYLOAD_INDEXES:
+                if field_name in existing:
+                    continue
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                    wait=True
+                )
+                self.logger.info(f"Created payload index on {field_name} in collection {collection_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to create payload indexes in collection {collection_name}: {str(e)}")
+            return False
+
+    def check_tenancy(self, collection_name: str) -> bool:
+        """Check that a collection is sharded by project when shard tenancy is configured.
+        
+        Args:
+            collection_name (str): Name of the collection
+            
+        Returns:
+            bool: True if the collection can be used, False otherwise
+        """
+        if not self.sharded:
+            return True
+        try:
+            sharding_method = self.client.get_collection(collection_name).config.params.sharding_method
+        except Exception as e:
+            self.logger.error(f"Failed to read sharding of collection {collection_name}: {str(e)}")
+            return False
+        if sharding_method != models.ShardingMethod.CUSTOM:
+            self.logger.error(
+                f"Collection {collection_name} was not created with custom sharding; "
+                f"recreate it or change VECTOR_TENANCY"
+            )
+            return False
+        return True
+
+    @staticmethod
+    def _hnsw_config(options: CollectionOptions) -> Optional[models.HnswConfigDiff]:
+        """Build the HNSW parameters of a collection, None to keep the server defaults."""
+        if options.hnsw_m is None and options.hnsw_ef_construct is None:
+            return None
+        return models.HnswConfigDiff(m=options.hnsw_m, ef_construct=options.hnsw_ef_construct)
+
+    @staticmethod
+    def _quantization_config(options: CollectionOptions) -> Optional[models.QuantizationConfig]:
+        """Build the quantization of a collection, None to store full-precision vectors only."""
+        if options.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=options.quantization_always_ram
+                )
+            )
+        if options.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=options.quantization_always_ram)
+            )
+        return None
+
+    def _search_params(self, search_options: Optional[SearchOptions]) -> models.SearchParams:
+        """Build the search parameters of a request from the given or default options."""
+        options = search_options or self.search_options
+        return models.SearchParams(
+            hnsw_ef=options.hnsw_ef,
+            exact=options.exact,
+            quantization=models.QuantizationSearchParams(
+                rescore=options.rescore,
+                oversampling=options.oversampling
+            )
+        )
+
+    def _layout(self, collection_name: str) -> Tuple[int, bool]:
+        """Get the size of a collection's searched vectors and whether it stores full vectors for reranking."""
+        layout = self._layouts.get(collection_name)
+        if layout is None:
+            vectors = self.client.get_collection(collection_name).config.params.vectors
+            if isinstance(vectors, dict):
+                layout = (vectors[self.COARSE_VECTOR].size, True)
+            else:
+                layout = (vectors.size, False)
+            self._layouts[collection_name] = layout
+        return layout
+
+    @staticmethod
+    def _fit(vectors: List[List[float]], size: int) -> List[List[float]]:
+        """Truncate embeddings longer than a collection's vectors, leaving the others untouched."""
+        if all(len(vector) <= size for vector in vectors):
+            return vectors
+        return truncate_embeddings(np.asarray(vectors), size).tolist()
+
+    def _point_vectors(self, layout: Tuple[int, bool], vectors: List[List[float]]) -> List[Any]:
+        """Build the stored vectors of points for a collection layout."""
+        size, two_stage = layout
+        coarse = self._fit(vectors, size)
+        if not two_stage:
+            return coarse
+        return [
+            {self.COARSE_VECTOR: coarse_vector, self.FULL_VECTOR: list(vector)}
+            for coarse_vector, vector in zip(coarse, vectors)
+        ]
+
+    def _ensure_shard_key(self, collection_name: str, project_name: str) -> None:
+        """Create the shard of a project the first time points are written to it."""
+        if (collection_name, project_name) in self._shard_keys:
+            return
+        try:
+            self.client.create_shard_key(collection_name=collection_name, shard_key=project_name)
+            self.logger.info(f"Created shard {project_name} in collection {collection_name}")
+        except Exception as e:
+            # Created earlier, by this or another process; anything else fails the write
+            if "already exists" not in str(e).lower():
+                raise
+            self.logger.debug(f"Shard {project_name} already exists in collection {collection_name}")
+        self._shard_keys.add((collection_name, project_name))
+
+    def _shard_groups(
+        self,
+        collection_name: str,
+        points: List[PointStruct]
+    ) -> Iterator[Tuple[Dict[str, Any], List[PointStruct]]]:
+        """Split points by project shard, with the shard selector of their request."""
+        if not self.sharded:
+            yield {}, points
+            return
+        groups: Dict[str, List[PointStruct]] = {}
+        for point in points:
+            groups.setdefault(point.payload["project_name"], []).append(point)
+        for project_name, group in groups.items():
+            self._ensure_shard_key(collection_name, project_name)
+            yield {"shard_key_selector": project_name}, group
+
     def store_vectors(
         self,
         collection_name: str,
         vectors: List[List[float]],
-        metadata_list: List[CodeVectorMetadata]
+        metadata_list: List[CodeVectorMetadata],
+        ids: Optional[List[Union[int, str]]] = None,
+        wait: bool = True
     ) -> bool:
         """Store vectors with their metadata in the specified collection.
         
@@ -56,37 +289,211 @@ class VectorStorageService:
             collection_name (str): Name of the collection
             vectors (List[List[float]]): List of vectors to store
             metadata_list (List[CodeVectorMetadata]): List of metadata for each vector
+            ids (Optional[List[Union[int, str]]]): Point IDs for each vector, defaults to each metadata's point_id()
+            wait (bool): Wait until every point is applied before returning
             
         Returns:
             bool: True if successful, False otherwise
         """
+        if ids is None:
+            ids = [metadata.point_id() for metadata in metadata_list]
         try:
-            self.logger.debug(f"Storing vectors in collection {collection_name}")
-            points = [
+            stored = self.upsert_stream(collection_name, zip(ids, vectors, metadata_list), wait=wait)
+            self.logger.info(f"{stored} vectors stored in collection {collection_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to store vectors in collection {collection_name}: {str(e)}")
+            return False
+
+    def _iter_point_chunks(
+        self,
+        records: Iterable[Tuple[Union[int, str], List[float], CodeVectorMetadata]],
+        layout: Tuple[int, bool]
+    ) -> Iterator[List[PointStruct]]:
+        """Build points lazily, one upsert-sized chunk at a time.
+        
+        Args:
+            records (Iterable[Tuple[Union[int, str], List[float], CodeVectorMetadata]]): Point ID, vector and metadata triples
+            layout (Tuple[int, bool]): Layout of the target collection
+            
+        Yields:
+            List[PointStruct]: Chunks of at most ``upsert_batch_size`` points
+        """
+        iterator = iter(records)
+        while True:
+            batch = list(islice(iterator, self.upsert_batch_size))
+            if not batch:
+                return
+            vectors = self._point_vectors(layout, [vector for _, vector, _ in batch])
+            yield [
                 PointStruct(
-                    id=i,
+                    id=point_id,
                     vector=vector,
-                    payload=metadata.model_dump()
+                    payload=metadata.payload()
                 )
-                for i, (vector, metadata) in enumerate(zip(vectors, metadata_list))
+                for (point_id, _, metadata), vector in zip(batch, vectors)
             ]
+
+    def upsert_stream(
+        self,
+        collection_name: str,
+        records: Iterable[Tuple[Union[int, str], List[float], CodeVectorMetadata]],
+        wait: bool = True
+    ) -> int:
+        """Upsert points in chunks using parallel workers.
+        
+        Chunks are sent without waiting for them to be applied, with a bounded
+        number of requests in flight so memory stays flat. When ``wait`` is
+        set, the last chunk is sent with ``wait=True`` once all others are
+        acknowledged; Qdrant applies updates in order, so its completion means
+        every earlier chunk is applied too.
+        
+        Args:
+            collection_name (str): Name of the collection
+            records (Iterable[Tuple[Union[int, str], List[float], CodeVectorMetadata]]): Point ID, vector and metadata triples
+            wait (bool): Wait until every point is applied before returning
             
-            self.client.upsert(
-                collection_name=collection_name,
-                points=points
-            )
-            self.logger.info(f"Vectors stored in collection {collection_name}")
+        Returns:
+            int: Number of points stored
+        
+        Raises:
+            Exception: If any upsert request fails
+        """
+        stored = 0
+        pending: Optional[List[PointStruct]] = None
+        in_flight: Set[Future] = set()
+        max_in_flight = self.upsert_workers * 2
+
+        def upsert(points: List[PointStruct], wait_for_result: bool) -> None:
+            with metrics.timer("vector_storage_request_seconds", operation="upsert"):
+                for shard, shard_points in self._shard_groups(collection_name, points):
+                    self.client.upsert(
+                        collection_name=collection_name,
+                        points=shard_points,
+                        wait=wait_for_result,
+                        **shard
+                    )
+            metrics.inc("vector_points_upserted_total", len(points))
+
+        with ThreadPoolExecutor(max_workers=self.upsert_workers) as executor:
+            for chunk in self._iter_point_chunks(records, self._layout(collection_name)):
+                if pending is not None:
+                    in_flight.add(executor.submit(upsert, pending, False))
+                    stored += len(pending)
+                pending = chunk
+
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait_futures(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+            for future in in_flight:
+                future.result()
+
+        if pending is not None:
+            upsert(pending, wait)
+            stored += len(pending)
+
+        self.logger.debug(f"Upserted {stored} points into collection {collection_name}")
+        return stored
+
+    def update_payloads(
+        self,
+        collection_name: str,
+        ids: List[Union[int, str]],
+        metadata_list: List[CodeVectorMetadata],
+        wait: bool = True
+    ) -> bool:
+        """Replace the payloads of existing points, keeping their vectors.
+        
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points to update
+            metadata_list (List[CodeVectorMetadata]): New metadata for each point
+            wait (bool): Wait until every payload is applied before returning
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not ids:
+            return True
+        try:
+            operations = [
+                models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(
+                        payload=metadata.payload(),
+                        points=[point_id],
+                        shard_key=metadata.project_name if self.sharded else None
+                    )
+                )
+                for point_id, metadata in zip(ids, metadata_list)
+            ]
+            with metrics.timer("vector_storage_request_seconds", operation="update_payload"):
+                self.client.batch_update_points(
+                    collection_name=collection_name,
+                    update_operations=operations,
+                    wait=wait
+                )
+            self.logger.debug(f"Updated {len(ids)} payloads in collection {collection_name}")
             return True
         except Exception as e:
-            self.logger.error(f"Failed to store vectors in collection {collection_name}: {str(e)}")
+            self.logger.error(f"Failed to update payloads in collection {collection_name}: {str(e)}")
             return False
 
+    def retrieve_vectors(self, collection_name: str, ids: List[Union[int, str]]) -> Dict[Union[int, str], List[float]]:
+        """Read stored vectors by point ID.
+        
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points to read
+            
+        Returns:
+            Dict[Union[int, str], List[float]]: Vector of every point found, missing IDs are left out
+        """
+        if not ids:
+            return {}
+        try:
+            _, two_stage = self._layout(collection_name)
+            with metrics.timer("vector_storage_request_seconds", operation="retrieve"):
+                records = self.client.retrieve(
+                    collection_name=collection_name,
+                    ids=list(ids),
+                    with_payload=False,
+                    with_vectors=[self.FULL_VECTOR] if two_stage else True
+                )
+            if two_stage:
+                return {record.id: record.vector[self.FULL_VECTOR] for record in records}
+            return {record.id: record.vector for record in records}
+        except Exception as e:
+            self.logger.error(f"Failed to retrieve vectors from collection {collection_name}: {str(e)}")
+            return {}
+
+    @staticmethod
+    def _points_filter(
+        project_name: Optional[str],
+        search_filter: Optional[SearchFilter] = None
+    ) -> Optional[models.Filter]:
+        """Build the filter matching the points of a project and a search filter, None to match all."""
+        conditions = {"project_name": project_name} if project_name else {}
+        if search_filter is not None:
+            conditions.update(search_filter.conditions())
+        if not conditions:
+            return None
+        return models.Filter(
+            must=[
+                models.FieldCondition(key=key, match=models.MatchValue(value=value))
+                for key, value in conditions.items()
+            ]
+        )
+
     def search_vectors(
         self,
         collection_name: str,
         query_vector: List[float],
         limit: int = 5,
-        project_name: Optional[str] = None
+        project_name: Optional[str] = None,
+        search_options: Optional[SearchOptions] = None,
+        search_filter: Optional[SearchFilter] = None
     ) -> List[Dict[str, Any]]:
         """Search for similar vectors in the collection.
         
@@ -95,32 +502,40 @@ class VectorStorageService:
             query_vector (List[float]): Query vector to search for
             limit (int): Maximum number of results to return
             project_name (Optional[str]): Filter results by project name
+            search_options (Optional[SearchOptions]): HNSW ef, exact search and quantization
+                rescoring, defaults to the service's search options
+            search_filter (Optional[SearchFilter]): Package and class prefix conditions
             
         Returns:
             List[Dict[str, Any]]: List of search results with metadata
         """
         try:
+            size, two_stage = self._layout(collection_name)
+            if two_stage:
+                return self.search_vectors_batch(
+                    collection_name, [query_vector], limit, project_name, search_options, search_filter
+                )[0]
+
             search_params = {}
-            if project_name:
-                search_params["filter"] = models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="project_name",
-                            match=models.MatchValue(value=project_name)
-                        )
-                    ]
-                )
+            points_filter = self._points_filter(project_name, search_filter)
+            if points_filter is not None:
+                search_params["query_filter"] = points_filter
+            if self.sharded and project_name:
+                search_params["shard_key_selector"] = project_name
 
-            results = self.client.search(
-                collection_name=collection_name,
-                query_vector=query_vector,
-                limit=limit,
-                **search_params
-            )
+            with metrics.timer("vector_storage_request_seconds", operation="search"):
+                results = self.client.search(
+                    collection_name=collection_name,
+                    query_vector=self._fit([query_vector], size)[0],
+                    limit=limit,
+                    search_params=self._search_params(search_options),
+                    **search_params
+                )
             
             self.logger.debug(f"Search results: {results}")
             return [
                 {
+                    "id": hit.id,
                     "score": hit.score,
                     "metadata": hit.payload
                 }
@@ -130,9 +545,121 @@ class VectorStorageService:
             self.logger.error(f"Failed to search vectors in collection {collection_name}: {str(e)}")
             return []
 
+    def search_vectors_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        project_name: Optional[str] = None,
+        search_options: Optional[SearchOptions] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Run several similarity searches with one call to Qdrant's batch search endpoint.
+        
+        Args:
+            collection_name (str): Name of the collection
+            query_vectors (List[List[float]]): Query vectors to search for
+            limit (int): Maximum number of results per query
+            project_name (Optional[str]): Filter results by project name
+            search_options (Optional[SearchOptions]): HNSW ef, exact search and quantization
+                rescoring, defaults to the service's search options
+            search_filter (Optional[SearchFilter]): Package and class prefix conditions
+            
+        Returns:
+            List[List[Dict[str, Any]]]: Results of every query, in the order of ``query_vectors``
+        """
+        if not query_vectors:
+            return []
+        try:
+            size, two_stage = self._layout(collection_name)
+            points_filter = self._points_filter(project_name, search_filter)
+            shard_key = project_name if self.sharded and project_name else None
+            params = self._search_params(search_options)
+            coarse_vectors = self._fit(query_vectors, size)
+            if two_stage:
+                options = search_options or self.search_options
+                coarse_limit = max(limit, math.ceil(limit * options.rerank_factor))
+                coarse_vectors = [
+                    models.NamedVector(name=self.COARSE_VECTOR, vector=coarse_vector)
+                    for coarse_vector in coarse_vectors
+                ]
+            requests = [
+                models.SearchRequest(
+                    vector=coarse_vector,
+                    limit=coarse_limit if two_stage else limit,
+                    filter=points_filter,
+                    params=params,
+                    with_payload=not two_stage,
+                    shard_key=shard_key
+                )
+                for coarse_vector in coarse_vectors
+            ]
+
+            with metrics.timer("vector_storage_request_seconds", operation="search_batch"):
+                batch_results = self.client.search_batch(collection_name=collection_name, requests=requests)
+
+            if two_stage:
+                batch_results = self._rerank(collection_name, query_vectors, batch_results, limit, shard_key)
+
+            return [
+                [
+                    {
+                        "id": hit.id,
+                        "score": hit.score,
+                        "metadata": hit.payload
+                    }
+                    for hit in results
+                ]
+                for results in batch_results
+            ]
+        except Exception as e:
+            self.logger.error(f"Failed to batch search vectors in collection {collection_name}: {str(e)}")
+            return [[] for _ in query_vectors]
+
+    def _rerank(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        candidates: List[List[Any]],
+        limit: int,
+        shard_key: Optional[str] = None
+    ) -> List[List[Any]]:
+        """Score the coarse candidates of every query with the full vectors, in one batch request.
+        
+        Args:
+            collection_name (str): Name of the collection
+            query_vectors (List[List[float]]): Full query vectors
+            candidates (List[List[Any]]): Coarse hits of every query
+            limit (int): Maximum number of results per query
+            shard_key (Optional[str]): Shard the candidates were found in
+            
+        Returns:
+            List[List[Any]]: Reranked hits of every query, with payloads
+        """
+        requests = [
+            models.SearchRequest(
+                vector=models.NamedVector(name=self.FULL_VECTOR, vector=query_vector),
+                limit=limit,
+                filter=models.Filter(must=[models.HasIdCondition(has_id=[hit.id for hit in hits])]),
+                params=models.SearchParams(exact=True),
+                with_payload=True,
+                shard_key=shard_key
+            )
+            for query_vector, hits in zip(query_vectors, candidates)
+            if hits
+        ]
+        if not requests:
+            return [[] for _ in query_vectors]
+        with metrics.timer("vector_storage_request_seconds", operation="rerank"):
+            reranked = iter(self.client.search_batch(collection_name=collection_name, requests=requests))
+        return [next(reranked) if hits else [] for hits in candidates]
+
     def delete_project_vectors(self, collection_name: str, project_name: str) -> bool:
         """Delete all vectors belonging to a specific project.
         
+        In ``shard`` tenancy the project's shard is dropped as a whole, which
+        leaves the other projects' shards and their indexes untouched.
+        
         Args:
             collection_name (str): Name of the collection
             project_name (str): Name of the project to delete vectors for
@@ -140,24 +667,72 @@ class VectorStorageService:
         Returns:
             bool: True if successful, False otherwise
         """
+        if self.sharded:
+            try:
+                with metrics.timer("vector_storage_request_seconds", operation="delete_shard"):
+                    self.client.delete_shard_key(collection_name=collection_name, shard_key=project_name)
+                self._shard_keys.discard((collection_name, project_name))
+                self.logger.info(f"Shard of project {project_name} deleted")
+                return True
+            except Exception as e:
+                # No shard yet, or points stored before sharding: fall back to deleting by filter
+                self.logger.debug(f"Failed to delete shard of project {project_name}: {str(e)}")
         try:
-            self.client.delete(
-                collection_name=collection_name,
-                points_selector=models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="project_name",
-                            match=models.MatchValue(value=project_name)
-                        )
-                    ]
+            with metrics.timer("vector_storage_request_seconds", operation="delete"):
+                self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=self._points_filter(project_name)
                 )
-            )
             self.logger.info(f"Vectors deleted for project {project_name}")
             return True
         except Exception as e:
             self.logger.error(f"Failed to delete vectors for project {project_name}: {str(e)}")
             return False
 
+    def delete_points(self, collection_name: str, ids: List[Union[int, str]]) -> bool:
+        """Delete points by ID.
+        
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points to delete
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not ids:
+            return True
+        try:
+            with metrics.timer("vector_storage_request_seconds", operation="delete"):
+                self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(points=list(ids))
+                )
+            self.logger.info(f"Deleted {len(ids)} points from collection {collection_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to delete points from collection {collection_name}: {str(e)}")
+            return False
+
+    def delete_collection(self, collection_name: str) -> bool:
+        """Delete a collection with all its points.
+        
+        Args:
+            collection_name (str): Name of the collection
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with metrics.timer("vector_storage_request_seconds", operation="delete_collection"):
+                self.client.delete_collection(collection_name=collection_name)
+            self._layouts.pop(collection_name, None)
+            self._shard_keys = {key for key in self._shard_keys if key[0] != collection_name}
+            self.logger.info(f"Collection {collection_name} deleted")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to delete collection {collection_name}: {str(e)}")
+            return False
+
     def collection_exists(self, collection_name: str) -> bool:
         """Check if a collection exists.
         
@@ -172,4 +747,24 @@ class VectorStorageService:
             return any(collection.name == collection_name for collection in collections.collections)
         except Exception as e:
             self.logger.error(f"Failed to check collection existence: {str(e)}")
-            return False 
\ No newline at end of file
+            return False 
+
+    def health_check(self) -> bool:
+        """Check that the Qdrant server is reachable.
+        
+        Returns:
+            bool: True if the server answered, False otherwise
+        """
+        try:
+            self.client.get_collections()
+            return True
+        except Exception as e:
+            self.logger.error(f"Qdrant health check failed: {str(e)}")
+            return False
+
+    def close(self) -> None:
+        """Close the underlying Qdrant client."""
+        try:
+            self.client.close()
+        except Exception as e:
+            self.logger.error(f"Failed to close Qdrant client: {str(e)}")
@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from type_definitions.code_types import CodeVectorMetadata
+from type_definitions.storage_types import CollectionOptions, SearchFilter, SearchOptions
+
+
+def truncate_embeddings(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """Shorten Matryoshka embeddings to their leading dimensions.
+
+    Matryoshka-trained models such as Gemini embeddings front-load
+    information, so a prefix is itself a usable embedding once L2-normalized
+    again.
+
+    Args:
+        vectors (np.ndarray): Embeddings, one per row
+        dimensions (int): Number of leading dimensions to keep
+
+    Returns:
+        np.ndarray: Truncated and normalized float32 embeddings
+    """
+    truncated = np.asarray(vectors, dtype=np.float32)[:, :dimensions]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return truncated / np.where(norms == 0, 1, norms)
+
+
+class VectorStorageBackend(ABC):
+    """Interface implemented by every vector storage backend.
+
+    Methods report failures by returning False or an empty result and logging
+    the error, matching the behaviour callers already rely on.
+
+    Vectors longer than a collection's size are taken as Matryoshka
+    embeddings and truncated on the way in, for points and queries alike.
+    """
+
+    @abstractmethod
+    def create_collection(
+        self,
+        collection_name: str,
+        vector_size: int = 768,
+        options: Optional[CollectionOptions] = None
+    ) -> bool:
+        """Create a new collection for storing vectors.
+
+        Args:
+            collection_name (str): Name of the collection
+            vector_size (int): Size of the vectors to be stored
+            options (Optional[CollectionOptions]): Quantization, on-disk and index layout,
+                defaults to the backend's collection options
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+
+    @abstractmethod
+    def store_vectors(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        metadata_list: List[CodeVectorMetadata],
+        ids: Optional[List[Union[int, str]]] = None,
+        wait: bool = True
+    ) -> bool:
+        """Store vectors with their metadata, replacing points with the same IDs.
+
+        Args:
+            collection_name (str): Name of the collection
+            vectors (List[List[float]]): List of vectors to store
+            metadata_list (List[CodeVectorMetadata]): List of metadata for each vector
+            ids (Optional[List[Union[int, str]]]): Point IDs for each vector, defaults to each metadata's point_id()
+            wait (bool): Wait until every point is durable before returning
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+
+    @abstractmethod
+    def update_payloads(
+        self,
+        collection_name: str,
+        ids: List[Union[int, str]],
+        metadata_list: List[CodeVectorMetadata],
+        wait: bool = True
+    ) -> bool:
+        """Replace the payloads of existing points, keeping their vectors.
+
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points to update
+            metadata_list (List[CodeVectorMetadata]): New metadata for each point
+            wait (bool): Wait until every payload is durable before returning
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+
+    @abstractmethod
+    def retrieve_vectors(self, collection_name: str, ids: List[Union[int, str]]) -> Dict[Union[int, str], List[float]]:
+        """Read stored vectors by point ID.
+
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points to read
+
+        Returns:
+            Dict[Union[int, str], List[float]]: Vector of every point found, missing IDs are left out
+        """
+
+    @abstractmethod
+    def search_vectors(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 5,
+        project_name: Optional[str] = None,
+        search_options: Optional[SearchOptions] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for the most similar vectors by cosine similarity.
+
+        Args:
+            collection_name (str): Name of the collection
+            query_vector (List[float]): Query vector to search for
+            limit (int): Maximum number of results to return
+            project_name (Optional[str]): Filter results by project name
+            search_options (Optional[SearchOptions]): HNSW and quantization knobs,
+                defaults to the backend's search options
+            search_filter (Optional[SearchFilter]): Package and class prefix conditions
+
+        Returns:
+            List[Dict[str, Any]]: Results with ``id``, ``score`` and ``metadata``
+        """
+
+    @abstractmethod
+    def search_vectors_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        project_name: Optional[str] = None,
+        search_options: Optional[SearchOptions] = None,
+        search_filter: Optional[SearchFilter] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Run several similarity searches in one request.
+
+        Args:
+            collection_name (str): Name of the collection
+            query_vectors (List[List[float]]): Query vectors to search for
+            limit (int): Maximum number of results per query
+            project_name (Optional[str]): Filter results by project name
+            search_options (Optional[SearchOptions]): HNSW and quantization knobs,
+                defaults to the backend's search options
+            search_filter (Optional[SearchFilter]): Package and class prefix conditions
+
+        Returns:
+            List[List[Dict[str, Any]]]: Results of every query, in the order of ``query_vectors``
+        """
+
+    @abstractmethod
+    def delete_project_vectors(self, collection_name: str, project_name: str) -> bool:
+        """Delete all vectors belonging to a specific project.
+
+        Args:
+            collection_name (str): Name of the collection
+            project_name (str): Name of the project to delete vectors for
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+
+    @abstractmethod
+    def delete_points(self, collection_name: str, ids: List[Union[int, str]]) -> bool:
+        """Delete points by ID.
+
+        Args:
+            collection_name (str): Name of the collection
+            ids (List[Union[int, str]]): IDs of the points to delete
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+
+    def ensure_payload_indexes(self, collection_name: str) -> bool:
+        """Create the payload indexes a collection is missing, such as one created before they existed.
+
+        Backends that index payloads on their own have nothing to do.
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return True
+
+    def check_tenancy(self, collection_name: str) -> bool:
+        """Check that an existing collection is laid out for the configured tenancy.
+
+        Backends without tenancy-specific layouts accept every collection.
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            bool: True if the collection can be used, False otherwise
+        """
+        return True
+
+    @abstractmethod
+    def delete_collection(self, collection_name: str) -> bool:
+        """Delete a collection with all its points.
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+
+    @abstractmethod
+    def collection_exists(self, collection_name: str) -> bool:
+        """Check if a collection exists.
+
+        Args:
+            collection_name (str): Name of the collection to check
+
+        Returns:
+            bool: True if collection exists, False otherwise
+        """
+
+    @abstractmethod
+    def health_check(self) -> bool:
+        """Check that the backend is usable.
+
+        Returns:
+            bool: True if healthy, False otherwise
+        """
+
+    def close(self) -> None:
+        """Release the resources held by the backend."""
@@ -13,5 +13,33 @@ from .code_types import (
     FieldInfo,
     ParameterInfo
 )
+from .index_types import (
+    FileManifestEntry,
+    ProjectManifest,
+    ManifestChanges,
+    GitChanges,
+    RenamedFile,
+    IngestResult
+)
+from .storage_types import (
+    CollectionOptions,
+    SearchOptions,
+    SearchFilter
+)
+from .parse_records import (
+    SourceBuffer,
+    ParsedFile,
+    ClassRecord,
+    MethodRecord,
+    FieldRecord,
+    ParameterRecord,
+    ParsedCode,
+    ParsedClass,
+    ParsedMethod
+)
 
-__all__ = ['CodeMetadata', 'ProcessedCodeChunk', 'ClassInfo', 'MethodInfo', 'FieldInfo', 'ParameterInfo', 'CodeVectorMetadata'] 
\ No newline at end of file
+__all__ = ['CodeMetadata', 'ProcessedCodeChunk', 'ClassInfo', 'MethodInfo', 'FieldInfo', 'ParameterInfo', 'CodeVectorMetadata',
+           'FileManifestEntry', 'ProjectManifest', 'ManifestChanges', 'GitChanges', 'RenamedFile', 'IngestResult',
+           'CollectionOptions', 'SearchOptions', 'SearchFilter',
+           'SourceBuffer', 'ParsedFile', 'ClassRecord', 'MethodRecord', 'FieldRecord', 'ParameterRecord',
+           'ParsedCode', 'ParsedClass', 'ParsedMethod'] 
\ No newline at end of file
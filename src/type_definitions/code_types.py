@@ -1,10 +1,28 @@
-from typing import List
+import uuid
+from typing import Any, ClassVar, Dict, List, Set
 from pydantic import BaseModel
 
+# Namespace of the deterministic point IDs, must never change once vectors are stored
+POINT_ID_NAMESPACE = uuid.UUID("6f0b7a0e-5d1c-5b8e-9a43-2f6c1d4e8b17")
+
+def name_prefixes(name: str) -> List[str]:
+    """Get every enclosing name of a dotted name, then the name itself.
+    
+    ``com.example.user`` gives ``com``, ``com.example`` and ``com.example.user``;
+    nested and anonymous classes (``Outer.Inner``, ``Outer$1``) give their
+    enclosing classes the same way.
+    """
+    if not name:
+        return []
+    prefixes = [name[:index] for index, char in enumerate(name) if char in ".$" and index > 0]
+    prefixes.append(name)
+    return prefixes
+
+
 class BaseCode(BaseModel):
     """Base class for code elements."""
     name: str
-    type: str = ""  # class, method, field
+    type: str = ""  # class, interface, enum, record, annotation, anonymous, method, constructor, or a field's type
     start_line: int = 0
     end_line: int = 0
     body: str = ""
@@ -20,16 +38,19 @@ class MethodInfo(BaseCode):
     return_type: str = ""
     parameters: List[ParameterInfo] = []
     modifiers: List[str] = []
+    annotations: List[str] = []
 
 
 class FieldInfo(BaseCode):
     """Type definition for field information."""
     modifiers: List[str] = []
+    annotations: List[str] = []
 
 
 class ClassInfo(BaseCode):
     """Type definition for class information."""
     modifiers: List[str] = []
+    annotations: List[str] = []
     fields: List[FieldInfo] = []
     methods: List[MethodInfo] = []
 
@@ -44,18 +65,48 @@ class CodeMetadata(BaseModel):
     size: int = 0
 
 class CodeVectorMetadata(BaseModel):
-    """Metadata for code vectors stored in Qdrant."""
+    """Metadata for code vectors stored in Qdrant.
+    
+    Only the fields in ``PAYLOAD_FIELDS`` are stored with each vector; the
+    chunk text is read back from the source tree or the content store.
+    """
+    project_name: str = ""
     file_path: str
+    chunk_id: str = "file"
+    type: str = "file"  # file, class, method
     package: str = ""
     class_name: str = ""
+    method_name: str = ""
     methods_name: List[str] = []
     fields_name: List[str] = []
+    start_line: int = 0  # 1-based, inclusive
+    end_line: int = 0
+
+    PAYLOAD_FIELDS: ClassVar[Set[str]] = {
+        "project_name", "file_path", "chunk_id", "type", "package", "class_name", "method_name",
+        "start_line", "end_line"
+    }
+
+    def payload(self) -> Dict[str, Any]:
+        """Payload stored with the vector: the filtered and displayed fields, file path and line range."""
+        payload = self.model_dump(include=self.PAYLOAD_FIELDS)
+        # Keyword-indexed, so package and class prefix filters are exact matches
+        payload["package_path"] = name_prefixes(self.package)
+        payload["class_path"] = name_prefixes(self.class_name)
+        return payload
+
+    def point_id(self) -> str:
+        """Deterministic point ID derived from project, file path and chunk identity."""
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{self.project_name}\0{self.file_path}\0{self.chunk_id}"))
 
     @classmethod
-    def from_code_metadata(cls, code_metadata: CodeMetadata) -> "CodeVectorMetadata":
+    def from_code_metadata(cls, code_metadata: CodeMetadata, project_name: str = "") -> "CodeVectorMetadata":
         result = cls(
+            project_name=project_name,
             file_path=code_metadata.file_path,
             package=code_metadata.package,
+            start_line=1,
+            end_line=code_metadata.size,
         )
 
         if code_metadata.classes:
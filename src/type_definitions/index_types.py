@@ -0,0 +1,65 @@
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class FileManifestEntry(BaseModel):
+    """Indexed state of a single source file."""
+    content_hash: str
+    mtime: float = 0.0
+    size: int = 0
+    point_ids: List[str] = []
+
+
+class ProjectManifest(BaseModel):
+    """Indexed state of a whole project, keyed by file path."""
+    project_name: str
+    root_path: str = ""
+    revision: str = ""  # Git commit indexed by the last revision-based update
+    settings_fingerprint: str = ""  # Chunking and embedding settings the files were indexed with
+    files: Dict[str, FileManifestEntry] = {}
+
+    def point_ids_for(self, file_paths: List[str]) -> List[str]:
+        """Collect the point IDs stored for the given files."""
+        return [
+            point_id
+            for file_path in file_paths
+            if file_path in self.files
+            for point_id in self.files[file_path].point_ids
+        ]
+
+
+class ManifestChanges(BaseModel):
+    """Files grouped by how they changed since the last indexing run."""
+    added: List[str] = []
+    modified: List[str] = []
+    removed: List[str] = []
+    unchanged: List[str] = []
+
+    @property
+    def changed(self) -> List[str]:
+        """Files that need to be parsed and embedded again."""
+        return self.added + self.modified
+
+
+class RenamedFile(BaseModel):
+    """File moved between two revisions."""
+    old_path: str
+    new_path: str
+
+
+class GitChanges(BaseModel):
+    """Files changed between two git revisions."""
+    added: List[str] = []
+    modified: List[str] = []
+    deleted: List[str] = []
+    renamed: List[RenamedFile] = []
+
+
+class IngestResult(BaseModel):
+    """Outcome of one run of the ingest pipeline."""
+    files_parsed: int = 0
+    chunks: int = 0
+    vectors_stored: int = 0
+    point_ids_by_file: Dict[str, List[str]] = {}
+    elapsed_seconds: float = 0.0
+    first_upsert_seconds: float = 0.0
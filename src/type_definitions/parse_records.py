@@ -0,0 +1,178 @@
+"""Compact parse records produced by the Java parser.
+
+Records keep byte offsets into one shared source buffer and decode source
+text only when it is read, instead of copying a decoded ``body`` string into
+every node. Names, types and modifiers are short and decoded eagerly. The
+records expose the same attributes as the pydantic models in code_types, so
+chunkers accept either, and ``ParsedFile.to_code_metadata`` produces the
+pydantic models at the API boundary.
+"""
+
+from typing import List, Optional, Union
+
+from .code_types import ClassInfo, CodeMetadata, FieldInfo, MethodInfo, ParameterInfo
+
+
+class SourceBuffer:
+    """Raw bytes of a source file, decoded on demand."""
+
+    __slots__ = ("data", "_text")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """The whole file as text, decoded once."""
+        if self._text is None:
+            self._text = self.data.decode("utf-8")
+        return self._text
+
+    def slice(self, start_byte: int, end_byte: int) -> str:
+        """Decode a byte range of the file."""
+        return self.data[start_byte:end_byte].decode("utf-8")
+
+    def __getstate__(self):
+        # The decoded text is a cache and is not worth sending between processes
+        return (self.data,)
+
+    def __setstate__(self, state):
+        self.data, = state
+        self._text = None
+
+
+class SourceSpan:
+    """Node of the parse tree, located by byte offsets and 0-based lines."""
+
+    __slots__ = ("source", "start_byte", "end_byte", "start_line", "end_line")
+
+    def __init__(self, source: SourceBuffer, start_byte: int, end_byte: int, start_line: int, end_line: int):
+        self.source = source
+        self.start_byte = start_byte
+        self.end_byte = end_byte
+        self.start_line = start_line
+        self.end_line = end_line
+
+    @property
+    def body(self) -> str:
+        """Source text of the node, decoded on every access."""
+        return self.source.slice(self.start_byte, self.end_byte)
+
+    def __str__(self):
+        return self.body
+
+
+class ParameterRecord(SourceSpan):
+    """Method parameter."""
+
+    __slots__ = ("name", "type")
+
+    def __init__(self, source: SourceBuffer, start_byte: int, end_byte: int, start_line: int, end_line: int,
+                 name: str, type: str):
+        super().__init__(source, start_byte, end_byte, start_line, end_line)
+        self.name = name
+        self.type = type
+
+    def to_model(self) -> ParameterInfo:
+        return ParameterInfo(name=self.name, type=self.type, start_line=self.start_line,
+                             end_line=self.end_line, body=self.body)
+
+
+class MethodRecord(SourceSpan):
+    """Method or constructor declaration."""
+
+    __slots__ = ("name", "type", "return_type", "parameters", "modifiers", "annotations")
+
+    def __init__(self, source: SourceBuffer, start_byte: int, end_byte: int, start_line: int, end_line: int):
+        super().__init__(source, start_byte, end_byte, start_line, end_line)
+        self.name = ""
+        self.type = "method"
+        self.return_type = ""
+        self.parameters: List[ParameterRecord] = []
+        self.modifiers: List[str] = []
+        self.annotations: List[str] = []
+
+    def to_model(self) -> MethodInfo:
+        return MethodInfo(name=self.name, type=self.type, return_type=self.return_type,
+                          parameters=[parameter.to_model() for parameter in self.parameters],
+                          modifiers=self.modifiers, annotations=self.annotations,
+                          start_line=self.start_line, end_line=self.end_line, body=self.body)
+
+
+class FieldRecord(SourceSpan):
+    """Field, constant, enum constant or record component declaration."""
+
+    __slots__ = ("name", "type", "modifiers", "annotations")
+
+    def __init__(self, source: SourceBuffer, start_byte: int, end_byte: int, start_line: int, end_line: int):
+        super().__init__(source, start_byte, end_byte, start_line, end_line)
+        self.name = ""
+        self.type = "field"
+        self.modifiers: List[str] = []
+        self.annotations: List[str] = []
+
+    def to_model(self) -> FieldInfo:
+        return FieldInfo(name=self.name, type=self.type, modifiers=self.modifiers,
+                         annotations=self.annotations, start_line=self.start_line, end_line=self.end_line, body=self.body)
+
+
+class ClassRecord(SourceSpan):
+    """Class, interface, enum, record, annotation type or anonymous class declaration."""
+
+    __slots__ = ("name", "type", "modifiers", "annotations", "fields", "methods")
+
+    def __init__(self, source: SourceBuffer, start_byte: int, end_byte: int, start_line: int, end_line: int):
+        super().__init__(source, start_byte, end_byte, start_line, end_line)
+        self.name = ""
+        self.type = "class"
+        self.modifiers: List[str] = []
+        self.annotations: List[str] = []
+        self.fields: List[FieldRecord] = []
+        self.methods: List[MethodRecord] = []
+
+    def to_model(self) -> ClassInfo:
+        return ClassInfo(name=self.name, type=self.type, modifiers=self.modifiers, annotations=self.annotations,
+                         fields=[field.to_model() for field in self.fields],
+                         methods=[method.to_model() for method in self.methods],
+                         start_line=self.start_line, end_line=self.end_line, body=self.body)
+
+
+class ParsedFile:
+    """Parsed Java file sharing one source buffer between all its records."""
+
+    __slots__ = ("file_path", "source", "package", "imports", "classes")
+
+    def __init__(self, file_path: str, source: SourceBuffer):
+        self.file_path = file_path
+        self.source = source
+        self.package = ""
+        self.imports: List[str] = []
+        self.classes: List[ClassRecord] = []
+
+    @property
+    def content(self) -> str:
+        """Whole file content."""
+        return self.source.text
+
+    @property
+    def size(self) -> int:
+        """Number of lines in the file."""
+        return len(self.source.data.splitlines())
+
+    def to_code_metadata(self) -> CodeMetadata:
+        """Convert the records into the pydantic models of the public API."""
+        return CodeMetadata(
+            file_path=self.file_path,
+            content=self.content,
+            size=self.size,
+            classes=[class_record.to_model() for class_record in self.classes],
+            imports=self.imports,
+            package=self.package
+        )
+
+
+# Anything a chunker can split: compact records or the pydantic models
+ParsedCode = Union[ParsedFile, CodeMetadata]
+ParsedClass = Union[ClassRecord, ClassInfo]
+ParsedMethod = Union[MethodRecord, MethodInfo]
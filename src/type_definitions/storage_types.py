@@ -0,0 +1,49 @@
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel, ConfigDict
+
+from .code_types import name_prefixes
+
+
+class CollectionOptions(BaseModel):
+    """Storage layout of a vector collection, fixed when it is created."""
+    quantization: Literal["none", "scalar", "binary"] = "none"
+    quantization_always_ram: bool = True  # Keep quantized vectors in RAM even when the originals are on disk
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    hnsw_m: Optional[int] = None  # Edges per node of the HNSW graph, server default when unset
+    hnsw_ef_construct: Optional[int] = None  # Candidates considered while building the graph
+    dimensions: Optional[int] = None  # Matryoshka truncation of the embeddings, full size when unset
+    rerank_full_vectors: bool = False  # Also store full vectors on disk to rerank the truncated search
+
+
+class SearchOptions(BaseModel):
+    """Speed and accuracy trade-offs of one vector search."""
+    hnsw_ef: Optional[int] = None  # Candidates explored in the HNSW graph, server default when unset
+    exact: bool = False  # Full scan of the original vectors, bypassing the index and quantization
+    rescore: bool = True  # Re-rank quantized candidates with the original vectors
+    oversampling: Optional[float] = None  # Fetch limit * oversampling quantized candidates before rescoring
+    rerank_factor: float = 4.0  # Truncated-vector candidates per result reranked with full vectors
+
+
+class SearchFilter(BaseModel):
+    """Payload conditions a search is restricted to, besides its project."""
+    model_config = ConfigDict(frozen=True)
+
+    package_prefix: str = ""  # A package and its subpackages, such as com.example.user
+    class_prefix: str = ""  # A class and its nested and anonymous classes, such as UserService
+
+    def conditions(self) -> Dict[str, str]:
+        """Get the value every set condition requires in its keyword-indexed payload field."""
+        conditions = {}
+        if self.package_prefix:
+            conditions["package_path"] = self.package_prefix
+        if self.class_prefix:
+            conditions["class_path"] = self.class_prefix
+        return conditions
+
+    def matches(self, payload: Dict[str, Any]) -> bool:
+        """Check a payload, deriving the prefix lists from its package and class name."""
+        return (
+            (not self.package_prefix or self.package_prefix in name_prefixes(payload.get("package", "")))
+            and (not self.class_prefix or self.class_prefix in name_prefixes(payload.get("class_name", "")))
+        )
@@ -2,6 +2,7 @@
 
 import os
 import sys
+import tempfile
 from pathlib import Path
 
 # 添加項目根目錄到 Python 路徑
@@ -9,4 +10,7 @@ project_root = str(Path(__file__).parent.parent)
 sys.path.insert(0, project_root)
 
 # 設置測試環境變量
-os.environ['GOOGLE_API_KEY'] = 'test_api_key' 
\ No newline at end of file
+os.environ['GOOGLE_API_KEY'] = 'test_api_key'
+os.environ.setdefault('INDEX_STATE_DIR', tempfile.mkdtemp(prefix='codebase-mcp-test-'))
+os.environ.setdefault('EMBEDDING_CACHE_PATH', os.path.join(os.environ['INDEX_STATE_DIR'], 'embedding_cache.sqlite3'))
+os.environ.setdefault('LOCAL_VECTOR_STORAGE_PATH', os.path.join(os.environ['INDEX_STATE_DIR'], 'vectors'))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from benchmarks.quantization_benchmark import estimated_ram_bytes, random_rotation, recall_at_k
+from benchmarks.run_benchmark import compare_results, make_questions, percentile, summarize_latencies
+from benchmarks.synthetic_corpus import generate_corpus
+from src.services.code_parser import JavaCodeParser
+
+
+def test_generate_corpus_is_parseable_and_deterministic(tmp_path):
+    stats = generate_corpus(str(tmp_path / "a"), files=10, actions_per_service=2, seed=1)
+    again = generate_corpus(str(tmp_path / "b"), files=10, actions_per_service=2, seed=1)
+
+    assert stats.domains == 3
+    assert stats.files == 12
+    assert (stats.lines, stats.bytes) == (again.lines, again.bytes)
+
+    parsed = JavaCodeParser().parse_directory(stats.root_path)
+    assert len(parsed) == 12
+    services = [m for m in parsed if m.classes and m.classes[0].name == "UserService"]
+    assert len(services) == 1
+    assert "approveUser" in [method.name for method in services[0].classes[0].methods]
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) == 0.0
+    assert percentile([5.0], 99) == 5.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == pytest.approx(2.5)
+    assert summarize_latencies([1.0, 3.0])["mean_ms"] == pytest.approx(2.0)
+
+
+def test_compare_results_reports_improvement_direction():
+    baseline = {"stages": {"parse": {"files_per_second": 100.0}, "query": {"p50_ms": 10.0}}}
+    current = {"stages": {"parse": {"files_per_second": 150.0}, "query": {"p50_ms": 12.0}}}
+
+    comparison = compare_results(current, baseline)
+    assert comparison["parse.files_per_second"]["improvement_percent"] == pytest.approx(50.0)
+    assert comparison["query.p50_ms"]["improvement_percent"] == pytest.approx(-20.0)
+    assert "embed.embeddings_per_second" not in comparison
+
+
+def test_make_questions_are_distinct():
+    questions = make_questions(["User", "UserService", "OrderService"], 5)
+    assert len(set(questions)) == 5
+
+
+def test_quantization_benchmark_helpers():
+    assert recall_at_k(["a", "b"], ["b", "c"]) == pytest.approx(0.5)
+    assert recall_at_k([], ["a"]) == 1.0
+    full = estimated_ram_bytes("none", 10, 3072)
+    assert full / estimated_ram_bytes("scalar", 10, 3072) > 3.9
+    assert full / estimated_ram_bytes("binary", 10, 3072) == 32
+
+    rotation = random_rotation(16, seed=0)
+    assert rotation @ rotation.T == pytest.approx(np.eye(16), abs=1e-5)
@@ -0,0 +1,84 @@
+import pytest
+from src.services.code_chunker import FileChunker, MethodChunker
+from src.services.code_parser import JavaCodeParser
+
+JAVA_SOURCE = """package com.example.service;
+
+import java.util.List;
+
+@Service
+public class UserService {
+    private final UserRepository userRepository;
+
+    @GetMapping("/{id}")
+    public User findUser(Long id) {
+        return userRepository.findById(id);
+    }
+
+    public void save(User user) {
+        userRepository.save(user);
+    }
+
+    public void save(User user, boolean flush) {
+        userRepository.save(user);
+    }
+}
+"""
+
+
+@pytest.fixture
+def code_metadata(tmp_path):
+    java_file = tmp_path / "UserService.java"
+    java_file.write_text(JAVA_SOURCE)
+    return JavaCodeParser().parse_file(str(java_file))
+
+
+def test_file_chunker_keeps_whole_file(code_metadata):
+    chunks = FileChunker().chunk(code_metadata, "demo")
+
+    assert len(chunks) == 1
+    assert chunks[0].transfer_body == JAVA_SOURCE
+    assert chunks[0].metadata.type == "file"
+    assert chunks[0].metadata.start_line == 1
+
+
+def test_method_chunker_emits_class_summary_and_methods(code_metadata):
+    chunks = MethodChunker().chunk(code_metadata, "demo")
+
+    assert [chunk.metadata.type for chunk in chunks] == ["class", "method", "method", "method"]
+    summary = chunks[0]
+    assert "public class UserService" in summary.transfer_body
+    assert "private final UserRepository userRepository;" in summary.transfer_body
+    assert 'public User findUser(Long id);' in summary.transfer_body
+    assert "return userRepository" not in summary.transfer_body
+
+    find_user = chunks[1]
+    assert find_user.metadata.method_name == "findUser"
+    assert find_user.metadata.class_name == "UserService"
+    assert find_user.metadata.project_name == "demo"
+    assert find_user.transfer_body.startswith("// File: ")
+    assert "// Class: com.example.service.UserService" in find_user.transfer_body
+    assert (find_user.metadata.start_line, find_user.metadata.end_line) == (9, 12)
+
+    # Overloads get distinct chunk IDs and therefore distinct point IDs
+    point_ids = {chunk.metadata.point_id() for chunk in chunks}
+    assert len(point_ids) == len(chunks)
+
+
+def test_method_chunker_splits_large_methods_with_overlap(tmp_path):
+    statements = "\n".join(f"        int value{i} = compute({i});" for i in range(200))
+    java_file = tmp_path / "Big.java"
+    java_file.write_text(f"class Big {{\n    void run() {{\n{statements}\n    }}\n}}\n")
+    code_metadata = JavaCodeParser().parse_file(str(java_file))
+
+    chunks = MethodChunker(max_tokens=300, overlap_tokens=40).chunk(code_metadata)
+    parts = [chunk for chunk in chunks if chunk.metadata.type == "method"]
+
+    assert len(parts) > 1
+    assert [part.metadata.chunk_id for part in parts] == [f"method:Big.run()#{i}" for i in range(len(parts))]
+    for previous, current in zip(parts, parts[1:]):
+        # Parts overlap and cover the method without gaps
+        assert current.metadata.start_line <= previous.metadata.end_line
+        assert current.metadata.start_line > previous.metadata.start_line
+    assert parts[0].metadata.start_line == 2
+    assert parts[-1].metadata.end_line == 203
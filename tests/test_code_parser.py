@@ -71,5 +71,114 @@ def test_parse_file(parser, java_file):
             print(f"Successfully parsed file: {java_file}")
             print(f"Found class: {test_class.name} with {len(test_class.methods)} methods")
 
+
+def test_parse_directory_parallel_matches_serial(parser, test_paths, tmp_path):
+    """測試多進程解析與單進程解析結果一致"""
+    for i in range(6):
+        (tmp_path / f"Generated{i}.java").write_text(
+            f"package com.example;\n\npublic class Generated{i} {{\n"
+            f"    private int value{i};\n\n    public int get{i}(int offset) {{ return value{i} + offset; }}\n}}\n"
+        )
+
+    for directory in (test_paths['test_app_dir'], str(tmp_path)):
+        serial = parser.parse_directory(directory, workers=1)
+        parallel = parser.parse_directory(directory, workers=2)
+        assert [f.model_dump() for f in parallel] == [f.model_dump() for f in serial]
+
+def test_parse_file_records_decode_lazily(parser, java_file):
+    """測試解析紀錄共用同一個原始碼緩衝區並延遲解碼"""
+    import pickle
+
+    records = parser.parse_file_records(java_file)
+    assert records.source._text is None
+    for class_record in records.classes:
+        for method in class_record.methods:
+            assert method.source is records.source
+            assert method.body == records.source.data[method.start_byte:method.end_byte].decode('utf-8')
+    assert records.source._text is None
+
+    # The pydantic models are built from the records at the API boundary
+    assert records.to_code_metadata().model_dump() == parser.parse_file(java_file).model_dump()
+
+    restored = pickle.loads(pickle.dumps(records))
+    assert restored.classes[0].methods[0].source is restored.source
+    assert restored.to_code_metadata().model_dump() == records.to_code_metadata().model_dump()
+
+def test_parse_file_records_skips_files_that_are_not_utf8(parser, tmp_path):
+    java_file = tmp_path / "Cafe.java"
+    java_file.write_bytes(b"class Cafe {\n    void order() {\n        // caf\xe9\n    }\n}\n")
+    assert parser.parse_file_records(str(java_file)) is None
+
+
+def test_chunker_output_matches_for_records_and_models(parser, java_file):
+    """測試 chunker 對解析紀錄與 pydantic 模型產生相同的 chunk"""
+    from src.services.code_chunker import MethodChunker
+
+    chunker = MethodChunker()
+    from_records = chunker.chunk(parser.parse_file_records(java_file), "project")
+    from_models = chunker.chunk(parser.parse_file(java_file), "project")
+    assert [c.model_dump() for c in from_records] == [c.model_dump() for c in from_models]
+
+SPRING_DECLARATIONS = """package com.example.web;
+
+import java.util.List;
+
+@RestController
+public class OrderController {
+    @Autowired private OrderService orderService;
+
+    public OrderController(OrderService orderService) { this.orderService = orderService; }
+
+    @Bean
+    public List<String> names(int limit, String... prefixes) {
+        Runnable task = new Runnable() { public void run() {} };
+        return List.of();
+    }
+
+    static class Page { int size; }
+    enum Status { OPEN, CLOSED }
+    record Line(String sku, int quantity) {}
+    interface Listener { int PRIORITY = 1; void onOrder(); }
+    @interface Audited { String value() default ""; }
+}
+"""
+
+def test_parse_file_extracts_every_declaration_kind(parser, tmp_path):
+    """測試單次 query 擷取所有宣告類型（介面、列舉、record、巢狀與匿名類別、建構子）"""
+    java_file = tmp_path / "OrderController.java"
+    java_file.write_text(SPRING_DECLARATIONS)
+
+    parsed = parser.parse_file(str(java_file))
+    assert parsed.package == "com.example.web"
+    assert parsed.imports == ["java.util.List"]
+
+    classes = {class_info.name: class_info for class_info in parsed.classes}
+    assert [(c.name, c.type) for c in parsed.classes] == [
+        ("OrderController", "class"),
+        ("OrderController$1", "anonymous"),
+        ("OrderController.Page", "class"),
+        ("OrderController.Status", "enum"),
+        ("OrderController.Line", "record"),
+        ("OrderController.Listener", "interface"),
+        ("OrderController.Audited", "annotation"),
+    ]
+
+    controller = classes["OrderController"]
+    assert controller.annotations == ["RestController"]
+    assert [(f.name, f.type, f.annotations) for f in controller.fields] == [("orderService", "OrderService", ["Autowired"])]
+    assert [(m.name, m.type) for m in controller.methods] == [("OrderController", "constructor"), ("names", "method")]
+    names = controller.methods[1]
+    assert names.annotations == ["Bean"]
+    assert names.return_type == "List<String>"
+    assert [(p.type, p.name) for p in names.parameters] == [("int", "limit"), ("String...", "prefixes")]
+
+    assert [m.name for m in classes["OrderController$1"].methods] == ["run"]
+    assert [f.name for f in classes["OrderController.Page"].fields] == ["size"]
+    assert [f.name for f in classes["OrderController.Status"].fields] == ["OPEN", "CLOSED"]
+    assert [(f.name, f.type) for f in classes["OrderController.Line"].fields] == [("sku", "String"), ("quantity", "int")]
+    assert [f.name for f in classes["OrderController.Listener"].fields] == ["PRIORITY"]
+    assert [m.name for m in classes["OrderController.Listener"].methods] == ["onOrder"]
+    assert [m.name for m in classes["OrderController.Audited"].methods] == ["value"]
+
 if __name__ == '__main__':
-    pytest.main(['-v', __file__]) 
\ No newline at end of file
+    pytest.main(['-v', __file__])
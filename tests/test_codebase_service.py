@@ -1,3 +1,4 @@
+import sys
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from pathlib import Path
@@ -30,10 +31,14 @@ def mock_services():
         # Mock vector embedding service
         mock_embedding = AsyncMock()
         mock_embedding.generate_embedding.return_value = [0.1] * 3072
+        mock_embedding.generate_query_embedding.return_value = [0.1] * 3072
+        mock_embedding.generate_embeddings_batch.side_effect = lambda texts: [[0.1] * 3072 for _ in texts]
+        mock_embedding.generate_query_embeddings_batch.side_effect = lambda texts: [[0.1] * 3072 for _ in texts]
         mock_factory.get_vector_embedding.return_value = mock_embedding
 
         # Mock Java code parser
         mock_parser = Mock()
+        mock_parser.iter_java_files.return_value = iter(["test/TestClass.java"])
         mock_parser.parse_directory.return_value = [
             CodeMetadata(
                 file_path="test/TestClass.java",
@@ -71,6 +76,7 @@ def mock_services():
                 ]
             )
         ]
+        mock_parser.parse_file_records.return_value = mock_parser.parse_directory.return_value[0]
         mock_factory.get_java_code_parser.return_value = mock_parser
 
         yield {
@@ -129,10 +135,39 @@ async def test_update_codebase(codebase_service, temp_java_project):
     
     # Verify service calls
     codebase_service.vector_storage.delete_project_vectors.assert_called_once()
-    codebase_service.java_code_parser.parse_directory.assert_called_once()
-    assert codebase_service.vector_embedding.generate_embedding.call_count == 1
+    codebase_service.java_code_parser.parse_file_records.assert_called_once_with("test/TestClass.java")
+    assert codebase_service.vector_embedding.generate_embeddings_batch.call_count == 1
+    assert codebase_service.vector_embedding.generate_embedding.call_count == 0
     codebase_service.vector_storage.store_vectors.assert_called_once()
 
+@pytest.mark.asyncio
+async def test_collection_tenancy_keeps_each_project_in_its_own_collection(codebase_service, temp_java_project, monkeypatch):
+    """Test one collection per project, dropped as a whole on a full rebuild."""
+    module = sys.modules[CodebaseService.__module__]
+    storage = codebase_service.vector_storage
+    storage.collection_exists.return_value = False
+    monkeypatch.setattr(module.settings, "VECTOR_TENANCY", "collection")
+    monkeypatch.setattr(module.ServiceFactory, "_vector_storage", storage)
+    monkeypatch.setattr(module.ServiceFactory, "_project_collections", set())
+
+    assert await codebase_service.update_codebase("test_project", str(temp_java_project))
+    collection_name = storage.store_vectors.call_args.args[0]
+    assert collection_name == f"{module.settings.QDRANT_COLLECTION_NAME}__test_project"
+    storage.create_collection.assert_called_once_with(
+        collection_name=collection_name, vector_size=module.settings.VECTOR_SIZE
+    )
+    storage.delete_collection.assert_not_called()
+
+    storage.collection_exists.return_value = True
+    assert await codebase_service.update_codebase("test_project", str(temp_java_project))
+    storage.delete_collection.assert_called_once_with(collection_name)
+    storage.delete_project_vectors.assert_not_called()
+
+    storage.search_vectors.return_value = []
+    await codebase_service.query_codebase("test_project", "test")
+    assert storage.search_vectors.call_args.args[0] == collection_name
+    assert module.ServiceFactory._project_collection_name("my.project") != module.ServiceFactory._project_collection_name("my_project")
+
 @pytest.mark.asyncio
 async def test_query_codebase(codebase_service):
     """Test querying codebase."""
@@ -159,7 +194,7 @@ async def test_query_codebase(codebase_service):
     assert results[0]["metadata"]["class_name"] == "TestClass"
     
     # Verify service calls
-    codebase_service.vector_embedding.generate_embedding.assert_called_once()
+    codebase_service.vector_embedding.generate_query_embedding.assert_called_once()
     codebase_service.vector_storage.search_vectors.assert_called_once()
 
 @pytest.mark.asyncio
@@ -179,11 +214,317 @@ async def test_update_codebase_with_errors(codebase_service, temp_java_project):
 async def test_query_codebase_with_errors(codebase_service, mock_services):
     """Test handling errors during codebase query."""
     # Mock an error in embedding generation
-    codebase_service.vector_embedding.generate_embedding.side_effect = Exception("Test error")
+    codebase_service.vector_embedding.generate_query_embedding.side_effect = Exception("Test error")
     
     results = await codebase_service.query_codebase(
         project_name="test_project",
         question="What does the test method do?"
     )
     
-    assert len(results) == 0 
\ No newline at end of file
+    assert len(results) == 0 
+
+@pytest.mark.asyncio
+async def test_incremental_update_only_embeds_changed_files(codebase_service, temp_java_project):
+    """Test that an incremental update re-embeds only added or changed files."""
+    from src.services.code_parser import JavaCodeParser
+    from src.services.code_chunker import FileChunker
+    codebase_service.java_code_parser = JavaCodeParser()
+    codebase_service.code_chunker = FileChunker()
+    src_dir = temp_java_project / "src" / "main" / "java" / "com" / "example"
+    (src_dir / "OtherClass.java").write_text("package com.example;\n\npublic class OtherClass {}\n")
+    (src_dir / "RemovedClass.java").write_text("package com.example;\n\npublic class RemovedClass {}\n")
+
+    await codebase_service.update_codebase(
+        project_name="incremental_project",
+        root_path=str(temp_java_project)
+    )
+    embedding = codebase_service.vector_embedding.generate_embeddings_batch
+    assert sum(len(call.args[0]) for call in embedding.call_args_list) == 3
+    first_ids = codebase_service.vector_storage.store_vectors.call_args.kwargs["ids"]
+
+    embedding.reset_mock()
+    codebase_service.vector_storage.reset_mock()
+    (src_dir / "TestClass.java").write_text(MOCK_JAVA_FILE.replace("test", "changed") + "\n")
+    (src_dir / "RemovedClass.java").unlink()
+    (src_dir / "NewClass.java").write_text("package com.example;\n\npublic class NewClass {}\n")
+
+    await codebase_service.update_codebase(
+        project_name="incremental_project",
+        root_path=str(temp_java_project),
+        incremental=True
+    )
+
+    embedded = [text for call in embedding.call_args_list for text in call.args[0]]
+    assert len(embedded) == 2
+    assert any("NewClass" in text for text in embedded)
+    codebase_service.vector_storage.delete_project_vectors.assert_not_called()
+    # The modified file keeps its point ID, so only the removed file's point is deleted
+    deleted_ids = codebase_service.vector_storage.delete_points.call_args.args[1]
+    assert len(deleted_ids) == 1
+    assert set(deleted_ids) <= set(first_ids)
+    stored_ids = codebase_service.vector_storage.store_vectors.call_args.kwargs["ids"]
+    assert len(set(stored_ids) & set(first_ids)) == 1
+
+    # Nothing changed since the last run
+    embedding.reset_mock()
+    await codebase_service.update_codebase(
+        project_name="incremental_project",
+        root_path=str(temp_java_project),
+        incremental=True
+    )
+    embedding.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_incremental_update_reindexes_everything_after_settings_change(codebase_service, temp_java_project, monkeypatch):
+    """Test that a manifest written under other chunking or embedding settings is not reused."""
+    from src.services.code_parser import JavaCodeParser
+    from src.services.code_chunker import FileChunker
+    module = sys.modules[CodebaseService.__module__]
+    codebase_service.java_code_parser = JavaCodeParser()
+    codebase_service.code_chunker = FileChunker()
+    await codebase_service.update_codebase("fingerprint_project", str(temp_java_project))
+    assert codebase_service.index_manifest.load("fingerprint_project").settings_fingerprint
+
+    codebase_service.vector_storage.reset_mock()
+    monkeypatch.setattr(module.settings, "CHUNK_MAX_TOKENS", int(module.settings.CHUNK_MAX_TOKENS) + 1)
+    await codebase_service.update_codebase("fingerprint_project", str(temp_java_project), incremental=True)
+
+    # Unchanged files are embedded again instead of keeping vectors of the old chunking
+    codebase_service.vector_storage.delete_project_vectors.assert_called_once()
+    codebase_service.vector_storage.store_vectors.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_health_check(codebase_service):
+    """Test the backend health check used at server startup."""
+    codebase_service.vector_storage.health_check.return_value = True
+    codebase_service.vector_storage.collection_exists.return_value = True
+    codebase_service.vector_storage.check_tenancy.return_value = True
+    codebase_service.vector_embedding.warm_up.return_value = True
+
+    status = await codebase_service.health_check()
+    assert status == {"vector_storage": True, "collection": True, "embedding": True, "healthy": True}
+
+    codebase_service.vector_embedding.warm_up.return_value = False
+    status = await codebase_service.health_check()
+    assert status["healthy"] is False
+
+    status = await codebase_service.health_check(check_embedding=False)
+    assert "embedding" not in status
+    assert status["healthy"] is True
+
+
+@pytest.mark.asyncio
+async def test_query_codebase_caches_results_until_reindex(codebase_service, temp_java_project):
+    """Test that repeated queries are served from cache until the project is re-indexed."""
+    codebase_service.vector_storage.search_vectors.return_value = [
+        {"score": 0.9, "metadata": {"file_path": "test/TestClass.java"}}
+    ]
+
+    first = await codebase_service.query_codebase("cached_project", "What does test do?")
+    second = await codebase_service.query_codebase("cached_project", "  What does   test do? ")
+    other_limit = await codebase_service.query_codebase("cached_project", "What does test do?", limit=3)
+
+    assert first == second == other_limit
+    assert codebase_service.vector_embedding.generate_query_embedding.call_count == 1
+    assert codebase_service.vector_storage.search_vectors.call_count == 2
+
+    await codebase_service.update_codebase(
+        project_name="cached_project",
+        root_path=str(temp_java_project)
+    )
+    await codebase_service.query_codebase("cached_project", "What does test do?")
+
+    # The embedding is still cached, but the search runs against the new index
+    assert codebase_service.vector_embedding.generate_query_embedding.call_count == 1
+    assert codebase_service.vector_storage.search_vectors.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_empty_vector_results_are_not_cached(codebase_service):
+    """Test that results of a failing vector search are searched again once the storage recovers."""
+    storage = codebase_service.vector_storage
+    storage.search_vectors.return_value = []
+    assert await codebase_service.query_codebase("outage_project", "What does test do?", mode="vector") == []
+
+    storage.search_vectors.return_value = [{"score": 0.9, "metadata": {"file_path": "test/TestClass.java"}}]
+    results = await codebase_service.query_codebase("outage_project", "What does test do?", mode="vector")
+    assert len(results) == 1 and storage.search_vectors.call_count == 2
+
+    storage.search_vectors_batch.return_value = []
+    groups = await codebase_service.query_codebase_batch("outage_project", ["how are users saved"], mode="vector")
+    assert groups[0]["results"] == []
+    storage.search_vectors_batch.return_value = [[{"id": "a", "score": 0.9, "metadata": {"file_path": "a.java"}}]]
+    groups = await codebase_service.query_codebase_batch("outage_project", ["how are users saved"], mode="vector")
+    assert [result["id"] for result in groups[0]["results"]] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_update_and_query_record_metrics(codebase_service, temp_java_project):
+    """Test that update and query stages show up in the metrics registry."""
+    from src.services.codebase_service import metrics
+    metrics.reset()
+    codebase_service.vector_storage.search_vectors.return_value = [
+        {"score": 0.9, "metadata": {"file_path": "test/TestClass.java"}}
+    ]
+
+    await codebase_service.update_codebase(project_name="metrics_project", root_path=str(temp_java_project))
+    await codebase_service.query_codebase("metrics_project", "Where is test?")
+    await codebase_service.query_codebase("metrics_project", "Where is test?")
+
+    assert metrics.counter_value("updates_total", status="success") == 1
+    assert metrics.counter_value("chunks_total") > 0
+    assert metrics.counter_value("query_cache_hits_total", cache="result") == 1
+    assert metrics.counter_value("query_cache_misses_total", cache="result") == 1
+    stages = {series["labels"]["stage"] for series in metrics.snapshot()["histograms"]["stage_seconds"]}
+    assert {"plan", "chunk", "ingest", "query_embedding", "query_search"} <= stages
+
+
+@pytest.mark.asyncio
+async def test_update_from_git_revisions_reuses_vectors_of_renamed_files(codebase_service, tmp_path):
+    """Test that a revision-based update applies only the git diff and moves renamed files' vectors."""
+    import subprocess
+    from src.services.code_parser import JavaCodeParser
+    from src.services.code_chunker import MethodChunker
+    codebase_service.java_code_parser = JavaCodeParser()
+    codebase_service.code_chunker = MethodChunker()
+    storage = codebase_service.vector_storage
+    storage.retrieve_vectors.side_effect = lambda collection, ids: {point_id: [0.2] * 3072 for point_id in ids}
+
+    def git(*args):
+        subprocess.run(
+            ["git", "-C", str(repo), "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+            check=True, capture_output=True
+        )
+
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    git("init", "-q")
+    (repo / "src" / "Order.java").write_text("class Order {\n    void pay() {}\n}\n")
+    (repo / "src" / "Invoice.java").write_text(
+        "class Invoice {\n    void send() { mailer.send(this); }\n    void print() { printer.print(this); }\n}\n"
+    )
+    git("add", "-A")
+    git("commit", "-q", "-m", "base")
+    await codebase_service.update_codebase(project_name="git_project", root_path=str(repo))
+    old_ids = set(codebase_service.index_manifest.load("git_project").files[str(repo / "src" / "Invoice.java")].point_ids)
+
+    (repo / "src" / "billing").mkdir()
+    git("mv", "src/Invoice.java", "src/billing/Invoice.java")
+    (repo / "src" / "billing" / "Invoice.java").write_text(
+        "class Invoice {\n    void send() { mailer.send(this); }\n    void print() { printer.print(copy()); }\n}\n"
+    )
+    (repo / "src" / "Cart.java").write_text("class Cart {\n    void clear() {}\n}\n")
+    git("add", "-A")
+    git("commit", "-q", "-m", "head")
+
+    embedding = codebase_service.vector_embedding.generate_embeddings_batch
+    embedding.reset_mock()
+    storage.reset_mock()
+    await codebase_service.update_codebase(
+        project_name="git_project",
+        root_path=str(repo),
+        base_revision="HEAD~1",
+        head_revision="HEAD"
+    )
+
+    embedded = [text for call in embedding.call_args_list for text in call.args[0]]
+    # Cart's two chunks and the renamed file's changed method; its class summary is unchanged
+    assert len(embedded) == 3
+    assert not any("void pay()" in text for text in embedded)
+    assert any("copy()" in text for text in embedded)
+    storage.delete_project_vectors.assert_not_called()
+    assert set(storage.delete_points.call_args.args[1]) == old_ids
+
+    manifest = codebase_service.index_manifest.load("git_project")
+    assert str(repo / "src" / "Invoice.java") not in manifest.files
+    assert len(manifest.files[str(repo / "src" / "billing" / "Invoice.java")].point_ids) == 3
+    assert len(manifest.revision) == 40
+
+
+@pytest.mark.asyncio
+async def test_hybrid_query_answers_symbols_from_lexical_index(codebase_service, temp_java_project):
+    """Test symbol lookups skip the embedding model and free text fuses both rankings."""
+    from src.services.code_parser import JavaCodeParser
+    from src.services.code_chunker import MethodChunker
+    codebase_service.java_code_parser = JavaCodeParser()
+    codebase_service.code_chunker = MethodChunker()
+    await codebase_service.update_codebase(project_name="hybrid_project", root_path=str(temp_java_project))
+    stored = codebase_service.vector_storage.store_vectors.call_args.args[2]
+
+    embedding = codebase_service.vector_embedding.generate_query_embedding
+    embedding.reset_mock()
+    results = await codebase_service.query_codebase("hybrid_project", "where is `TestClass.test` declared", mode="hybrid")
+    assert results[0]["match"] == "declaration"
+    assert results[0]["metadata"]["method_name"] == "test"
+    # Content is read back from the method's line range in the source tree
+    assert results[0]["content"].strip().startswith("public void test()")
+    assert "content" not in results[0]["metadata"]
+    embedding.assert_not_called()
+
+    # The vector ranking prefers the class summary, the lexical one the method
+    codebase_service.vector_storage.search_vectors.return_value = [
+        {"id": stored[0].point_id(), "score": 0.9, "metadata": stored[0].model_dump()}
+    ]
+    results = await codebase_service.query_codebase("hybrid_project", "println output", mode="hybrid")
+    embedding.assert_called_once()
+    assert {result["id"] for result in results} == {metadata.point_id() for metadata in stored}
+
+    results = await codebase_service.query_codebase("hybrid_project", "println output", mode="lexical")
+    assert [result["metadata"]["method_name"] for result in results] == ["test"]
+
+    # A bare word nothing declares is a concept, searched by both rankings
+    embedding.reset_mock()
+    results = await codebase_service.query_codebase("hybrid_project", "println", mode="hybrid")
+    embedding.assert_called_once()
+    assert {result["id"] for result in results} == {metadata.point_id() for metadata in stored}
+
+
+@pytest.mark.asyncio
+async def test_update_codebase_keys_files_by_absolute_path(codebase_service, temp_java_project, monkeypatch):
+    """Test a relative root indexes the same paths and point IDs as the watcher's absolute root."""
+    from src.services.code_parser import JavaCodeParser
+    codebase_service.java_code_parser = JavaCodeParser()
+    monkeypatch.chdir(temp_java_project.parent)
+
+    assert await codebase_service.update_codebase("relative_project", temp_java_project.name)
+    manifest = codebase_service.index_manifest.load("relative_project")
+    java_file = str(temp_java_project / "src" / "main" / "java" / "com" / "example" / "TestClass.java")
+    assert list(manifest.files) == [java_file]
+    stored = codebase_service.vector_storage.store_vectors.call_args.args[2]
+    assert {metadata.file_path for metadata in stored} == {java_file}
+
+
+@pytest.mark.asyncio
+async def test_query_codebase_batch_embeds_once_and_lists_hits_once(codebase_service):
+    """Test a batch embeds its questions in one call, searches once and deduplicates hits."""
+    def hit(point_id, score):
+        return {"id": point_id, "score": score, "metadata": {"file_path": f"{point_id}.java"}}
+
+    codebase_service.vector_storage.search_vectors_batch.return_value = [
+        [hit("a", 0.9), hit("shared", 0.8)],
+        [hit("shared", 0.95), hit("b", 0.7)],
+        [hit("c", 0.6)]
+    ]
+    questions = ["how are users saved", "where is  the user repository", "what validates emails"]
+
+    groups = await codebase_service.query_codebase_batch("batch_project", questions, limit=2, mode="vector")
+
+    embedding = codebase_service.vector_embedding.generate_query_embeddings_batch
+    embedding.assert_called_once_with(
+        ["how are users saved", "where is the user repository", "what validates emails"]
+    )
+    codebase_service.vector_storage.search_vectors_batch.assert_called_once()
+    assert [group["question"] for group in groups] == [
+        "how are users saved", "where is the user repository", "what validates emails"
+    ]
+    # "shared" ranks first for the second question, so it is only listed there
+    assert [[result["id"] for result in group["results"]] for group in groups] == [["a"], ["shared", "b"], ["c"]]
+    assert groups[1]["results"][0]["questions"] == [0, 1]
+
+    # Each question's results are cached like single queries
+    results = await codebase_service.query_codebase("batch_project", "what validates emails", limit=2, mode="vector")
+    assert [result["id"] for result in results] == ["c"]
+    codebase_service.vector_embedding.generate_query_embedding.assert_not_called()
+    codebase_service.vector_storage.search_vectors.assert_not_called()
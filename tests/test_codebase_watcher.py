@@ -0,0 +1,186 @@
+import asyncio
+
+import pytest
+
+from src.config.settings import settings
+from src.services.code_chunker import MethodChunker
+from src.services.code_parser import JavaCodeParser
+from src.services.codebase_watcher import (
+    CodebaseWatcher,
+    InotifyChangeSource,
+    PollingChangeSource,
+    compute_edit
+)
+from src.services.index_manifest import IndexManifestStore
+from src.services.local_vector_storage import LocalVectorStorageService
+from src.services.vector_embedding import VectorEmbeddingService
+
+VECTOR_SIZE = int(settings.VECTOR_SIZE)
+
+SERVICE_SOURCE = """package com.example;
+
+public class OrderService {
+    public Order find(Long id) {
+        return repository.findById(id);
+    }
+
+    public void cancel(Long id) {
+        repository.deleteById(id);
+    }
+}
+"""
+
+
+class CountingEmbedding(VectorEmbeddingService):
+    """Hashing embeddings that remember how many texts were embedded."""
+
+    def __init__(self):
+        super().__init__(provider="hashing")
+        self.texts = []
+
+    async def generate_embeddings_batch(self, texts):
+        self.texts.extend(texts)
+        return await super().generate_embeddings_batch(texts)
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "OrderService.java").write_text(SERVICE_SOURCE)
+    return root
+
+
+@pytest.fixture
+def watcher(tmp_path, project):
+    storage = LocalVectorStorageService(str(tmp_path / "vectors"))
+    storage.create_collection("code", vector_size=VECTOR_SIZE)
+    chunker = MethodChunker()
+    updates = []
+    watcher = CodebaseWatcher(
+        project_name="shop",
+        root_path=str(project),
+        vector_storage=storage,
+        vector_embedding=CountingEmbedding(),
+        index_manifest=IndexManifestStore(str(tmp_path / "state")),
+        to_code_data=lambda code_metadata: chunker.chunk(code_metadata, "shop"),
+        on_update=lambda: updates.append(True),
+        collection_name="code",
+        backend="polling",
+        debounce_seconds=0.05,
+        poll_interval=0.05
+    )
+    watcher.updates = updates
+    yield watcher
+    watcher.close()
+
+
+def stored_paths(watcher):
+    results = watcher.vector_storage.search_vectors("code", [1.0] * VECTOR_SIZE, limit=100, project_name="shop")
+    return sorted((r["metadata"]["method_name"] or "", r["metadata"]["start_line"]) for r in results)
+
+
+def test_compute_edit_allows_incremental_reparse():
+    parser = JavaCodeParser()
+    old = SERVICE_SOURCE.encode()
+    new = SERVICE_SOURCE.replace("deleteById(id)", "archive(id, true)").encode()
+
+    edit = compute_edit(old, new)
+    assert edit["start_byte"] == old.index(b"deleteById")
+    assert edit["start_point"] == (8, old.index(b"deleteById") - old.rindex(b"\n", 0, old.index(b"deleteById")) - 1)
+
+    _, tree = parser.parse_source("OrderService.java", old)
+    tree.edit(**edit)
+    _, incremental = parser.parse_source("OrderService.java", new, tree)
+    _, full = parser.parse_source("OrderService.java", new)
+    assert incremental.root_node.sexp() == full.root_node.sexp()
+    assert compute_edit(old, old) is None
+
+
+@pytest.mark.asyncio
+async def test_apply_changes_only_embeds_changed_declarations(watcher, project):
+    file_path = str(project / "OrderService.java")
+    first = await watcher.apply_changes([file_path])
+    assert first["embedded"] == 3
+    indexed = stored_paths(watcher)
+
+    # Editing one method body re-embeds only that method
+    (project / "OrderService.java").write_text(SERVICE_SOURCE.replace("deleteById(id)", "archive(id)"))
+    watcher.vector_embedding.texts.clear()
+    second = await watcher.apply_changes([file_path])
+    assert second == {"files": 1, "embedded": 1, "updated": 0, "deleted": 0}
+    assert len(watcher.vector_embedding.texts) == 1
+    assert "archive(id)" in watcher.vector_embedding.texts[0]
+
+    # Shifting declarations down updates payloads without embedding them again
+    (project / "OrderService.java").write_text(
+        SERVICE_SOURCE.replace("deleteById(id)", "archive(id)").replace("package com.example;\n", "package com.example;\n\n")
+    )
+    third = await watcher.apply_changes([file_path])
+    assert third["embedded"] == 0
+    assert third["updated"] == 3
+    assert [line for _, line in stored_paths(watcher)] == [line + 1 for _, line in indexed]
+
+    manifest = watcher.index_manifest.load("shop")
+    assert sorted(manifest.files[file_path].point_ids) == sorted(r["id"] for r in watcher.vector_storage.search_vectors(
+        "code", [1.0] * VECTOR_SIZE, limit=100, project_name="shop"
+    ))
+    assert len(watcher.updates) == 3
+
+
+@pytest.mark.asyncio
+async def test_apply_changes_deletes_removed_files(watcher, project):
+    file_path = str(project / "OrderService.java")
+    await watcher.apply_changes([file_path])
+
+    (project / "OrderService.java").unlink()
+    summary = await watcher.apply_changes([file_path])
+    assert summary == {"files": 1, "embedded": 0, "updated": 0, "deleted": 3}
+    assert stored_paths(watcher) == []
+    assert watcher.index_manifest.load("shop").files == {}
+
+
+@pytest.mark.asyncio
+async def test_watcher_follows_edits(watcher, project):
+    await watcher.start()
+    for _ in range(100):
+        if watcher.state == "watching":
+            break
+        await asyncio.sleep(0.02)
+    assert watcher.stats["chunks_embedded"] == 3
+
+    (project / "Invoice.java").write_text("public class Invoice {\n    void pay() {}\n}\n")
+    for _ in range(100):
+        if watcher.stats["files_changed"] == 2:
+            break
+        await asyncio.sleep(0.02)
+    assert watcher.stats["chunks_embedded"] == 5
+    assert watcher.status()["backend"] == "PollingChangeSource"
+
+    await watcher.stop()
+    assert watcher.state == "stopped"
+
+
+@pytest.mark.asyncio
+async def test_polling_source_reports_changed_files(project):
+    parser = JavaCodeParser()
+    source = PollingChangeSource(str(project), 0.01, parser.list_java_files)
+    (project / "New.java").write_text("class New {}\n")
+    assert await asyncio.wait_for(source.next_changes(), 2) == {str(project / "New.java")}
+
+
+@pytest.mark.skipif(not InotifyChangeSource.available(), reason="inotify is not available")
+@pytest.mark.asyncio
+async def test_inotify_source_reports_changes_in_new_directories(project):
+    source = InotifyChangeSource(str(project))
+    try:
+        (project / "OrderService.java").write_text(SERVICE_SOURCE + "\n")
+        assert str(project / "OrderService.java") in await asyncio.wait_for(source.next_changes(), 2)
+
+        (project / "billing").mkdir()
+        (project / "billing" / "Invoice.java").write_text("class Invoice {}\n")
+        seen = set()
+        while str(project / "billing" / "Invoice.java") not in seen:
+            seen |= await asyncio.wait_for(source.next_changes(), 2)
+    finally:
+        source.close()
@@ -0,0 +1,55 @@
+import zlib
+
+import pytest
+from src.services.content_store import ContentStore, load_contents, read_line_range
+from src.type_definitions.code_types import CodeDataForVector, CodeVectorMetadata
+
+
+def make_chunk(chunk_id, text):
+    metadata = CodeVectorMetadata(project_name="p", file_path="A.java", chunk_id=chunk_id)
+    return CodeDataForVector(transfer_body=text, metadata=metadata)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ContentStore(str(tmp_path / "content.sqlite3"))
+
+
+def test_store_round_trips_compressed_chunk_text(store):
+    body = "public void save(User user) {\n    repository.save(user);\n}\n" * 20
+    chunks = [make_chunk("a", body), make_chunk("b", "int b;")]
+    store.add_chunks(chunks)
+
+    ids = [chunk.metadata.point_id() for chunk in chunks]
+    assert store.get_many(ids + ["unknown"]) == {ids[0]: body, ids[1]: "int b;"}
+    blob = store._connection.execute("SELECT content FROM contents WHERE point_id = ?", (ids[0],)).fetchone()[0]
+    assert len(blob) < len(body) // 4
+    assert zlib.decompress(blob).decode("utf-8") == body
+
+    store.remove([ids[0]])
+    assert list(store.get_many(ids)) == [ids[1]]
+
+
+def test_read_line_range_is_one_based_and_inclusive():
+    lines = ["a", "b", "c"]
+    assert read_line_range(lines, 2, 3) == "b\nc"
+    assert read_line_range(lines, 3, 10) == "c"
+    assert read_line_range(lines, 0, 0) is None
+    assert read_line_range(lines, 4, 5) is None
+
+
+def test_load_contents_prefers_store_and_falls_back_to_source(store, tmp_path):
+    source = tmp_path / "A.java"
+    source.write_text("class A {\n    void a() {}\n    void b() {}\n}\n")
+    stored = make_chunk("a", "// indexed text of a")
+    store.add_chunks([stored])
+    results = [
+        {"id": stored.metadata.point_id(), "score": 0.9, "metadata": {"file_path": str(source), "start_line": 2, "end_line": 2}},
+        {"id": "b", "score": 0.8, "metadata": {"file_path": str(source), "start_line": 3, "end_line": 3}},
+        {"id": "c", "score": 0.7, "metadata": {"file_path": str(tmp_path / "Gone.java"), "start_line": 1, "end_line": 1}},
+    ]
+
+    loaded = load_contents(results, store)
+    assert [result["content"] for result in loaded] == ["// indexed text of a", "    void b() {}", None]
+    assert "content" not in results[0]
+    assert [result["content"] for result in load_contents(results)][:2] == ["    void a() {}", "    void b() {}"]
@@ -0,0 +1,53 @@
+import pytest
+from src.services.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+
+
+def test_make_key_depends_on_model_task_and_text():
+    key = EmbeddingCache.make_key("model", "retrieval_document", "text")
+    assert key == EmbeddingCache.make_key("model", "retrieval_document", "text")
+    assert key != EmbeddingCache.make_key("other", "retrieval_document", "text")
+    assert key != EmbeddingCache.make_key("model", "retrieval_query", "text")
+    assert key != EmbeddingCache.make_key("model", "retrieval_document", "text2")
+
+
+def test_put_and_get_counts_hits_and_misses(cache):
+    assert cache.get("a") is None
+    cache.put("a", [0.5, -1.0, 2.0])
+
+    assert cache.get("a") == [0.5, -1.0, 2.0]
+    found = cache.get_many(["a", "b"])
+    assert list(found) == ["a"]
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 12
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    EmbeddingCache(path, max_bytes=1024).put("a", [1.0, 2.0])
+
+    reopened = EmbeddingCache(path, max_bytes=1024)
+    assert reopened.get("a") == [1.0, 2.0]
+    assert reopened.stats()["bytes"] == 8
+
+
+def test_lru_eviction(tmp_path):
+    # Room for two 4-float vectors
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=32)
+    cache.put("a", [1.0] * 4)
+    cache.put("b", [2.0] * 4)
+    cache.get("a")
+    cache.put("c", [3.0] * 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0] * 4
+    assert cache.get("c") == [3.0] * 4
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import AsyncMock
+from src.services.embedding_scheduler import EmbeddingScheduler
+
+
+@pytest.fixture
+def mock_embedding():
+    """Create a mock embedding service that echoes text lengths as vectors."""
+    embedding = AsyncMock()
+    embedding.generate_embeddings_batch.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    return embedding
+
+
+def test_make_batches_respects_size_and_tokens(mock_embedding):
+    scheduler = EmbeddingScheduler(mock_embedding, batch_size=2, max_batch_tokens=10, concurrency=2)
+    texts = ["a" * 8, "b" * 8, "c" * 8, "d" * 40, "e" * 4]
+
+    batches = scheduler.make_batches(texts)
+
+    # 2 tokens each for a/b/c, 10 for d, 1 for e
+    assert batches == [[0, 1], [2], [3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_embed_texts_preserves_order(mock_embedding):
+    scheduler = EmbeddingScheduler(mock_embedding, batch_size=2, max_batch_tokens=1000, concurrency=3)
+    texts = ["x" * n for n in range(1, 8)]
+
+    vectors = await scheduler.embed_texts(texts)
+
+    assert vectors == [[float(n)] for n in range(1, 8)]
+    assert mock_embedding.generate_embeddings_batch.call_count == 4
+    assert scheduler.stats["items"] == 7
+    assert scheduler.stats["batches"] == 4
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_retries_rate_limit(mock_embedding):
+    calls = []
+
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) < 3:
+            raise Exception("429 Resource has been exhausted (e.g. check quota).")
+        return [[1.0] for _ in texts]
+
+    mock_embedding.generate_embeddings_batch.side_effect = flaky
+    scheduler = EmbeddingScheduler(mock_embedding, max_retries=3, retry_base_delay=0)
+
+    vectors = await scheduler.embed_texts(["a", "b"])
+
+    assert vectors == [[1.0], [1.0]]
+    assert len(calls) == 3
+    assert scheduler.stats["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_does_not_retry_other_errors(mock_embedding):
+    mock_embedding.generate_embeddings_batch.side_effect = ValueError("invalid argument")
+    scheduler = EmbeddingScheduler(mock_embedding, max_retries=3, retry_base_delay=0)
+
+    with pytest.raises(ValueError):
+        await scheduler.embed_texts(["a"])
+    assert mock_embedding.generate_embeddings_batch.call_count == 1
@@ -0,0 +1,60 @@
+import subprocess
+
+import pytest
+
+from src.services.git_changes import GitRepository
+
+
+def git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    git(repo, "init", "-q")
+    (repo / "src" / "Order.java").write_text("class Order {\n    void pay() {}\n    void cancel() {}\n}\n")
+    (repo / "src" / "Invoice.java").write_text("class Invoice {\n    void send() {}\n    void print() {}\n}\n")
+    (repo / "src" / "Legacy.java").write_text("class Legacy {}\n")
+    (repo / "README.md").write_text("readme\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "base")
+    return repo
+
+
+def test_diff_between_revisions_detects_renames(repo):
+    (repo / "src" / "billing").mkdir()
+    git(repo, "mv", "src/Invoice.java", "src/billing/Invoice.java")
+    (repo / "src" / "Order.java").write_text("class Order {\n    void pay() { charge(); }\n}\n")
+    git(repo, "rm", "-q", "src/Legacy.java")
+    (repo / "src" / "Cart.java").write_text("class Cart {}\n")
+    (repo / "README.md").write_text("changed\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "head")
+
+    changes = GitRepository(str(repo)).diff("HEAD~1", "HEAD")
+    assert changes.added == ["src/Cart.java"]
+    assert changes.modified == ["src/Order.java"]
+    assert changes.deleted == ["src/Legacy.java"]
+    assert [(r.old_path, r.new_path) for r in changes.renamed] == [("src/Invoice.java", "src/billing/Invoice.java")]
+
+
+def test_diff_against_working_tree_includes_untracked_files(repo):
+    (repo / "src" / "Order.java").write_text("class Order {}\n")
+    (repo / "src" / "Draft.java").write_text("class Draft {}\n")
+
+    changes = GitRepository(str(repo)).diff("HEAD")
+    assert changes.modified == ["src/Order.java"]
+    assert changes.added == ["src/Draft.java"]
+
+
+def test_resolve_and_show(repo):
+    repository = GitRepository(str(repo / "src"))
+    assert len(repository.resolve("HEAD")) == 40
+    assert repository.show("HEAD", "src/Legacy.java") == b"class Legacy {}\n"
+    with pytest.raises(RuntimeError):
+        repository.resolve("missing-branch")
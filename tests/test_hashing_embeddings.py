@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from src.services.hashing_embeddings import HashingEmbeddings
+
+
+def cosine(a, b):
+    return float(np.dot(a, b))
+
+
+def test_vectors_are_normalized_and_sized():
+    model = HashingEmbeddings(size=256)
+    vector = model.embed_query("public class UserService {}")
+    assert len(vector) == 256
+    assert np.linalg.norm(vector) == pytest.approx(1.0)
+
+
+def test_vectors_are_deterministic():
+    first = HashingEmbeddings(size=128).embed_documents(["getUserById", "saveOrder"])
+    second = HashingEmbeddings(size=128).embed_documents(["getUserById", "saveOrder"])
+    assert first == second
+
+
+def test_shared_vocabulary_scores_higher():
+    model = HashingEmbeddings(size=1024)
+    query = model.embed_query("find user by id")
+    related = model.embed_query("public User findUserById(Long id) { return userRepository.findById(id); }")
+    unrelated = model.embed_query("public void sendInvoiceEmail(Invoice invoice) { mailer.send(invoice); }")
+    assert cosine(query, related) > cosine(query, unrelated)
+
+
+def test_empty_text_is_zero_vector():
+    assert HashingEmbeddings(size=8).embed_query("") == [0.0] * 8
+
+
+@pytest.mark.asyncio
+async def test_async_methods_match_sync():
+    model = HashingEmbeddings(size=64)
+    assert await model.aembed_query("OrderService") == model.embed_query("OrderService")
+    assert await model.aembed_documents(["a b"]) == model.embed_documents(["a b"])
@@ -0,0 +1,70 @@
+import os
+import pytest
+from src.services.index_manifest import IndexManifestStore
+from src.type_definitions.index_types import FileManifestEntry, ProjectManifest
+
+
+@pytest.fixture
+def manifest_store(tmp_path):
+    return IndexManifestStore(str(tmp_path / "state"))
+
+
+def test_save_and_load(manifest_store):
+    manifest = ProjectManifest(
+        project_name="demo/project",
+        root_path="/repo",
+        files={"A.java": FileManifestEntry(content_hash="abc", mtime=1.0, size=3, point_ids=["p1"])}
+    )
+    assert manifest_store.save(manifest) is True
+
+    loaded = manifest_store.load("demo/project")
+    assert loaded.model_dump() == manifest.model_dump()
+    assert manifest_store.load("missing") is None
+
+    assert manifest_store.delete("demo/project") is True
+    assert manifest_store.load("demo/project") is None
+
+
+def test_project_names_differing_in_replaced_characters_keep_separate_manifests(manifest_store):
+    manifest = ProjectManifest(project_name="org/app", root_path="/repo")
+    assert manifest_store.save(manifest) is True
+    assert manifest_store._manifest_path("org/app") != manifest_store._manifest_path("org_app")
+    assert manifest_store.load("org_app") is None
+
+    # A manifest written under another project's name is never handed out
+    path = manifest_store._manifest_path("org_app")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(manifest.model_dump_json())
+    assert manifest_store.load("org_app") is None
+
+
+def test_detect_changes(manifest_store, tmp_path):
+    unchanged = tmp_path / "Unchanged.java"
+    touched = tmp_path / "Touched.java"
+    modified = tmp_path / "Modified.java"
+    added = tmp_path / "Added.java"
+    for path in (unchanged, touched, modified, added):
+        path.write_text(f"class {path.stem} {{}}")
+
+    manifest = ProjectManifest(project_name="demo", files={
+        str(unchanged): manifest_store.fingerprint(str(unchanged)).model_dump(),
+        str(touched): manifest_store.fingerprint(str(touched)).model_dump(),
+        str(modified): manifest_store.fingerprint(str(modified)).model_dump(),
+        "Removed.java": FileManifestEntry(content_hash="gone", point_ids=["r1"]),
+    })
+    manifest.files[str(touched)].point_ids = ["t1"]
+
+    os.utime(touched, (0, 12345))
+    modified.write_text("class Modified { int x; }")
+
+    changes, entries = manifest_store.detect_changes(
+        manifest, [str(unchanged), str(touched), str(modified), str(added)]
+    )
+
+    assert changes.added == [str(added)]
+    assert changes.modified == [str(modified)]
+    assert changes.removed == ["Removed.java"]
+    assert sorted(changes.unchanged) == sorted([str(unchanged), str(touched)])
+    assert entries[str(touched)].point_ids == ["t1"]
+    assert entries[str(touched)].mtime == 12345
@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.services.embedding_scheduler import EmbeddingScheduler
+from src.services.ingest_pipeline import IngestPipeline
+from src.type_definitions.code_types import CodeDataForVector, CodeMetadata, CodeVectorMetadata
+
+
+def make_pipeline(events, store_result=True, file_count=20):
+    """Create a pipeline over fake files that records the order of stage events."""
+    parser = Mock()
+
+    def parse_file(file_path):
+        events.append(("parse", file_path))
+        return CodeMetadata(file_path=file_path, content=f"class {file_path} {{}}")
+
+    parser.parse_file_records.side_effect = parse_file
+
+    embedding = AsyncMock()
+    embedding.generate_embeddings_batch.side_effect = lambda texts: [[0.1] for _ in texts]
+    scheduler = EmbeddingScheduler(embedding, batch_size=2, concurrency=2)
+
+    storage = Mock()
+
+    def store_vectors(collection_name, vectors, metadata_list, ids, wait):
+        events.append(("store", len(ids), wait))
+        return store_result
+
+    storage.store_vectors.side_effect = store_vectors
+
+    pipeline = IngestPipeline(
+        java_code_parser=parser,
+        scheduler=scheduler,
+        vector_storage=storage,
+        collection_name="test_collection",
+        to_code_data=lambda code_metadata: [CodeDataForVector(
+            transfer_body=code_metadata.content,
+            metadata=CodeVectorMetadata(project_name="p", file_path=code_metadata.file_path)
+        )],
+        parse_workers=1,
+        queue_size=2
+    )
+    files = [f"F{i}" for i in range(file_count)]
+    return pipeline, files
+
+
+@pytest.mark.asyncio
+async def test_pipeline_streams_all_files():
+    events = []
+    pipeline, files = make_pipeline(events)
+
+    result = await pipeline.run(iter(files))
+
+    assert result.files_parsed == 20
+    assert result.chunks == 20
+    assert result.vectors_stored == 20
+    assert sorted(result.point_ids_by_file) == sorted(files)
+    stores = [event for event in events if event[0] == "store"]
+    assert sum(size for _, size, _ in stores) == 20
+    # Only the final upsert waits for acknowledgement
+    assert [wait for _, _, wait in stores] == [False] * (len(stores) - 1) + [True]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_before_parsing_finishes():
+    events = []
+    pipeline, files = make_pipeline(events, file_count=40)
+
+    await pipeline.run(iter(files))
+
+    first_store = next(i for i, event in enumerate(events) if event[0] == "store")
+    last_parse = max(i for i, event in enumerate(events) if event[0] == "parse")
+    assert first_store < last_parse
+
+
+@pytest.mark.asyncio
+async def test_pipeline_raises_on_store_failure():
+    events = []
+    pipeline, files = make_pipeline(events, store_result=False)
+
+    with pytest.raises(Exception, match="Failed to store vectors"):
+        await pipeline.run(iter(files))
+
+
+@pytest.mark.asyncio
+async def test_pipeline_counts_files_parsed_in_worker_processes(tmp_path):
+    from src.services.code_parser import JavaCodeParser
+    from src.services.ingest_pipeline import metrics
+    files = []
+    for name in ["A", "B"]:
+        path = tmp_path / f"{name}.java"
+        path.write_text(f"class {name} {{ void run() {{}} }}")
+        files.append(str(path))
+    storage = Mock()
+    storage.store_vectors.return_value = True
+    embedding = AsyncMock()
+    embedding.generate_embeddings_batch.side_effect = lambda texts: [[0.1] for _ in texts]
+    pipeline = IngestPipeline(
+        java_code_parser=JavaCodeParser(),
+        scheduler=EmbeddingScheduler(embedding, batch_size=2, concurrency=1),
+        vector_storage=storage,
+        collection_name="test_collection",
+        to_code_data=lambda parsed_file: [CodeDataForVector(
+            transfer_body=parsed_file.content,
+            metadata=CodeVectorMetadata(project_name="p", file_path=parsed_file.file_path)
+        )],
+        parse_workers=2
+    )
+    metrics.reset()
+
+    result = await pipeline.run(iter(files + [str(tmp_path / "Missing.java")]))
+
+    assert result.files_parsed == 2
+    assert metrics.counter_value("files_parsed_total") == 2
+    assert metrics.counter_value("parsed_bytes_total") == sum(len(open(path, "rb").read()) for path in files)
+    assert metrics.counter_value("parse_errors_total") == 1
@@ -0,0 +1,97 @@
+from src.services.lexical_index import (
+    LexicalIndex,
+    LexicalIndexStore,
+    extract_symbols,
+    reciprocal_rank_fusion,
+    tokenize
+)
+from src.type_definitions.code_types import CodeVectorMetadata
+from src.type_definitions.storage_types import SearchFilter
+
+
+def metadata(chunk_id, class_name, method_name="", type="method", fields=()):
+    return CodeVectorMetadata(
+        project_name="shop", file_path=f"{class_name}.java", chunk_id=chunk_id, type=type,
+        package="com.example", class_name=class_name, method_name=method_name, fields_name=list(fields)
+    )
+
+
+def build_index():
+    index = LexicalIndex()
+    index.add("repo", "interface UserRepository { Optional<User> findByEmail(String email); }",
+              metadata("class:UserRepository", "UserRepository", type="class"))
+    index.add("find", "Optional<User> findByEmail(String email);",
+              metadata("method:UserRepository.findByEmail", "UserRepository", "findByEmail"))
+    index.add("login", "User login(String email) { return userRepository.findByEmail(email).orElseThrow(); }",
+              metadata("method:AuthService.login", "AuthService", "login"))
+    index.add("invoice", "void sendInvoice(Invoice invoice) { mailer.send(invoice); }",
+              metadata("method:InvoiceService.sendInvoice", "InvoiceService", "sendInvoice"))
+    return index
+
+
+def test_tokenize_splits_compound_identifiers():
+    assert tokenize("public User findByEmail(MAX_SIZE)") == [
+        "user", "findbyemail", "find", "by", "email", "max_size", "max", "size"
+    ]
+
+
+def test_extract_symbols():
+    assert extract_symbols("where is `UserRepository.findByEmail` used") == ["UserRepository.findByEmail"]
+    assert extract_symbols("findByEmail()") == ["findByEmail"]
+    assert extract_symbols("how are invoices sent") == []
+
+
+def test_search_ranks_by_bm25():
+    results = build_index().search("send invoice email", limit=2)
+    assert results[0]["id"] == "invoice"
+    assert results[0]["score"] > results[1]["score"]
+    assert results[0]["metadata"]["method_name"] == "sendInvoice"
+
+
+def test_index_paths_of_similarly_named_projects_differ(tmp_path):
+    store = LexicalIndexStore(str(tmp_path))
+    assert store._index_path("org/app") != store._index_path("org_app")
+
+
+def test_lookup_symbol_returns_declarations_then_usages():
+    results = build_index().lookup_symbol("UserRepository.findByEmail", limit=5)
+    assert (results[0]["id"], results[0]["match"]) == ("find", "declaration")
+    assert {r["id"] for r in results[1:]} == {"login", "repo"}
+    assert all(r["match"] == "usage" for r in results[1:])
+    assert build_index().lookup_symbol("Missing.symbol") == []
+
+
+def test_search_and_lookup_respect_class_prefix_filter():
+    index = build_index()
+    only_auth = SearchFilter(class_prefix="AuthService")
+    assert [r["id"] for r in index.search("user email", limit=5, search_filter=only_auth)] == ["login"]
+    assert [r["id"] for r in index.lookup_symbol("findByEmail", limit=5, search_filter=only_auth)] == ["login"]
+    assert index.search("user email", search_filter=SearchFilter(package_prefix="org")) == []
+
+
+def test_remove_drops_postings_and_symbols():
+    index = build_index()
+    index.remove(["find", "unknown"])
+    assert len(index) == 3
+    assert "userrepository.findbyemail" not in index.symbols
+    assert all(r["match"] == "usage" for r in index.lookup_symbol("UserRepository.findByEmail"))
+
+
+def test_reciprocal_rank_fusion_favours_results_in_both_lists():
+    vector = [{"id": "a", "score": 0.9, "metadata": {}}, {"id": "b", "score": 0.8, "metadata": {}}]
+    lexical = [{"id": "b", "score": 12.0, "metadata": {}}, {"id": "c", "score": 3.0, "metadata": {}}]
+    fused = reciprocal_rank_fusion([vector, lexical], limit=3, k=60)
+    assert [r["id"] for r in fused] == ["b", "a", "c"]
+    assert fused[0]["score"] == 1 / 62 + 1 / 61
+
+
+def test_store_persists_indexes(tmp_path):
+    store = LexicalIndexStore(str(tmp_path))
+    store.get("shop").add_chunks([])
+    store._indexes["shop"] = build_index()
+    assert store.save("shop")
+
+    reloaded = LexicalIndexStore(str(tmp_path)).get("shop")
+    assert len(reloaded) == 4
+    assert reloaded.search("send invoice", limit=1)[0]["id"] == "invoice"
+    assert not reloaded.dirty
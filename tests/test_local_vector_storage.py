@@ -0,0 +1,184 @@
+import numpy as np
+import pytest
+
+from src.services.local_vector_storage import LocalVectorStorageService
+from src.type_definitions.code_types import CodeVectorMetadata
+from src.type_definitions.storage_types import CollectionOptions, SearchFilter, SearchOptions
+
+
+def make_metadata(project_name, file_path):
+    return CodeVectorMetadata(project_name=project_name, file_path=file_path)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = LocalVectorStorageService(str(tmp_path))
+    assert storage.create_collection("code", vector_size=3)
+    return storage
+
+
+def test_create_collection(storage):
+    assert storage.collection_exists("code")
+    assert not storage.collection_exists("missing")
+    assert not storage.create_collection("code", vector_size=3)
+
+
+def test_search_returns_nearest_by_cosine(storage):
+    vectors = [[1, 0, 0], [0, 1, 0], [1, 1, 0]]
+    metadata = [make_metadata("p", f"F{i}.java") for i in range(3)]
+    assert storage.store_vectors("code", vectors, metadata)
+
+    results = storage.search_vectors("code", [2, 0.1, 0], limit=2)
+    assert [r["metadata"]["file_path"] for r in results] == ["F0.java", "F2.java"]
+    assert results[0]["id"] == metadata[0].point_id()
+    assert results[0]["score"] > results[1]["score"]
+
+
+def test_search_filters_by_project(storage):
+    storage.store_vectors("code", [[1, 0, 0], [1, 0, 0]], [make_metadata("a", "A.java"), make_metadata("b", "B.java")])
+
+    results = storage.search_vectors("code", [1, 0, 0], limit=5, project_name="b")
+    assert [r["metadata"]["file_path"] for r in results] == ["B.java"]
+    assert storage.search_vectors("code", [1, 0, 0], project_name="missing") == []
+
+
+def test_search_filters_by_package_and_class_prefix(storage, tmp_path):
+    metadata = [
+        CodeVectorMetadata(project_name="p", file_path="A.java", chunk_id="a", package="com.example.user", class_name="UserService"),
+        CodeVectorMetadata(project_name="p", file_path="A.java", chunk_id="b", package="com.example.user", class_name="UserService.Cache"),
+        CodeVectorMetadata(project_name="p", file_path="B.java", chunk_id="c", package="com.example.order", class_name="OrderService"),
+    ]
+    storage.store_vectors("code", [[1, 0, 0]] * 3, metadata)
+
+    def chunk_ids(search_filter):
+        return sorted(r["metadata"]["chunk_id"] for r in storage.search_vectors("code", [1, 0, 0], limit=5, project_name="p", search_filter=search_filter))
+
+    assert chunk_ids(SearchFilter(package_prefix="com.example")) == ["a", "b", "c"]
+    assert chunk_ids(SearchFilter(package_prefix="com.example.user")) == ["a", "b"]
+    assert chunk_ids(SearchFilter(class_prefix="UserService.Cache")) == ["b"]
+    assert chunk_ids(SearchFilter(package_prefix="com.example.us")) == []
+
+    # Moving a class updates the index, and reopening rebuilds it
+    moved = metadata[2].model_copy(update={"package": "com.example.user"})
+    storage.update_payloads("code", [moved.point_id()], [moved])
+    assert chunk_ids(SearchFilter(package_prefix="com.example.user")) == ["a", "b", "c"]
+    reopened = LocalVectorStorageService(str(tmp_path))
+    assert len(reopened.search_vectors_batch("code", [[1, 0, 0]], limit=5, search_filter=SearchFilter(class_prefix="OrderService"))[0]) == 1
+
+
+def test_search_batch_answers_every_query(storage):
+    storage.store_vectors("code", [[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+                          [make_metadata("a", "A.java"), make_metadata("a", "B.java"), make_metadata("b", "C.java")])
+
+    results = storage.search_vectors_batch("code", [[0, 1, 0], [1, 0, 0], [0, 0, 1]], limit=1, project_name="a")
+    assert [[r["metadata"]["file_path"] for r in hits] for hits in results] == [["B.java"], ["A.java"], ["A.java"]]
+    assert storage.search_vectors_batch("missing", [[1, 0, 0]]) == [[]]
+
+
+def test_upsert_replaces_points_with_same_id(storage):
+    metadata = make_metadata("p", "A.java")
+    storage.store_vectors("code", [[1, 0, 0]], [metadata])
+    storage.store_vectors("code", [[0, 1, 0]], [metadata])
+
+    results = storage.search_vectors("code", [0, 1, 0], limit=5)
+    assert len(results) == 1
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
+def test_delete_points_and_project(storage):
+    metadata = [make_metadata("a", "A.java"), make_metadata("a", "B.java"), make_metadata("b", "C.java")]
+    storage.store_vectors("code", [[1, 0, 0], [0, 1, 0], [0, 0, 1]], metadata)
+
+    assert storage.delete_points("code", [metadata[0].point_id()])
+    assert {r["metadata"]["file_path"] for r in storage.search_vectors("code", [1, 1, 1], limit=5)} == {"B.java", "C.java"}
+
+    assert storage.delete_project_vectors("code", "a")
+    assert [r["metadata"]["file_path"] for r in storage.search_vectors("code", [1, 1, 1], limit=5)] == ["C.java"]
+
+
+def test_collection_persists_and_grows(tmp_path):
+    storage = LocalVectorStorageService(str(tmp_path))
+    storage.create_collection("code", vector_size=4)
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(1500, 4)).tolist()
+    metadata = [make_metadata("p", f"F{i}.java") for i in range(1500)]
+    assert storage.store_vectors("code", vectors, metadata)
+
+    reopened = LocalVectorStorageService(str(tmp_path))
+    results = reopened.search_vectors("code", vectors[42], limit=1)
+    assert results[0]["metadata"]["file_path"] == "F42.java"
+
+
+def test_unflushed_writes_persist_on_close(tmp_path):
+    storage = LocalVectorStorageService(str(tmp_path))
+    storage.create_collection("code", vector_size=3)
+    storage.store_vectors("code", [[1, 0, 0]], [make_metadata("p", "A.java")], wait=False)
+    storage.close()
+
+    reopened = LocalVectorStorageService(str(tmp_path))
+    assert len(reopened.search_vectors("code", [1, 0, 0])) == 1
+
+
+def test_store_vectors_rejects_wrong_size(storage):
+    assert not storage.store_vectors("code", [[1, 0]], [make_metadata("p", "A.java")])
+    assert not storage.store_vectors("missing", [[1, 0, 0]], [make_metadata("p", "A.java")])
+
+
+@pytest.mark.parametrize("quantization", ["scalar", "binary"])
+def test_quantized_search_rescores_to_exact_results(tmp_path, quantization):
+    storage = LocalVectorStorageService(str(tmp_path))
+    storage.create_collection("code", vector_size=64, options=CollectionOptions(quantization=quantization))
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 64))
+    metadata = [make_metadata("p", f"F{i}.java") for i in range(2000)]
+    assert storage.store_vectors("code", vectors.tolist(), metadata)
+
+    query = vectors[7].tolist()
+    exact = storage.search_vectors("code", query, limit=10, search_options=SearchOptions(exact=True))
+    rescored = storage.search_vectors("code", query, limit=10, search_options=SearchOptions(oversampling=4.0))
+    assert rescored[0]["metadata"]["file_path"] == "F7.java"
+    # Rescored hits carry exact cosine scores
+    exact_scores = {r["id"]: r["score"] for r in storage.search_vectors(
+        "code", query, limit=2000, search_options=SearchOptions(exact=True)
+    )}
+    assert all(r["score"] == pytest.approx(exact_scores[r["id"]], abs=1e-5) for r in rescored)
+    # Oversampling to every row rescores the whole collection
+    everything = storage.search_vectors("code", query, limit=10, search_options=SearchOptions(oversampling=200))
+    assert [r["id"] for r in everything] == [r["id"] for r in exact]
+    unscored = storage.search_vectors("code", query, limit=10, search_options=SearchOptions(rescore=False))
+    assert len(unscored) == 10
+
+    usage = storage.memory_usage("code")
+    assert usage["index"] * (4 if quantization == "scalar" else 30) <= usage["vectors"] * 1.1
+
+    # Codes are rebuilt from the float vectors when the collection is reopened
+    reopened = LocalVectorStorageService(str(tmp_path))
+    assert reopened.search_vectors("code", vectors[7].tolist(), limit=1)[0]["metadata"]["file_path"] == "F7.java"
+    assert reopened.memory_usage("code") == usage
+
+
+def test_truncated_collection_stores_leading_dimensions(tmp_path):
+    storage = LocalVectorStorageService(str(tmp_path))
+    storage.create_collection("short", vector_size=4, options=CollectionOptions(dimensions=2))
+    assert storage.store_vectors("short", [[3, 4, 9, 9], [1, 0, 0, 0]], [make_metadata("p", "A.java"), make_metadata("p", "B.java")])
+
+    results = storage.search_vectors("short", [3, 4, 0, 0], limit=2)
+    assert results[0]["metadata"]["file_path"] == "A.java"
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert storage.memory_usage("short")["vectors"] == 2 * 2 * 4
+
+
+def test_two_stage_search_reranks_with_full_vectors(tmp_path):
+    storage = LocalVectorStorageService(str(tmp_path))
+    options = CollectionOptions(dimensions=2, rerank_full_vectors=True)
+    storage.create_collection("two_stage", vector_size=4, options=options)
+    # Both points look the same on their leading dimensions
+    storage.store_vectors("two_stage", [[1, 0, 1, 0], [1, 0, 0, 1]], [make_metadata("p", "A.java"), make_metadata("p", "B.java")])
+
+    results = storage.search_vectors("two_stage", [1, 0, 0, 1], limit=1)
+    assert results[0]["metadata"]["file_path"] == "B.java"
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert storage.memory_usage("two_stage") == {"vectors": 2 * 4 * 4, "index": 2 * 2 * 4}
+
+    reopened = LocalVectorStorageService(str(tmp_path))
+    assert reopened.search_vectors("two_stage", [1, 0, 1, 0], limit=1)[0]["metadata"]["file_path"] == "A.java"
@@ -0,0 +1,62 @@
+import pytest
+
+from src.services.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(buckets=(0.1, 1.0))
+
+
+def test_counters_are_tracked_per_label(registry):
+    registry.inc("files_parsed_total")
+    registry.inc("files_parsed_total", 2)
+    registry.inc("query_cache_hits_total", cache="result")
+
+    assert registry.counter_value("files_parsed_total") == 3
+    assert registry.counter_value("query_cache_hits_total", cache="result") == 1
+    assert registry.counter_value("query_cache_hits_total", cache="embedding") == 0
+
+
+def test_histogram_snapshot(registry):
+    for value in (0.05, 0.05, 0.5, 5.0):
+        registry.observe("stage_seconds", value, stage="parse")
+
+    series = registry.snapshot()["histograms"]["stage_seconds"][0]
+    assert series["labels"] == {"stage": "parse"}
+    assert series["count"] == 4
+    assert series["sum"] == pytest.approx(5.6)
+    assert series["p50"] == 0.1
+    assert series["p95"] == float("inf")
+
+
+def test_timer_records_even_on_error(registry):
+    with pytest.raises(ValueError):
+        with registry.timer("stage_seconds", stage="embed"):
+            raise ValueError("boom")
+    assert registry.snapshot()["histograms"]["stage_seconds"][0]["count"] == 1
+
+
+def test_prometheus_export(registry):
+    registry.inc("updates_total", status="success")
+    registry.observe("query_seconds", 0.05)
+    registry.observe("query_seconds", 0.5)
+
+    text = registry.to_prometheus()
+    assert "# TYPE codebase_mcp_updates_total counter" in text
+    assert 'codebase_mcp_updates_total{status="success"} 1' in text
+    assert 'codebase_mcp_query_seconds_bucket{le="0.1"} 1' in text
+    assert 'codebase_mcp_query_seconds_bucket{le="1.0"} 2' in text
+    assert 'codebase_mcp_query_seconds_bucket{le="+Inf"} 2' in text
+    assert "codebase_mcp_query_seconds_count 2" in text
+
+
+def test_label_values_are_escaped(registry):
+    registry.inc("errors_total", reason='say "hi"')
+    assert 'reason="say \\"hi\\""' in registry.to_prometheus()
+
+
+def test_reset(registry):
+    registry.inc("updates_total")
+    registry.reset()
+    assert registry.snapshot() == {"counters": {}, "histograms": {}}
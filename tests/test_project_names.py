@@ -0,0 +1,9 @@
+from src.services.project_names import safe_project_name
+
+
+def test_safe_project_name_keeps_safe_names_and_separates_replaced_ones():
+    assert safe_project_name("my-project_2") == "my-project_2"
+    assert safe_project_name("org/app").startswith("org_app-")
+    assert safe_project_name("org/app") != safe_project_name("org_app")
+    assert safe_project_name("org/app") != safe_project_name("org.app")
+    assert safe_project_name("org/app") == safe_project_name("org/app")
@@ -0,0 +1,32 @@
+import time
+from src.services.query_cache import TTLCache
+
+
+def test_lru_eviction_and_stats():
+    cache = TTLCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75, "entries": 2}
+
+
+def test_entries_expire():
+    cache = TTLCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_invalidate_by_predicate():
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set(("project_a", "q", 5, 0), [1])
+    cache.set(("project_b", "q", 5, 0), [2])
+
+    assert cache.invalidate(lambda key: key[0] == "project_a") == 1
+    assert cache.get(("project_a", "q", 5, 0)) is None
+    assert cache.get(("project_b", "q", 5, 0)) == [2]
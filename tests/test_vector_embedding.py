@@ -69,5 +69,49 @@ async def test_batch_embedding_generation(mock_embedding):
         assert all(len(emb) == EMBEDDING_DIM for emb in embeddings)
         print(f"Batch embedding generation test passed. Number of embeddings: {len(embeddings)}")
 
+@pytest.mark.asyncio
+async def test_batch_embedding_uses_cache(tmp_path):
+    """測試 embedding 快取只對未命中的文本呼叫模型"""
+    from src.services.embedding_cache import EmbeddingCache
+    with patch('src.services.vector_embedding.GoogleGenerativeAIEmbeddings') as mock_embeddings:
+        mock_instance = AsyncMock()
+        mock_instance.aembed_documents.side_effect = lambda texts: [[float(len(text))] for text in texts]
+        mock_instance.aembed_query.side_effect = lambda text: [float(len(text))]
+        mock_embeddings.return_value = mock_instance
+
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+        service = VectorEmbeddingService(cache=cache)
+
+        first = await service.generate_embeddings_batch(["a", "bb", "a"])
+        second = await service.generate_embeddings_batch(["a", "bb", "ccc"])
+        single = await service.generate_embedding("ccc")
+
+        assert first == [[1.0], [2.0], [1.0]]
+        assert second == [[1.0], [2.0], [3.0]]
+        assert single == [3.0]
+        assert mock_instance.aembed_documents.call_args_list[0].args[0] == ["a", "bb"]
+        assert mock_instance.aembed_documents.call_args_list[1].args[0] == ["ccc"]
+        mock_instance.aembed_query.assert_not_called()
+        assert service.cache_stats()["hits"] == 3
+
+@pytest.mark.asyncio
+async def test_hashing_provider_runs_offline():
+    """測試 hashing provider 不需要呼叫 Google API"""
+    with patch('src.services.vector_embedding.GoogleGenerativeAIEmbeddings') as mock_embeddings:
+        service = VectorEmbeddingService(provider="hashing")
+
+        document = (await service.generate_embeddings_batch([SAMPLE_CODE]))[0]
+        query = await service.generate_query_embedding(SAMPLE_CODE)
+
+        mock_embeddings.assert_not_called()
+        assert len(document) == EMBEDDING_DIM
+        assert document == query
+        assert await service.warm_up()
+
+def test_unknown_provider():
+    """測試未知的 provider 會被拒絕"""
+    with pytest.raises(ValueError):
+        VectorEmbeddingService(provider="unknown")
+
 if __name__ == '__main__':
-    pytest.main(['-v', __file__]) 
\ No newline at end of file
+    pytest.main(['-v', __file__])
@@ -1,9 +1,13 @@
 import pytest
 from src.services.vector_storage import VectorStorageService, CodeVectorMetadata
+from src.type_definitions.storage_types import CollectionOptions, SearchFilter, SearchOptions
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
 
 # Dummy classes to simulate Qdrant client behavior
 class DummyHit:
-    def __init__(self, score, payload):
+    def __init__(self, score, payload, id=1):
+        self.id = id
         self.score = score
         self.payload = payload
 
@@ -22,22 +26,54 @@ class DummyQdrantClient:
         self.search_called = False
         self.delete_called = False
         self.get_collections_called = False
+        self.payload_schema = {}
+        self.shard_keys = set()
 
-    def create_collection(self, collection_name, vectors_config):
+    def create_collection(self, collection_name, vectors_config, **kwargs):
         self.create_collection_called = True
+        self.create_collection_kwargs = dict(kwargs, vectors_config=vectors_config)
 
-    def upsert(self, collection_name, points):
+    def upsert(self, collection_name, points, **kwargs):
         self.upsert_called = True
 
     def search(self, collection_name, query_vector, limit, **kwargs):
         self.search_called = True
+        self.search_kwargs = kwargs
         # simulate returning a list of dummy hit objects
         dummy_hit = DummyHit(score=0.9, payload={'project_name': 'test_project', 'data': 'example'})
         return [dummy_hit]
 
+    def search_batch(self, collection_name, requests):
+        self.search_batch_requests = requests
+        return [
+            [DummyHit(score=0.9, payload={'project_name': 'test_project', 'query': index}, id=index)]
+            for index, _ in enumerate(requests)
+        ]
+
+    def get_collection(self, collection_name):
+        return models.CollectionInfo.model_construct(
+            config=models.CollectionConfig.model_construct(
+                params=models.CollectionParams.model_construct(
+                    vectors=models.VectorParams(size=3, distance=models.Distance.COSINE)
+                )
+            ),
+            payload_schema=dict(self.payload_schema)
+        )
+
+    def create_payload_index(self, collection_name, field_name, field_schema, **kwargs):
+        self.payload_schema[field_name] = field_schema
+
     def delete(self, collection_name, points_selector):
         self.delete_called = True
 
+    def create_shard_key(self, collection_name, shard_key, **kwargs):
+        if shard_key in self.shard_keys:
+            raise Exception(f"Shard key {shard_key} already exists")
+        self.shard_keys.add(shard_key)
+
+    def delete_shard_key(self, collection_name, shard_key, **kwargs):
+        self.shard_keys.remove(shard_key)
+
     def get_collections(self):
         self.get_collections_called = True
         # Simulate returning collection data
@@ -59,6 +95,156 @@ def test_create_collection(vector_storage_service):
     assert vector_storage_service.client.create_collection_called is True
 
 
+def test_create_collection_indexes_filtered_payload_fields(vector_storage_service):
+    client = vector_storage_service.client
+    assert vector_storage_service.create_collection("test_collection", vector_size=3)
+    assert set(client.payload_schema) == set(VectorStorageService.PAYLOAD_INDEXES)
+    assert set(client.payload_schema.values()) == {models.PayloadSchemaType.KEYWORD}
+
+    # Collections created before the indexes existed get the missing ones only
+    client.payload_schema = {"project_name": models.PayloadSchemaType.KEYWORD}
+    created = []
+    client.create_payload_index = lambda collection_name, field_name, **kwargs: created.append(field_name)
+    assert vector_storage_service.ensure_payload_indexes("test_collection")
+    assert "project_name" not in created and "class_path" in created
+
+
+def test_search_vectors_filters_by_package_and_class_prefix():
+    # A real in-memory client checks the filter reaches the search as an argument it accepts
+    service = VectorStorageService(host="qdrant", port=6333)
+    service.client = QdrantClient(":memory:")
+    assert service.create_collection("test_collection", vector_size=3)
+    metadata = [
+        CodeVectorMetadata(project_name="p", file_path="A.java", package="com.example.user", class_name="UserService"),
+        CodeVectorMetadata(project_name="p", file_path="B.java", package="com.example.user", class_name="UserRepository"),
+        CodeVectorMetadata(project_name="p", file_path="C.java", package="com.example.billing", class_name="UserService"),
+        CodeVectorMetadata(project_name="q", file_path="A.java", package="com.example.user", class_name="UserService"),
+    ]
+    assert service.store_vectors("test_collection", [[0.1, 0.2, 0.3]] * len(metadata), metadata)
+
+    search_filter = SearchFilter(package_prefix="com.example.user", class_prefix="UserService")
+    results = service.search_vectors("test_collection", [0.1, 0.2, 0.3], project_name="p", search_filter=search_filter)
+    assert [(result["metadata"]["project_name"], result["metadata"]["file_path"]) for result in results] == [("p", "A.java")]
+    results = service.search_vectors(
+        "test_collection", [0.1, 0.2, 0.3], project_name="p", search_filter=SearchFilter(package_prefix="com")
+    )
+    assert sorted(result["metadata"]["file_path"] for result in results) == ["A.java", "B.java", "C.java"]
+
+    payload = CodeVectorMetadata(file_path="A.java", package="com.example.user", class_name="UserService.Cache").payload()
+    assert payload["package_path"] == ["com", "com.example", "com.example.user"]
+    assert payload["class_path"] == ["UserService", "UserService.Cache"]
+    assert search_filter.matches(payload)
+    assert not SearchFilter(package_prefix="com.example.us").matches(payload)
+
+
+def test_create_collection_with_quantization_and_on_disk_options(vector_storage_service):
+    options = CollectionOptions(
+        quantization="binary",
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        hnsw_m=32,
+        hnsw_ef_construct=200
+    )
+    assert vector_storage_service.create_collection("test_collection", vector_size=512, options=options)
+
+    kwargs = vector_storage_service.client.create_collection_kwargs
+    assert kwargs["vectors_config"].on_disk is True
+    assert kwargs["on_disk_payload"] is True
+    assert (kwargs["hnsw_config"].m, kwargs["hnsw_config"].ef_construct) == (32, 200)
+    assert kwargs["quantization_config"].binary.always_ram is True
+
+    # Defaults keep full-precision vectors in RAM and the server's HNSW parameters
+    vector_storage_service.create_collection("plain_collection", vector_size=512)
+    kwargs = vector_storage_service.client.create_collection_kwargs
+    assert kwargs["quantization_config"] is None and kwargs["hnsw_config"] is None
+
+
+def test_search_passes_hnsw_ef_and_oversampling(vector_storage_service):
+    vector_storage_service.search_vectors(
+        "test_collection", [0.1, 0.2, 0.3], search_options=SearchOptions(hnsw_ef=256, oversampling=3.0)
+    )
+    params = vector_storage_service.client.search_kwargs["search_params"]
+    assert params.hnsw_ef == 256
+    assert (params.quantization.rescore, params.quantization.oversampling) == (True, 3.0)
+
+
+def test_matryoshka_collection_searches_truncated_vectors_then_reranks(vector_storage_service):
+    client = vector_storage_service.client
+    options = CollectionOptions(dimensions=2, rerank_full_vectors=True)
+    assert vector_storage_service.create_collection("two_stage", vector_size=4, options=options)
+    vectors_config = client.create_collection_kwargs["vectors_config"]
+    assert (vectors_config["coarse"].size, vectors_config["full"].size) == (2, 4)
+    assert vectors_config["full"].on_disk is True
+
+    stored = []
+    client.upsert = lambda collection_name, points, wait: stored.extend(points)
+    metadata = [CodeVectorMetadata(project_name="p", file_path="A.java")]
+    assert vector_storage_service.store_vectors("two_stage", [[3.0, 4.0, 1.0, 1.0]], metadata)
+    assert stored[0].vector["coarse"] == pytest.approx([0.6, 0.8])
+    assert stored[0].vector["full"] == [3.0, 4.0, 1.0, 1.0]
+
+    batches = []
+
+    def search_batch(collection_name, requests):
+        batches.append(requests)
+        return [[DummyHit(score=0.5, payload=None, id=7), DummyHit(score=0.4, payload=None, id=8)]]
+
+    client.search_batch = search_batch
+    vector_storage_service.search_vectors(
+        "two_stage", [3.0, 4.0, 0.0, 0.0], limit=2, search_options=SearchOptions(rerank_factor=3)
+    )
+    coarse, rerank = batches
+    assert coarse[0].vector.name == "coarse" and coarse[0].limit == 6
+    assert coarse[0].vector.vector == pytest.approx([0.6, 0.8])
+    assert rerank[0].vector.name == "full" and rerank[0].params.exact is True
+    assert rerank[0].filter.must[0].has_id == [7, 8]
+
+
+def test_shard_tenancy_routes_points_and_searches_to_project_shards():
+    service = VectorStorageService(host="qdrant", port=6333, tenancy="shard")
+    client = service.client = DummyQdrantClient()
+    assert service.create_collection("test_collection", vector_size=3)
+    assert client.create_collection_kwargs["sharding_method"] == models.ShardingMethod.CUSTOM
+
+    upserts = []
+    client.upsert = lambda collection_name, points, **kwargs: upserts.append((kwargs["shard_key_selector"], len(points)))
+    metadata = [
+        CodeVectorMetadata(project_name=project_name, file_path="A.java", chunk_id=str(index))
+        for index, project_name in enumerate(["a", "b", "a"])
+    ]
+    assert service.store_vectors("test_collection", [[0.1, 0.2, 0.3]] * 3, metadata)
+    assert sorted(upserts) == [("a", 2), ("b", 1)]
+    assert client.shard_keys == {"a", "b"}
+
+    service.search_vectors("test_collection", [0.1, 0.2, 0.3], project_name="a")
+    assert client.search_kwargs["shard_key_selector"] == "a"
+    service.search_vectors_batch("test_collection", [[0.1, 0.2, 0.3]], project_name="a")
+    assert client.search_batch_requests[0].shard_key == "a"
+
+    # Deleting a project drops its shard, without a filtered delete over the others
+    assert service.delete_project_vectors("test_collection", "a")
+    assert client.shard_keys == {"b"} and client.delete_called is False
+    # Projects without a shard fall back to the filtered delete
+    assert service.delete_project_vectors("test_collection", "c")
+    assert client.delete_called is True
+
+
+def test_shard_tenancy_rejects_collections_without_custom_sharding():
+    service = VectorStorageService(host="qdrant", port=6333, tenancy="shard")
+    client = service.client = DummyQdrantClient()
+    assert service.check_tenancy("test_collection") is False
+    assert VectorStorageService(host="qdrant", port=6333).check_tenancy("test_collection") is True
+
+    # Shard creation failures other than an existing key fail the write instead of being ignored
+    def create_shard_key(collection_name, shard_key, **kwargs):
+        raise Exception("Bad request: collection is not configured for custom sharding")
+
+    client.create_shard_key = create_shard_key
+    metadata = [CodeVectorMetadata(project_name="a", file_path="A.java")]
+    assert service.store_vectors("test_collection", [[0.1, 0.2, 0.3]], metadata) is False
+    assert ("test_collection", "a") not in service._shard_keys
+
+
 def test_store_vectors(vector_storage_service):
     vectors = [[0.1, 0.2, 0.3]]
     metadata = [
@@ -87,6 +273,19 @@ def test_search_vectors(vector_storage_service):
     assert project_name == 'test_project'
 
 
+def test_search_vectors_batch(vector_storage_service):
+    results = vector_storage_service.search_vectors_batch(
+        "test_collection", [[0.1, 0.2, 0.3], [0.3, 0.2, 0.1]], limit=3, project_name="test_project"
+    )
+    assert [[hit["metadata"]["query"] for hit in hits] for hits in results] == [[0], [1]]
+
+    # One request per query, sharing the project filter
+    requests = vector_storage_service.client.search_batch_requests
+    assert [request.limit for request in requests] == [3, 3]
+    assert requests[0].filter.must[0].match.value == "test_project"
+    assert vector_storage_service.search_vectors_batch("test_collection", []) == []
+
+
 def test_delete_project_vectors(vector_storage_service):
     result = vector_storage_service.delete_project_vectors("test_collection", "test_project")
     assert result is True
@@ -97,4 +296,56 @@ def test_collection_exists(vector_storage_service):
     exists = vector_storage_service.collection_exists("existing_collection")
     assert exists is True
     not_exists = vector_storage_service.collection_exists("non_existing_collection")
-    assert not_exists is False 
\ No newline at end of file
+    assert not_exists is False 
+
+def test_point_ids_are_deterministic_and_project_scoped():
+    metadata = CodeVectorMetadata(project_name="project_a", file_path="src/A.java")
+    same = CodeVectorMetadata(project_name="project_a", file_path="src/A.java", class_name="A")
+    other_project = CodeVectorMetadata(project_name="project_b", file_path="src/A.java")
+    other_chunk = CodeVectorMetadata(project_name="project_a", file_path="src/A.java", chunk_id="method:a")
+
+    assert metadata.point_id() == same.point_id()
+    assert metadata.point_id() != other_project.point_id()
+    assert metadata.point_id() != other_chunk.point_id()
+    assert metadata.model_dump()["project_name"] == "project_a"
+
+
+def test_store_vectors_uses_point_ids(vector_storage_service):
+    stored = []
+    vector_storage_service.client.upsert = lambda collection_name, points, **kwargs: stored.extend(points)
+    metadata = [
+        CodeVectorMetadata(project_name="project_a", file_path="A.java"),
+        CodeVectorMetadata(project_name="project_b", file_path="A.java"),
+    ]
+
+    assert vector_storage_service.store_vectors("test_collection", [[0.1], [0.2]], metadata) is True
+    assert [point.id for point in stored] == [m.point_id() for m in metadata]
+    assert stored[0].payload["project_name"] == "project_a"
+    # Payloads hold the filtered and displayed fields and the line range, not the chunk text
+    assert set(stored[0].payload) == CodeVectorMetadata.PAYLOAD_FIELDS | {"package_path", "class_path"}
+
+
+def test_store_vectors_upserts_in_chunks(vector_storage_service):
+    calls = []
+    vector_storage_service.upsert_batch_size = 2
+    vector_storage_service.upsert_workers = 2
+    vector_storage_service.client.upsert = lambda collection_name, points, wait: calls.append((len(points), wait))
+    metadata = [CodeVectorMetadata(project_name="p", file_path=f"F{i}.java") for i in range(5)]
+
+    assert vector_storage_service.store_vectors("test_collection", [[0.1]] * 5, metadata) is True
+
+    assert sorted(size for size, _ in calls) == [1, 2, 2]
+    # Only the final request waits, after every other chunk is acknowledged
+    assert [wait for _, wait in calls].count(True) == 1
+    assert calls[-1] == (1, True)
+
+
+def test_store_vectors_reports_chunk_failures(vector_storage_service):
+    def failing_upsert(collection_name, points, wait):
+        raise RuntimeError("timeout")
+
+    vector_storage_service.upsert_batch_size = 1
+    vector_storage_service.client.upsert = failing_upsert
+    metadata = [CodeVectorMetadata(file_path=f"F{i}.java") for i in range(3)]
+
+    assert vector_storage_service.store_vectors("test_collection", [[0.1]] * 3, metadata) is False